@@ -1,153 +1,366 @@
+import argparse
 import re
 import json
 import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import ast_binario
+import paquete
+from semantica import Identificador, analizar_juego, resolver_referencias
+
+# Expresión maestra: una sola pasada sobre todo el texto.
+# La primera alternativa descarta las líneas de comentario (las que empiezan por '#'); la segunda
+# salta los espacios y captura un token o un salto de línea (con el que se cuentan las líneas).
+# Con un solo grupo findall devuelve cadenas sin crear un objeto Match por token, y el tipo se
+# deduce del primer carácter.
+TOKEN_PATTERN = re.compile(
+    r'(?m)^[^\S\n]*#[^\n]*|[^\S\n]*("[^"\n]*"|[{}\[\]=:,\n]|\d+\.?\d*|[A-Za-z_]\w*)'
+)
+OPERATORS = frozenset('{}[]=:,')
+
 
 class Tokenizer:
+    # Caracteres analizados por cada llamada a findall (se corta en un salto de línea): la
+    # memoria de la lista de tokens pendientes no crece con el tamaño del archivo
+    block_size = 1 << 16
+
     def __init__(self, source_code):
         self.source = source_code
         self.tokens = []
 
+    def iter_tokens(self):
+        """Genera los tokens de forma perezosa, (tipo, valor, línea)"""
+        source = self.source
+        findall = TOKEN_PATTERN.findall
+        numbers = {}    # texto -> valor: en las matrices de piezas se repiten los mismos números
+        line_no = 1
+        start, size = 0, len(source)
+        while start < size:
+            end = source.find('\n', start + self.block_size)
+            end = size if end < 0 else end + 1
+            for token in findall(source, start, end):
+                if token in OPERATORS:
+                    yield ('OPERATOR', token, line_no)
+                elif token == '\n':
+                    line_no += 1
+                elif token:     # '' es una línea de comentario
+                    first = token[0]
+                    if first == '"':
+                        yield ('STRING', token[1:-1], line_no)
+                    elif first <= '9' or first > 'z':  # \d también admite dígitos no ASCII
+                        value = numbers.get(token)
+                        if value is None:
+                            value = numbers[token] = float(token) if '.' in token else int(token)
+                        yield ('NUMBER', value, line_no)
+                    else:
+                        yield ('IDENTIFIER', token, line_no)
+            start = end
+
     def tokenize(self):
-        token_pattern = re.compile(r'"([^"]*)"|(\d+\.?\d*)|({|}|\[|\]|=|:|,)|([A-Za-z_]\w*)')
-        lines = self.source.splitlines()
-        line_no = 0
-        for raw_line in lines:
-            line_no += 1
-            line = raw_line.strip()
-            if not line or line.startswith('#'):
-                continue
-            for match in token_pattern.finditer(line):
-                str_val, num_val, op_val, id_val = match.groups()
-                if str_val is not None:
-                    self.tokens.append(('STRING', str_val, line_no))
-                elif num_val is not None:
-                    val = float(num_val) if '.' in num_val else int(num_val)
-                    self.tokens.append(('NUMBER', val, line_no))
-                elif op_val is not None:
-                    self.tokens.append(('OPERATOR', op_val, line_no))
-                elif id_val is not None:
-                    self.tokens.append(('IDENTIFIER', id_val, line_no))
+        self.tokens = list(self.iter_tokens())
         return self.tokens
 
 
+class BrikSyntaxError(SyntaxError):
+    """Uno o varios errores de sintaxis; errors guarda todos los mensajes en orden.
+    str() resume en una sola línea (el primero y cuántos más hay)"""
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        summary = self.errors[0]
+        if len(self.errors) > 1:
+            summary += f" (y {len(self.errors) - 1} errores más)"
+        super().__init__(summary)
+
+
+def syntax_error_lines(error):
+    """Mensajes de un SyntaxError, uno por error encontrado"""
+    return getattr(error, 'errors', None) or [str(error)]
+
+
+# Estados del analizador: qué se espera a continuación
+TOP_KEY, TOP_EQUALS, VALUE, BLOCK_KEY, BLOCK_SEPARATOR, BLOCK_NEXT, LIST_ITEM, LIST_NEXT = range(8)
+KEY_TYPES = ('IDENTIFIER', 'STRING')
+CLOSERS = {'}': ']', ']': '}'}  # Cierre -> el cierre del otro tipo de contenedor
+
+
 class Parser:
+    """Analizador con pila explícita: admite cualquier profundidad de anidamiento en tiempo lineal.
+    Ante un error sigue analizando (modo pánico: salta hasta ',', '}' o ']' del mismo nivel, o hasta
+    la siguiente 'clave =' de primer nivel) y al final lanza BrikSyntaxError con todos los errores"""
+
     def __init__(self, tokens):
-        self.tokens = tokens
-        self.i = 0
+        # tokens puede ser una lista o un generador (Tokenizer.iter_tokens)
+        self.tokens = iter(tokens)
         self.symbol_table = {}
+        self.errors = []
+        self.reported = None    # Último token con error
 
-    def get_token(self):
-        if self.i < len(self.tokens):
-            t = self.tokens[self.i]
-            self.i += 1
-            return t
-        return None
+    def parse(self):
+        tokens = self.tokens
+        table = self.symbol_table
+        errors = self.errors
+        stack = []          # Contenedores abiertos: (contenedor padre, clave en el padre, línea de apertura)
+        container = table   # Contenedor actual; la tabla de símbolos en el nivel superior
+        key = None          # Clave cuyo valor se está leyendo en el contenedor actual
+        state = TOP_KEY
+        line = 1
+        tok = next(tokens, None)
+
+        while tok is not None:
+            ttype, tval, line = tok
+            is_operator = ttype == 'OPERATOR'
+
+            if state == VALUE or state == LIST_ITEM:
+                if not is_operator:
+                    # Los identificadores sin comillas pueden ser referencias (ver semantica.py)
+                    value = Identificador(tval) if ttype == 'IDENTIFIER' else tval
+                elif tval == '{' or tval == '[':
+                    stack.append((container, key, line))
+                    if tval == '{':
+                        container, state = {}, BLOCK_KEY
+                    else:
+                        container, state = [], LIST_ITEM
+                    key = None
+                    tok = next(tokens, None)
+                    continue
+                elif tval == ']' and state == LIST_ITEM:
+                    value = container
+                    container, key, _ = stack.pop()
+                elif tval in CLOSERS and stack:
+                    if state == VALUE:
+                        self.report(tok, f"Línea {line}: falta el valor de '{key}' antes de '{tval}'.")
+                        state = BLOCK_NEXT
+                    else:
+                        self.report(tok, f"Línea {line}: se esperaba ']' para cerrar la lista de la "
+                                         f"línea {stack[-1][2]}, se encontró '}}'.")
+                        container, key, _ = stack.pop()
+                        state = self.next_state(container, stack)
+                    continue  # El cierre lo procesa el contenedor correspondiente
+                else:
+                    self.report(tok, f"Línea {line}: valor inesperado '{tval}'.")
+                    tok, state, key = self.recover(tok, container, stack, key)
+                    continue
+
+            elif state == BLOCK_KEY or state == BLOCK_NEXT:
+                if is_operator:
+                    if tval == '}':
+                        value = container
+                        container, key, _ = stack.pop()
+                    elif tval == ',' and state == BLOCK_NEXT:
+                        state = BLOCK_KEY
+                        tok = next(tokens, None)
+                        continue
+                    elif tval == ']':
+                        self.report(tok, f"Línea {line}: se esperaba '}}' para cerrar el bloque de la "
+                                         f"línea {stack[-1][2]}, se encontró ']'.")
+                        container, key, _ = stack.pop()
+                        state = self.next_state(container, stack)
+                        continue
+                    else:
+                        self.report(tok, f"Línea {line}: se esperaba una clave, se encontró '{tval}'.")
+                        tok, state, key = self.recover(tok, container, stack, key)
+                        continue
+                elif ttype in KEY_TYPES:
+                    key = tval
+                    state = BLOCK_SEPARATOR
+                    tok = next(tokens, None)
+                    continue
+                else:
+                    self.report(tok, f"Línea {line}: se esperaba una clave, se encontró '{tval}'.")
+                    tok, state, key = self.recover(tok, container, stack, key)
+                    continue
+
+            elif state == BLOCK_SEPARATOR:
+                if is_operator and (tval == ':' or tval == '='):
+                    state = VALUE
+                    tok = next(tokens, None)
+                else:
+                    self.report(tok, f"Línea {line}: se esperaba ':' o '=' después de la clave '{key}'.")
+                    tok, state, key = self.recover(tok, container, stack, key)
+                continue
 
-    def peek_token(self):
-        return self.tokens[self.i] if self.i < len(self.tokens) else None
+            elif state == LIST_NEXT:
+                # La coma entre elementos es opcional
+                state = LIST_ITEM
+                if is_operator and tval == ',':
+                    tok = next(tokens, None)
+                continue
 
-    def expect(self, expected_values, msg=None):
-        tok = self.get_token()
-        if tok is None:
-            raise SyntaxError(msg or f"Token esperado {expected_values} pero se encontró EOF.")
-        expected = (expected_values,) if isinstance(expected_values, str) else expected_values
-        if tok[1] not in expected:
-            lineno = tok[2]
-            raise SyntaxError(msg or f"Token inesperado '{tok[1]}' en línea {lineno}. Se esperaba uno de {expected}.")
-        return tok
+            elif state == TOP_KEY:
+                if ttype in KEY_TYPES:
+                    key = tval
+                    state = TOP_EQUALS
+                    tok = next(tokens, None)
+                else:
+                    self.report(tok, f"Línea {line}: se esperaba un identificador o una cadena, "
+                                     f"se encontró '{tval}'.")
+                    tok, state, key = self.recover(tok, container, stack, key)
+                continue
 
-    def parse(self):
-        while self.peek_token() is not None:
-            key_tok = self.get_token()
-            if key_tok[0] not in ('IDENTIFIER', 'STRING'):
-                raise SyntaxError(f"Se esperaba identificador o cadena, se encontró {key_tok}.")
-            key = key_tok[1]
-
-            eq_tok = self.get_token()
-            if eq_tok is None or eq_tok[1] != '=':
-                raise SyntaxError(f"Se esperaba '=' después de la clave '{key}'.")
-
-            value = self.parse_value()
-            if key in self.symbol_table:
-                print(f"Warning: redefinición de '{key}'.")
-            self.symbol_table[key] = value
-
-        return self.symbol_table
-
-    def parse_value(self):
-        tok = self.peek_token()
-        if tok is None:
-            raise SyntaxError("Se esperaba un valor pero llegó EOF.")
-
-        ttype, tval, _ = tok
-        if ttype in ('STRING', 'NUMBER'):
-            self.get_token()
-            return tval
-        if ttype == 'OPERATOR' and tval == '{':
-            return self.parse_block()
-        if ttype == 'OPERATOR' and tval == '[':
-            return self.parse_list()
-        if ttype == 'IDENTIFIER':
-            self.get_token()
-            return tval
-
-        raise SyntaxError(f"Valor inesperado '{tval}'.")
-
-    def parse_block(self):
-        self.get_token()  # consume '{'
-        block = {}
-        while True:
-            peek = self.peek_token()
-            if peek is None:
-                raise SyntaxError("Bloque no cerrado: se llegó a EOF.")
-            if peek[0] == 'OPERATOR' and peek[1] == '}':
-                self.get_token()
-                break
-
-            key_tok = self.get_token()
-            if key_tok[0] not in ('IDENTIFIER', 'STRING'):
-                raise SyntaxError(f"Se esperaba clave, se encontró {key_tok}.")
-            key = key_tok[1]
-
-            sep_tok = self.get_token()
-            if sep_tok is None or sep_tok[1] not in ('=', ':'):
-                raise SyntaxError(f"Se esperaba ':' o '=' después de la clave '{key}'.")
-            value = self.parse_value()
-            block[key] = value
-
-            peek2 = self.peek_token()
-            if peek2 and peek2[0] == 'OPERATOR' and peek2[1] == ',':
-                self.get_token()
+            else:  # TOP_EQUALS
+                if is_operator and tval == '=':
+                    state = VALUE
+                    tok = next(tokens, None)
+                else:
+                    self.report(tok, f"Línea {line}: se esperaba '=' después de la clave '{key}'.")
+                    tok, state, key = self.recover(tok, container, stack, key)
                 continue
 
-        return block
-
-    def parse_list(self):
-        self.get_token()  # consume '['
-        items = []
-        while True:
-            peek = self.peek_token()
-            if peek is None:
-                raise SyntaxError("Lista no cerrada: EOF inesperado.")
-            if peek[0] == 'OPERATOR' and peek[1] == ']':
-                self.get_token()
-                break
-            
-            if peek[0] == 'OPERATOR' and peek[1] == '[':
-                item = self.parse_list()
-            elif peek[0] == 'OPERATOR' and peek[1] == '{':
-                item = self.parse_block()
+            # Llegó un valor completo (escalar o contenedor recién cerrado): se guarda
+            if container.__class__ is list:
+                container.append(value)
+                state = LIST_NEXT
+            elif stack:
+                container[key] = value
+                state = BLOCK_NEXT
             else:
-                item = self.parse_value()
-            
-            items.append(item)
-
-            peek2 = self.peek_token()
-            if peek2 and peek2[0] == 'OPERATOR' and peek2[1] == ',':
-                self.get_token()
+                if key in table:
+                    print(f"Warning: redefinición de '{key}'.")
+                table[key] = value
+                state = TOP_KEY
+            tok = next(tokens, None)
+
+        if stack:
+            kind = 'lista' if container.__class__ is list else 'bloque'
+            message = f"Línea {stack[-1][2]}: {kind} sin cerrar al llegar al final del archivo"
+            if len(stack) > 1:
+                message += f" (hay {len(stack)} contenedores sin cerrar)"
+            errors.append(message + ".")
+        elif state == TOP_EQUALS:
+            errors.append(f"Línea {line}: se esperaba '=' después de la clave '{key}' "
+                          f"pero terminó el archivo.")
+        elif state == VALUE:
+            errors.append(f"Línea {line}: falta el valor de '{key}' al final del archivo.")
+
+        if errors:
+            raise BrikSyntaxError(errors)
+        return table
+
+    def report(self, tok, message):
+        """Anota un error; un mismo token solo produce un error aunque cierre varios contenedores"""
+        if tok is not self.reported:
+            self.errors.append(message)
+            self.reported = tok
+
+    @staticmethod
+    def next_state(container, stack):
+        """Estado tras cerrar (o abandonar) un contenedor dentro de container"""
+        if container.__class__ is list:
+            return LIST_NEXT
+        return BLOCK_NEXT if stack else TOP_KEY
+
+    def recover(self, tok, container, stack, key):
+        """Modo pánico: descarta tokens hasta un punto seguro y devuelve (token, estado, clave).
+        Dentro de un contenedor el punto seguro es ',', '}' o ']' del mismo nivel (sin consumirlo);
+        en el nivel superior es la siguiente 'clave =', y se continúa leyendo su valor.
+        Un cierre descartado que no cierra nada de lo saltado se anota como error propio"""
+        tokens = self.tokens
+        depth = 0
+        while tok is not None:
+            ttype, tval, line = tok
+            if ttype == 'OPERATOR':
+                if depth == 0 and stack and (tval == ',' or tval in CLOSERS):
+                    return tok, self.next_state(container, stack), key
+                if tval == '{' or tval == '[':
+                    depth += 1
+                elif tval in CLOSERS:
+                    if depth == 0:
+                        self.report(tok, f"Línea {line}: '{tval}' no cierra ningún bloque ni lista.")
+                    depth = max(depth - 1, 0)
+            elif depth == 0 and not stack and ttype in KEY_TYPES:
+                following = next(tokens, None)
+                if following is not None and following[0] == 'OPERATOR' and following[1] == '=':
+                    return next(tokens, None), VALUE, tval
+                tok = following
                 continue
+            tok = next(tokens, None)
+        return None, self.next_state(container, stack), key
 
-        return items
+
+class IncrementalParser:
+    """Reanaliza solo las definiciones de primer nivel cuyo texto cambió.
+    Guarda el resultado de cada definición indexado por su texto fuente"""
+
+    def __init__(self):
+        self.segments = {}
+        self.symbol_table = {}
+
+    def split_definitions(self, source):
+        """Divide el fuente en [(texto, línea)] por cada 'clave =' de primer nivel"""
+        starts = []
+        depth = 0
+        prev_key = None
+        for match in TOKEN_PATTERN.finditer(source):
+            token = match[1]
+            if token is None or token == '\n':
+                continue
+            if token in OPERATORS:
+                if token in '{[':
+                    depth += 1
+                elif token in '}]':
+                    depth = max(depth - 1, 0)
+                elif token == '=' and depth == 0 and prev_key is not None:
+                    starts.append(prev_key)
+                prev_key = None
+            elif depth == 0 and not token[0].isdigit():
+                prev_key = match.start(1)
+            else:
+                prev_key = None
+
+        if not starts:
+            return [(source, 1)] if source.strip() else []
+        definitions = []
+        line = 1 + source.count('\n', 0, starts[0])
+        for i, start in enumerate(starts):
+            end = starts[i + 1] if i + 1 < len(starts) else len(source)
+            text = source[start:end]
+            definitions.append((text, line))
+            line += text.count('\n')
+        return definitions
+
+    def parse_segment(self, text, first_line):
+        offset = first_line - 1
+        tokens = ((t, v, n + offset) for t, v, n in Tokenizer(text).iter_tokens())
+        return Parser(tokens).parse()
+
+    def update(self, source):
+        """Analiza la nueva versión del fuente; devuelve (symbol_table, claves que cambiaron).
+        Si hay errores de sintaxis se lanza BrikSyntaxError con los de todas las definiciones
+        y se conserva el estado anterior"""
+        segments = {}
+        table = {}
+        errors = []
+        for text, line in self.split_definitions(source):
+            entry = self.segments.get(text) or segments.get(text)
+            if entry is None:
+                try:
+                    entry = self.parse_segment(text, line)
+                except SyntaxError as e:
+                    errors.extend(syntax_error_lines(e))
+                    continue
+            segments[text] = entry
+            table.update(entry)
+        if errors:
+            raise BrikSyntaxError(errors)
+
+        old = self.symbol_table
+        missing = object()
+        changed = {key for key, value in table.items()
+                   if value is not old.get(key, missing) and value != old.get(key, missing)}
+        changed.update(key for key in old if key not in table)
+        self.segments = segments
+        self.symbol_table = table
+        return table, changed
+
+
+def resolve_and_check(ast):
+    """Análisis semántico: resuelve las referencias y valida las secciones conocidas.
+    Devuelve (AST resuelto, avisos); el AST resuelto es el que se guarda y los avisos son las
+    reglas que no tendrán efecto. Lanza ValueError si no es válido"""
+    config = analizar_juego(ast)
+    return resolver_referencias(ast), config.reglas.advertencias
 
 
 # ---- funciones IO ----
@@ -158,20 +371,169 @@ def load_file(filepath):
     with open(filepath, 'r', encoding='utf-8') as f:
         return f.read()
 
-def save_ast(ast, input_path):
+def output_path(input_path, formato='json', out_dir=None):
+    """Nombre del archivo de salida: arbol_<nombre>.ast (JSON) o .astb (binario)"""
     base = os.path.basename(input_path)
     name, _ = os.path.splitext(base)
-    out_name = f"arbol_{name}.ast"
-    try:
+    extension = 'astb' if formato == 'binario' else 'ast'
+    return os.path.join(out_dir or '', f"arbol_{name}.{extension}")
+
+def write_ast(ast, out_name, formato='json'):
+    if formato == 'binario':
+        ast_binario.guardar(ast, out_name)
+    else:
         with open(out_name, 'w', encoding='utf-8') as f:
-            json.dump(ast, f, indent=4, ensure_ascii=False)
+            json.dump(ast_binario.a_python(ast), f, indent=4, ensure_ascii=False)
+
+def save_ast(ast, input_path, formato='json'):
+    """Guarda el AST como JSON legible (.ast) o en el formato binario compacto (.astb)"""
+    out_name = output_path(input_path, formato)
+    try:
+        write_ast(ast, out_name, formato)
         print(f"AST guardado en '{out_name}'")
     except Exception as e:
         print("Error al guardar AST:", e)
 
 
+# ---- compilación por lotes ----
+def find_brik_files(entries):
+    """Expande archivos y directorios (recursivamente) a la lista de .brik"""
+    files = []
+    for entry in entries:
+        if os.path.isdir(entry):
+            for root, _, names in os.walk(entry):
+                files.extend(os.path.join(root, n) for n in sorted(names) if n.endswith('.brik'))
+        else:
+            files.append(entry)
+    return files
+
+def parse_file(input_path):
+    """Lee, analiza y valida un .brik; devuelve (AST resuelto, avisos)"""
+    with open(input_path, 'r', encoding='utf-8') as f:
+        ast = Parser(Tokenizer(f.read()).iter_tokens()).parse()
+    return resolve_and_check(ast)
+
+def error_message(e):
+    if isinstance(e, SyntaxError):
+        return "error de sintaxis:\n  " + "\n  ".join(syntax_error_lines(e))
+    if isinstance(e, ValueError) and not isinstance(e, UnicodeDecodeError):
+        return f"error semántico: {e}"
+    return str(e)
+
+def compile_file(input_path, out_dir, formato, force=False):
+    """Compila un .brik; devuelve (ruta, estado, mensaje, avisos) con estado 'ok', 'sin_cambios'
+    o 'error'"""
+    out_name = output_path(input_path, formato, out_dir)
+    try:
+        if not force and os.path.exists(out_name) and \
+                os.path.getmtime(out_name) >= os.path.getmtime(input_path):
+            return input_path, 'sin_cambios', out_name, []
+        ast, warnings = parse_file(input_path)
+        write_ast(ast, out_name, formato)
+        return input_path, 'ok', out_name, warnings
+    except (SyntaxError, ValueError, OSError) as e:
+        return input_path, 'error', error_message(e), []
+
+def load_for_pack(input_path):
+    """Como compile_file, pero devuelve (ruta, estado, AST o mensaje de error, avisos) para un paquete"""
+    try:
+        return (input_path, 'ok') + parse_file(input_path)
+    except (SyntaxError, ValueError, OSError) as e:
+        return input_path, 'error', error_message(e), []
+
+def print_warnings(path, warnings):
+    for warning in warnings:
+        print(f"{path}: aviso: {warning}", file=sys.stderr)
+
+def pack_main(files, out_path, workers, quiet=False):
+    """Compila todos los .brik en un solo paquete de contenido (ver paquete.py)"""
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(load_for_pack, files))
+
+    games = {}
+    errors = 0
+    for path, status, value, warnings in results:
+        if not quiet:
+            print_warnings(path, warnings)
+        key = os.path.splitext(os.path.basename(path))[0]
+        if status == 'ok' and key in games:
+            status, value = 'error', f"ya hay otro juego llamado '{key}' en el paquete"
+        if status == 'error':
+            errors += 1
+            print(f"{path}: {value}", file=sys.stderr)
+        else:
+            games[key] = value
+    if errors:
+        print(f"Paquete no generado: {errors} archivos con errores", file=sys.stderr)
+        return 1
+    try:
+        paquete.guardar_paquete(games, out_path)
+    except (ValueError, OSError) as e:
+        print(f"{out_path}: {e}", file=sys.stderr)
+        return 1
+    if not quiet:
+        print(f"{len(games)} juegos -> {out_path}")
+    return 0
+
+def batch_main(argv):
+    parser = argparse.ArgumentParser(description="Compila archivos .brik a AST sin interacción.")
+    parser.add_argument('entradas', nargs='+', help="archivos .brik o directorios")
+    parser.add_argument('-o', '--salida', default='.', help="directorio de salida")
+    parser.add_argument('-f', '--formato', choices=('json', 'binario'), default='json')
+    parser.add_argument('-j', '--procesos', type=int, default=os.cpu_count())
+    parser.add_argument('-q', '--quiet', action='store_true', help="solo muestra errores")
+    parser.add_argument('--forzar', action='store_true', help="recompila aunque la salida esté al día")
+    parser.add_argument('--paquete', metavar='ARCHIVO',
+                        help="en lugar de un AST por archivo, genera un paquete .brikpak con todos los juegos")
+    args = parser.parse_args(argv)
+
+    files = find_brik_files(args.entradas)
+    if args.paquete:
+        return pack_main(files, args.paquete, args.procesos, args.quiet)
+    # Dos .brik con el mismo nombre en directorios distintos irían al mismo archivo de salida:
+    # se compila el primero y los demás se rechazan antes de repartir el trabajo
+    results = [None] * len(files)
+    owners = {}
+    jobs = []
+    for i, path in enumerate(files):
+        out_name = output_path(path, args.formato, args.salida)
+        owner = owners.setdefault(os.path.normcase(os.path.abspath(out_name)), i)
+        if owner == i:
+            jobs.append(i)
+        elif os.path.realpath(files[owner]) != os.path.realpath(path):
+            results[i] = (path, 'error', f"la salida '{out_name}' ya la genera {files[owner]}", [])
+    os.makedirs(args.salida, exist_ok=True)
+    m = len(jobs)
+    with ProcessPoolExecutor(max_workers=args.procesos) as pool:
+        compiled = pool.map(compile_file, [files[i] for i in jobs], [args.salida] * m,
+                            [args.formato] * m, [args.forzar] * m)
+        for i, result in zip(jobs, compiled):
+            results[i] = result
+    # Un mismo archivo listado dos veces se compila una sola vez
+    results = [r for r in results if r is not None]
+    n = len(results)
+
+    errors = 0
+    for path, status, message, warnings in results:
+        if not args.quiet:
+            print_warnings(path, warnings)
+        if status == 'error':
+            errors += 1
+            print(f"{path}: {message}", file=sys.stderr)
+        elif not args.quiet:
+            print(f"{path} -> {message}" + (" (sin cambios)" if status == 'sin_cambios' else ""))
+    if not args.quiet:
+        compiled = sum(1 for r in results if r[1] == 'ok')
+        print(f"{compiled} compilados, {n - compiled - errors} sin cambios, {errors} con errores")
+    return 1 if errors else 0
+
+
 # ---- main ----
-def main():
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        return batch_main(argv)
+
     path = input("Ingrese el nombre del archivo .brik: ").strip()
     if not path:
         print("No se especificó archivo.")
@@ -190,13 +552,19 @@ def main():
 
     parser = Parser(tokens)
     try:
-        ast = parser.parse()
+        ast, warnings = resolve_and_check(parser.parse())
+        for warning in warnings:
+            print("Aviso:", warning)
         print("\n--- AST construido ---")
         print(json.dumps(ast, indent=4, ensure_ascii=False))
         save_ast(ast, path)
     except SyntaxError as e:
-        print("Error durante el análisis:", e)
+        print("Errores durante el análisis:")
+        for message in syntax_error_lines(e):
+            print("  " + message)
+    except ValueError as e:
+        print("Error semántico:", e)
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,187 @@
+# ast_binario.py
+# Formato binario compacto para el AST de un .brik (extensión .astb)
+# Cada valor lleva un byte de tipo seguido de sus datos (little endian):
+#   d  diccionario: u32 número de claves, luego (clave, valor) con la clave como cadena
+#   l  lista: u32 número de elementos, luego los elementos
+#   s  cadena: u32 longitud en bytes + UTF-8
+#   i  entero: i64
+#   f  real: f64
+#   m  matriz numérica (filas de 0..255 de igual longitud): u16 filas, u16 columnas, un byte por celda
+# Al leer con mmap las matrices se exponen como MatrizBinaria sobre memoryview, sin copiarlas.
+
+import mmap
+import struct
+from collections.abc import Sequence
+
+MAGICO = b'BRKA'
+VERSION = 1
+
+_U16 = struct.Struct('<H')
+_U32 = struct.Struct('<I')
+_I64 = struct.Struct('<q')
+_F64 = struct.Struct('<d')
+
+
+class MatrizBinaria(Sequence):
+    """Matriz de solo lectura sobre un memoryview; cada fila es un memoryview de bytes"""
+
+    __slots__ = ('datos', 'filas', 'columnas')
+
+    def __init__(self, datos, filas, columnas):
+        self.datos = datos
+        self.filas = filas
+        self.columnas = columnas
+
+    def __len__(self):
+        return self.filas
+
+    def __getitem__(self, y):
+        if isinstance(y, slice):
+            return [self[i] for i in range(*y.indices(self.filas))]
+        if y < 0:
+            y += self.filas
+        if not 0 <= y < self.filas:
+            raise IndexError(y)
+        return self.datos[y * self.columnas:(y + 1) * self.columnas]
+
+    def tolist(self):
+        return [list(self[y]) for y in range(self.filas)]
+
+    def __eq__(self, otra):
+        if isinstance(otra, MatrizBinaria):
+            otra = otra.tolist()
+        return self.tolist() == otra
+
+    def __repr__(self):
+        return f"MatrizBinaria({self.tolist()})"
+
+
+# ===== ESCRITURA =====
+def es_matriz(valor):
+    """Lista de filas de enteros 0..255 con la misma longitud"""
+    if not valor or not all(isinstance(fila, list) and fila for fila in valor):
+        return False
+    columnas = len(valor[0])
+    if len(valor) > 0xFFFF or columnas > 0xFFFF:
+        return False
+    return all(
+        len(fila) == columnas and
+        all(type(celda) is int and 0 <= celda <= 255 for celda in fila)
+        for fila in valor
+    )
+
+
+def _codificar(valor, partes):
+    if isinstance(valor, dict):
+        partes.append(b'd' + _U32.pack(len(valor)))
+        for clave, item in valor.items():
+            _codificar_cadena(str(clave), partes)
+            _codificar(item, partes)
+    elif isinstance(valor, MatrizBinaria):
+        partes.append(b'm' + _U16.pack(valor.filas) + _U16.pack(valor.columnas) + bytes(valor.datos))
+    elif isinstance(valor, list):
+        if es_matriz(valor):
+            partes.append(b'm' + _U16.pack(len(valor)) + _U16.pack(len(valor[0])))
+            partes.append(bytes(celda for fila in valor for celda in fila))
+        else:
+            partes.append(b'l' + _U32.pack(len(valor)))
+            for item in valor:
+                _codificar(item, partes)
+    elif isinstance(valor, str):
+        partes.append(b's')
+        _codificar_cadena(valor, partes)
+    elif isinstance(valor, bool):
+        raise TypeError("El AST no admite valores booleanos.")
+    elif isinstance(valor, int):
+        partes.append(b'i' + _I64.pack(valor))
+    elif isinstance(valor, float):
+        partes.append(b'f' + _F64.pack(valor))
+    else:
+        raise TypeError(f"Tipo no serializable en el AST: {type(valor).__name__}")
+
+
+def _codificar_cadena(texto, partes):
+    datos = texto.encode('utf-8')
+    partes.append(_U32.pack(len(datos)) + datos)
+
+
+def volcar(ast):
+    """Serializa el AST a bytes"""
+    partes = [MAGICO, bytes([VERSION])]
+    _codificar(ast, partes)
+    return b''.join(partes)
+
+
+def guardar(ast, ruta):
+    with open(ruta, 'wb') as f:
+        f.write(volcar(ast))
+
+
+# ===== LECTURA =====
+def _decodificar(vista, pos):
+    tipo = vista[pos]
+    pos += 1
+    if tipo == 0x64:  # d
+        (cantidad,) = _U32.unpack_from(vista, pos)
+        pos += 4
+        resultado = {}
+        for _ in range(cantidad):
+            clave, pos = _decodificar_cadena(vista, pos)
+            resultado[clave], pos = _decodificar(vista, pos)
+        return resultado, pos
+    if tipo == 0x6C:  # l
+        (cantidad,) = _U32.unpack_from(vista, pos)
+        pos += 4
+        resultado = []
+        for _ in range(cantidad):
+            item, pos = _decodificar(vista, pos)
+            resultado.append(item)
+        return resultado, pos
+    if tipo == 0x6D:  # m
+        (filas,) = _U16.unpack_from(vista, pos)
+        (columnas,) = _U16.unpack_from(vista, pos + 2)
+        pos += 4
+        fin = pos + filas * columnas
+        return MatrizBinaria(vista[pos:fin], filas, columnas), fin
+    if tipo == 0x73:  # s
+        return _decodificar_cadena(vista, pos)
+    if tipo == 0x69:  # i
+        return _I64.unpack_from(vista, pos)[0], pos + 8
+    if tipo == 0x66:  # f
+        return _F64.unpack_from(vista, pos)[0], pos + 8
+    raise ValueError(f"AST binario corrupto: tipo desconocido {tipo} en el byte {pos - 1}.")
+
+
+def _decodificar_cadena(vista, pos):
+    (longitud,) = _U32.unpack_from(vista, pos)
+    pos += 4
+    return str(vista[pos:pos + longitud], 'utf-8'), pos + longitud
+
+
+def leer(datos):
+    """Deserializa un AST binario desde bytes, bytearray, mmap o memoryview"""
+    vista = memoryview(datos)
+    if vista[:4] != MAGICO:
+        raise ValueError("No es un AST binario (cabecera incorrecta).")
+    if vista[4] != VERSION:
+        raise ValueError(f"Versión de AST binario no soportada: {vista[4]}.")
+    ast, _ = _decodificar(vista, 5)
+    return ast
+
+
+def cargar(ruta):
+    """Carga un .astb con mmap; las matrices quedan como vistas sobre el archivo mapeado"""
+    with open(ruta, 'rb') as f:
+        mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return leer(mapa)
+
+
+def a_python(valor):
+    """Convierte las MatrizBinaria a listas (por ejemplo para exportar a JSON)"""
+    if isinstance(valor, dict):
+        return {clave: a_python(item) for clave, item in valor.items()}
+    if isinstance(valor, list):
+        return [a_python(item) for item in valor]
+    if isinstance(valor, MatrizBinaria):
+        return valor.tolist()
+    return valor
@@ -0,0 +1,3 @@
+# benchmarks
+# Suite de rendimiento del analizador y del runtime con cargas sintéticas.
+# Uso (desde "Entrega 2"): python -m benchmarks [--rapido] [--json resultados.json] [--base anterior.json]
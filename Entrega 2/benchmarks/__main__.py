@@ -0,0 +1,315 @@
+# benchmarks/__main__.py
+# Ejecuta la suite y la compara opcionalmente con una ejecución anterior
+# Uso: python -m benchmarks [--rapido] [--filtro texto] [--json salida.json] [--base anterior.json] [--umbral 1.25]
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+from analizador import Parser, Tokenizer
+from runtime import cargar_juego
+from terminal import RenderizadorANSI
+
+from benchmarks.sinteticos import (cargar_grid, generar_brik, generar_brik_anidado, juego_snake,
+                                   juego_tetris)
+
+RUTA_TETRIS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tetris.brik')
+TIEMPO_MINIMO = 0.2     # Segundos por repetición, como mínimo, al calibrar el número de llamadas
+
+
+# ===== MEDICIÓN =====
+def medir(funcion, preparar=None, numero=None, repeticiones=5):
+    """Mejor tiempo por llamada de funcion(estado) en segundos.
+    preparar() crea el estado de cada repetición y no se cronometra. Si no se indica
+    numero, se calibra para que cada repetición dure al menos TIEMPO_MINIMO"""
+    reloj = time.perf_counter
+    if numero is None:
+        numero = 1
+        while True:
+            estado = preparar() if preparar else None
+            inicio = reloj()
+            for _ in range(numero):
+                funcion(estado)
+            if reloj() - inicio >= TIEMPO_MINIMO or numero >= 1 << 20:
+                break
+            numero *= 4
+
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        estado = preparar() if preparar else None
+        inicio = reloj()
+        for _ in range(numero):
+            funcion(estado)
+        mejor = min(mejor, reloj() - inicio)
+    return mejor / numero, numero
+
+
+# ===== CASOS =====
+# Cada caso es (grupo, parámetros, construir); construir() crea la carga del caso y devuelve
+# (preparar, función, numero, repeticiones). Así --filtro descarta un caso por su nombre sin
+# generar su carga (por ejemplo un tablero de 1000x1000)
+
+def una_vez(construir):
+    """Carga compartida por varios casos: se construye la primera vez que se pide"""
+    cache = []
+
+    def obtener():
+        if not cache:
+            cache.append(construir())
+        return cache[0]
+    return obtener
+
+
+def casos_analizador(rapido):
+    for num_piezas in (10, 100, 1000) if rapido else (10, 100, 1000, 5000):
+        def fuente_y_tokens(n=num_piezas):
+            fuente = generar_brik(n)
+            return fuente, Tokenizer(fuente).tokenize()
+        carga = una_vez(fuente_y_tokens)
+
+        def caso(operacion, carga=carga, n=num_piezas):
+            # El tamaño se añade a los parámetros al construir: sale en los resultados pero no
+            # forma parte del nombre del caso
+            parametros = {'piezas': n}
+
+            def construir():
+                fuente, tokens = carga()
+                parametros.update(bytes=len(fuente), tokens=len(tokens))
+                if operacion == 'tokenize':
+                    return None, lambda _: Tokenizer(fuente).tokenize(), None, 5
+                return None, lambda _: Parser(tokens).parse(), None, 5
+            return operacion, parametros, construir
+        yield caso('tokenize')
+        yield caso('parse')
+
+    for profundidad in (10, 100, 1000) if rapido else (10, 100, 1000, 100000):
+        def parse_anidado(profundidad=profundidad):
+            tokens = Tokenizer(generar_brik_anidado(profundidad)).tokenize()
+            return None, lambda _: Parser(tokens).parse(), None, 5
+        yield ('parse_anidado', {'profundidad': profundidad}, parse_anidado)
+
+
+def casos_tetris(datos_tetris, rapido):
+    tamanos = ((10, 20), (100, 200)) if rapido else ((10, 20), (100, 200), (1000, 1000))
+    for ancho, alto in tamanos:
+        for bitboard in (False, True):
+            parametros = {'ancho': ancho, 'alto': alto, 'bitboard': bitboard}
+
+            def crear_juego(ancho=ancho, alto=alto, bitboard=bitboard):
+                juego = juego_tetris(datos_tetris, ancho, alto, bitboard)
+                juego.pieza_y = alto // 2 - 2   # Justo sobre la zona ocupada
+                return juego
+            juego = una_vez(crear_juego)
+
+            def metodo(nombre, juego=juego):
+                def construir():
+                    return None, lambda _, f=getattr(juego(), nombre): f(), None, 5
+                return construir
+            yield ('verificar_colision_tetris', parametros, metodo('verificar_colision_tetris'))
+            yield ('fila_aterrizaje', parametros, metodo('fila_aterrizaje'))
+
+            # Tomar y restaurar una instantánea no depende del tamaño del tablero
+            def instantanea(juego=juego):
+                j = juego()
+                return None, lambda _: j.restaurar(j.instantanea()), None, 5
+            yield ('instantanea', parametros, instantanea)
+
+            # Sin filas completas: solo el recorrido del tablero
+            yield ('verificar_lineas_completas', dict(parametros, lineas=0),
+                   metodo('verificar_lineas_completas'))
+
+            # Cuatro filas completas en el fondo (el tablero se regenera en cada llamada)
+            def lineas_completas(juego=juego, ancho=ancho, alto=alto):
+                j = juego()
+                grid = (j.tablero.a_grid() if j.tablero else j.grid)
+                grid = [list(fila) for fila in grid]
+                for y in range(alto - 4, alto):
+                    grid[y] = [1] * ancho
+
+                def preparar_lineas():
+                    cargar_grid(j, grid)
+                    return j
+                return (preparar_lineas, lambda j: j.verificar_lineas_completas(), 1,
+                        50 if ancho * alto < 100000 else 5)
+            yield ('verificar_lineas_completas', dict(parametros, lineas=4), lineas_completas)
+
+
+def casos_snake(rapido):
+    ancho, alto = (200, 200) if rapido else (1000, 1000)
+    pasos = 100
+    for longitud in (10, 1000, 10000) if rapido else (10, 1000, 100000):
+        def mover_serpiente(longitud=longitud):
+            def preparar():
+                return juego_snake(ancho, alto, longitud)
+
+            def mover(juego):
+                for _ in range(pasos):
+                    juego.mover_serpiente()
+            return preparar, mover, 1, 5
+        yield ('mover_serpiente', {'ancho': ancho, 'alto': alto, 'longitud': longitud, 'pasos': pasos},
+               mover_serpiente)
+
+    # Instantánea, restaurar y un paso: el paso separa el juego de la instantánea, y eso copia
+    # las listas de bloques del cuerpo y del índice de celdas libres más los bloques que toca,
+    # no el tablero ni la serpiente, así que no debe crecer con la longitud
+    tamanos = ((20, 20), (200, 200)) if rapido else ((20, 20), (1000, 1000))
+    for ancho_instantanea, alto_instantanea in tamanos:
+        for longitud in (10, ancho_instantanea * alto_instantanea // 5):
+            def instantanea(ancho=ancho_instantanea, alto=alto_instantanea, longitud=longitud):
+                j = juego_snake(ancho, alto, longitud)
+
+                def instantanea_y_paso(_):
+                    instantanea = j.instantanea()
+                    j.mover_serpiente()
+                    j.restaurar(instantanea)
+                return None, instantanea_y_paso, None, 5
+            yield ('instantanea', {'ancho': ancho_instantanea, 'alto': alto_instantanea, 'longitud': longitud},
+                   instantanea)
+
+    ancho, alto = 200, 200
+    for ocupacion in (0.1, 0.5, 0.9, 0.999):
+        def generar_comida(ocupacion=ocupacion):
+            j = juego_snake(ancho, alto, int(ancho * alto * ocupacion))
+            return None, lambda _: j.generar_comida(), None, 5
+        yield ('generar_comida', {'ancho': ancho, 'alto': alto, 'ocupacion': ocupacion}, generar_comida)
+
+
+def casos_dibujar(datos_tetris, rapido):
+    tamanos = ((10, 20), (100, 200)) if rapido else ((10, 20), (100, 200), (1000, 1000))
+
+    def diferencial(j, paso):
+        # La pieza va y viene: cada cuadro cambia unas pocas celdas
+        paso[0] = -paso[0]
+        j.pieza_x += paso[0]
+        j.dibujar()
+
+    def crear_juego(ancho, alto, tam_vista=None):
+        juego = juego_tetris(datos_tetris, ancho, alto)
+        juego.tam_vista = tam_vista
+        juego.renderizador = RenderizadorANSI(escribir=lambda texto: None)
+        return juego
+
+    for ancho, alto in tamanos:
+        juego = una_vez(lambda ancho=ancho, alto=alto: crear_juego(ancho, alto))
+
+        def completo(juego=juego):
+            j = juego()
+
+            def dibujar_completo(_):
+                j.renderizador.invalidar()
+                j.dibujar()
+            return None, dibujar_completo, None, 5
+
+        def parcial(juego=juego):
+            j = juego()
+            j.dibujar()
+            return None, lambda _, paso=[1]: diferencial(j, paso), None, 5
+
+        # Ventana de 40x30 celdas que sigue a la pieza, como en una terminal normal
+        def vista(ancho=ancho, alto=alto):
+            j = crear_juego(ancho, alto, (40, 30))
+            j.dibujar()
+            return None, lambda _, paso=[1]: diferencial(j, paso), None, 5
+
+        parametros = {'ancho': ancho, 'alto': alto}
+        yield ('dibujar', dict(parametros, modo='completo'), completo)
+        yield ('dibujar', dict(parametros, modo='diferencial'), parcial)
+        yield ('dibujar', dict(parametros, modo='vista'), vista)
+
+
+def todos_los_casos(rapido):
+    datos_tetris, _ = cargar_juego(RUTA_TETRIS)
+    yield from casos_analizador(rapido)
+    yield from casos_tetris(datos_tetris, rapido)
+    yield from casos_snake(rapido)
+    yield from casos_dibujar(datos_tetris, rapido)
+
+
+# ===== INFORME =====
+def nombre_caso(grupo, parametros):
+    return grupo + "[" + ",".join(f"{clave}={valor}" for clave, valor in parametros.items()) + "]"
+
+
+def formatear_tiempo(segundos):
+    if segundos < 1e-3:
+        return f"{segundos * 1e6:9.2f} µs"
+    if segundos < 1:
+        return f"{segundos * 1e3:9.2f} ms"
+    return f"{segundos:9.3f} s "
+
+
+def comparar(resultados, base, umbral):
+    """Devuelve la lista de casos más lentos que la base por encima del umbral"""
+    regresiones = []
+    for nombre, resultado in resultados.items():
+        anterior = base.get(nombre)
+        if not anterior or not anterior['segundos']:
+            continue
+        razon = resultado['segundos'] / anterior['segundos']
+        resultado['razon_base'] = razon
+        if razon > umbral:
+            regresiones.append(nombre)
+    return regresiones
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks del analizador y del runtime.")
+    parser.add_argument('--rapido', action='store_true', help="omite los tamaños más grandes")
+    parser.add_argument('--filtro', default='', help="solo los casos cuyo nombre contenga este texto")
+    parser.add_argument('--json', metavar='ARCHIVO', help="guarda los resultados en JSON")
+    parser.add_argument('--base', metavar='ARCHIVO', help="resultados JSON anteriores para comparar")
+    parser.add_argument('--umbral', type=float, default=1.25,
+                        help="razón tiempo/base a partir de la cual se marca una regresión")
+    args = parser.parse_args(argv)
+
+    base = {}
+    if args.base:
+        try:
+            with open(args.base, 'r', encoding='utf-8') as f:
+                base = json.load(f)['resultados']
+        except (IOError, ValueError, KeyError) as e:
+            print(f"Error: No se pudo leer la base {args.base}: {e}")
+            return 1
+
+    resultados = {}
+    for grupo, parametros, construir in todos_los_casos(args.rapido):
+        nombre = nombre_caso(grupo, parametros)
+        if args.filtro not in nombre:
+            continue
+        preparar, funcion, numero, repeticiones = construir()
+        segundos, numero = medir(funcion, preparar, numero, repeticiones)
+        resultados[nombre] = {
+            'grupo': grupo,
+            'parametros': parametros,
+            'segundos': segundos,
+            'llamadas': numero,
+        }
+        linea = f"{nombre:70} {formatear_tiempo(segundos)}"
+        if nombre in base and base[nombre]['segundos']:
+            linea += f"  x{segundos / base[nombre]['segundos']:.2f}"
+        print(linea, flush=True)
+
+    regresiones = comparar(resultados, base, args.umbral)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({
+                'python': sys.version.split()[0],
+                'plataforma': platform.platform(),
+                'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'resultados': resultados,
+            }, f, indent=2, ensure_ascii=False)
+
+    if regresiones:
+        print(f"\n{len(regresiones)} regresiones (más de x{args.umbral:.2f} respecto a la base):")
+        for nombre in regresiones:
+            print(f"  {nombre}: x{resultados[nombre]['razon_base']:.2f}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+# benchmarks/sinteticos.py
+# Generadores de cargas sintéticas: .brik grandes o muy anidados, tableros llenos y serpientes largas
+# Todo es determinista (random.Random con semilla) para que las mediciones sean comparables.
+
+import random
+
+from runtime import Juego
+
+# Rotaciones 4x4 tomadas al azar para las piezas sintéticas
+FORMAS = (
+    [[0,0,0,0], [1,1,1,1], [0,0,0,0], [0,0,0,0]],
+    [[1,1], [1,1]],
+    [[0,1,0], [1,1,1], [0,0,0]],
+    [[1,0,0], [1,1,1], [0,0,0]],
+    [[0,1,1], [1,1,0], [0,0,0]],
+)
+
+
+def matriz_brik(matriz):
+    return "[" + ", ".join("[" + ",".join(str(celda) for celda in fila) + "]" for fila in matriz) + "]"
+
+
+def generar_brik(num_piezas, semilla=0):
+    """Un .brik de Tetris con num_piezas piezas de 1 a 4 rotaciones cada una"""
+    rng = random.Random(semilla)
+    lineas = [
+        '# Tetris sintético para benchmarks',
+        'nombre_juego = "Sintetico"',
+        'tablero = { "ancho": 10, "alto": 20 }',
+        'velocidad_inicial = 1.0',
+        'piezas = {',
+    ]
+    for i in range(num_piezas):
+        rotaciones = ", ".join(matriz_brik(rng.choice(FORMAS)) for _ in range(rng.randint(1, 4)))
+        separador = "," if i < num_piezas - 1 else ""
+        lineas.append(f'    "P{i}": {{ "color": "c{i % 8}", "rotaciones": [{rotaciones}] }}{separador}')
+    lineas.append('}')
+    lineas.append('regla_linea_completa = { "evento": "linea_completada", "puntos_por_linea_despejada": 100 }')
+    return "\n".join(lineas) + "\n"
+
+
+def generar_brik_anidado(profundidad):
+    """Un .brik con un bloque anidado profundidad niveles (alternando bloques y listas)"""
+    apertura, cierre = [], []
+    for nivel in range(profundidad):
+        if nivel % 2 == 0:
+            apertura.append(f'{{ "n{nivel}": ')
+            cierre.append(' }')
+        else:
+            apertura.append('[1, ')
+            cierre.append(']')
+    return 'anidado = ' + "".join(apertura) + '0' + "".join(reversed(cierre)) + "\n"
+
+
+def datos_tetris(datos_base, ancho, alto):
+    """Copia del AST de Tetris con otro tamaño de tablero"""
+    datos = dict(datos_base)
+    datos['tablero'] = {'ancho': ancho, 'alto': alto}
+    return datos
+
+
+def juego_tetris(datos_base, ancho, alto, bitboard=False, relleno=0.5, semilla=0):
+    """Juego de Tetris cuya mitad inferior está llena al azar (sin filas completas)"""
+    juego = Juego(datos_tetris(datos_base, ancho, alto), semilla=semilla, bitboard=bitboard)
+    rng = random.Random(semilla)
+    grid = [[0] * ancho for _ in range(alto)]
+    for y in range(alto // 2, alto):
+        fila = grid[y]
+        for x in range(ancho):
+            fila[x] = 1 if rng.random() < relleno else 0
+        fila[rng.randrange(ancho)] = 0
+    cargar_grid(juego, grid)
+    return juego
+
+
+def cargar_grid(juego, grid):
+    """Sustituye el tablero del juego (listas o bits) por el grid dado"""
+    juego.separar()
+    if juego.tablero:
+        juego.tablero.filas = [
+            juego.tablero.vacia | sum(1 << (juego.tablero.margen + x) for x, celda in enumerate(fila) if celda)
+            for fila in grid
+        ]
+    else:
+        juego.grid = [tuple(fila) for fila in grid]
+    juego.recalcular_alturas()
+
+
+def juego_snake(ancho, alto, longitud, semilla=0):
+    """Juego de Snake con una serpiente en zigzag de longitud celdas en la parte inferior
+    del tablero y la cabeza en la fila superior del zigzag mirando hacia arriba"""
+    datos = {'nombre_juego': 'Snake sintetico', 'tablero': {'ancho': ancho, 'alto': alto},
+             'serpiente': {}, 'longitud_inicial': 1}
+    juego = Juego(datos, semilla=semilla)
+    celdas = []
+    y = alto - 1
+    while len(celdas) < longitud:
+        xs = range(ancho) if (alto - 1 - y) % 2 == 0 else range(ancho - 1, -1, -1)
+        celdas.extend((x, y) for x in xs)
+        y -= 1
+    celdas = celdas[:longitud]
+    celdas.reverse()  # La cabeza es la última celda recorrida
+
+    while juego.serpiente_cuerpo:
+        segmento = juego.serpiente_cuerpo.quitar_cola()
+        if segmento[0] >= 0:
+            juego.celdas_libres.liberar(segmento)
+    for segmento in reversed(celdas):
+        juego.serpiente_cuerpo.agregar_cabeza(segmento)
+    for segmento in celdas:
+        juego.celdas_libres.ocupar(segmento)
+    juego.serpiente_direccion = (0, -1)
+    cabeza_x = celdas[0][0]
+    juego.posicion_comida = ((cabeza_x + ancho // 2) % ancho, 0)  # Fuera del camino de la cabeza
+    return juego
@@ -0,0 +1,262 @@
+# busqueda.py
+# Búsqueda de colocaciones de Tetris para bots y pistas
+# Enumera cada (rotación, columna) alcanzable de la pieza (rotar en el sitio, desplazarse a la misma
+# altura y dejar caer), puntúa el tablero resultante con una heurística intercambiable y puede mirar
+# 1 o 2 piezas por delante (la siguiente pieza es desconocida: se promedia sobre todas).
+# Trabaja sobre filas de bits como TableroBits; una caché de transposición por tablero evita
+# reevaluar tableros idénticos, y BusquedaIncremental reparte el trabajo entre cuadros.
+
+import time
+from dataclasses import dataclass
+
+from tablero_bits import TableroBits
+
+# Pesos de la heurística lineal por defecto (altura total, líneas, huecos, irregularidad)
+PESOS_POR_DEFECTO = {
+    'altura_total': -0.510066,
+    'lineas': 0.760666,
+    'huecos': -0.35663,
+    'irregularidad': -0.184483,
+}
+VALOR_DERROTA = float('-inf')
+MAX_CACHE = 200000
+
+
+@dataclass(frozen=True, slots=True)
+class Colocacion:
+    rotacion: int           # Índice de rotación de la pieza
+    x: int                  # pieza_x final
+    y: int                  # pieza_y de aterrizaje
+    lineas: int             # Líneas que elimina
+    valor: float            # Puntuación según la heurística (y la búsqueda en profundidad)
+
+
+def heuristica_lineal(pesos=None):
+    """Heurística clásica: combinación lineal de las características del tablero"""
+    pesos = pesos or PESOS_POR_DEFECTO
+    elementos = tuple(pesos.items())
+
+    def heuristica(caracteristicas):
+        return sum(peso * caracteristicas[nombre] for nombre, peso in elementos)
+    return heuristica
+
+
+class Buscador:
+    def __init__(self, piezas, ancho, alto, heuristica=None, profundidad=1, margen=None):
+        self.piezas = piezas
+        self.ancho = ancho
+        self.alto = alto
+        self.heuristica = heuristica or heuristica_lineal()
+        self.profundidad = profundidad
+        self.margen = margen if margen is not None else max(
+            rotacion.max_x + 1 for pieza in piezas.values() for rotacion in pieza.rotaciones
+        )
+        self.vacia = TableroBits(ancho, alto, self.margen).vacia
+        self.llena = (1 << (2 * self.margen + ancho)) - 1
+        self.mascara = ((1 << ancho) - 1) << self.margen
+        self.cache = {}
+        self.evaluadas = 0
+
+    # ===== TABLERO =====
+    def filas_de(self, juego):
+        """Filas de bits del tablero del juego, con el margen del buscador"""
+        if juego.tablero and juego.tablero.margen == self.margen:
+            return tuple(juego.tablero.filas)
+        grid = juego.tablero.a_grid() if juego.tablero else juego.grid
+        return tuple(TableroBits.desde_grid(grid, self.margen).filas)
+
+    def topes(self, filas):
+        """Fila de la celda ocupada más alta de cada columna (alto si está vacía)"""
+        topes = [self.alto] * self.ancho
+        pendientes = self.mascara
+        for y, fila in enumerate(filas):
+            nuevas = fila & pendientes
+            while nuevas:
+                bit = nuevas & -nuevas
+                topes[bit.bit_length() - 1 - self.margen] = y
+                nuevas ^= bit
+            pendientes &= ~fila
+            if not pendientes:
+                break
+        return topes
+
+    def caracteristicas(self, filas, lineas):
+        """Altura total, huecos (celdas vacías con algo encima) e irregularidad entre columnas"""
+        mascara = self.mascara
+        cubiertas = 0
+        huecos = 0
+        for fila in filas:
+            celdas = fila & mascara
+            if cubiertas:
+                huecos += (cubiertas & ~celdas).bit_count()
+            cubiertas |= celdas
+        alturas = [self.alto - tope for tope in self.topes(filas)]
+        return {
+            'altura_total': sum(alturas),
+            'altura_maxima': max(alturas),
+            'huecos': huecos,
+            'irregularidad': sum(abs(a - b) for a, b in zip(alturas, alturas[1:])),
+            'lineas': lineas,
+        }
+
+    # ===== COLOCACIONES =====
+    def colisiona(self, filas, mascaras, x, y):
+        desplazamiento = x + self.margen
+        if desplazamiento < 0:
+            return True
+        for dy, mascara in mascaras:
+            fila_y = y + dy
+            if fila_y >= self.alto:
+                return True
+            fila = filas[fila_y] if fila_y >= 0 else self.vacia
+            if fila & (mascara << desplazamiento):
+                return True
+        return False
+
+    def aterrizaje(self, filas, topes, rotacion, x, y):
+        """pieza_y final al dejar caer la rotación desde (x, y); O(ancho) salvo bajo salientes"""
+        resultado = self.alto
+        for dx, dy in rotacion.perfil:
+            tope = topes[x + dx]
+            if y + dy >= tope:
+                while not self.colisiona(filas, rotacion.mascaras, x, y + 1):
+                    y += 1
+                return y
+            if tope - 1 - dy < resultado:
+                resultado = tope - 1 - dy
+        return resultado
+
+    def colocar(self, filas, rotacion, x, y):
+        """Devuelve (filas, lineas) tras fijar la rotación en (x, y) y eliminar líneas completas"""
+        nuevas = list(filas)
+        desplazamiento = x + self.margen
+        for dy, mascara in rotacion.mascaras:
+            if 0 <= y + dy < self.alto:
+                nuevas[y + dy] |= mascara << desplazamiento
+        restantes = [fila for fila in nuevas if fila != self.llena]
+        lineas = self.alto - len(restantes)
+        if lineas:
+            restantes = [self.vacia] * lineas + restantes
+        return tuple(restantes), lineas
+
+    def colocaciones(self, filas, pieza, rotacion_inicio, x_inicio, y):
+        """Genera (rotación, x, y_final, filas_resultado, lineas) de cada colocación alcanzable:
+        girar en (x_inicio, y), desplazarse lateralmente a la misma altura y dejar caer.
+        Las colocaciones que dejan un tablero ya visto se omiten"""
+        topes = self.topes(filas)
+        vistos = set()
+        rotaciones = pieza.rotaciones
+        r = rotacion_inicio
+        for _ in range(len(rotaciones)):
+            rotacion = rotaciones[r]
+            if self.colisiona(filas, rotacion.mascaras, x_inicio, y):
+                break  # Rotar en el sitio queda bloqueado: las siguientes tampoco son alcanzables
+            for direccion in (-1, 1):
+                x = x_inicio if direccion == -1 else x_inicio + 1
+                while not self.colisiona(filas, rotacion.mascaras, x, y):
+                    y_final = self.aterrizaje(filas, topes, rotacion, x, y)
+                    resultado, lineas = self.colocar(filas, rotacion, x, y_final)
+                    if resultado not in vistos:
+                        vistos.add(resultado)
+                        yield r, x, y_final, resultado, lineas
+                    x += direccion
+            r = (r + 1) % len(rotaciones)
+
+    # ===== BÚSQUEDA =====
+    def valor(self, filas, pieza, profundidad, lineas_previas):
+        """Mejor valor alcanzable con la pieza dada (saliendo de su posición inicial)"""
+        clave = (filas, pieza.nombre, profundidad, lineas_previas)
+        valor = self.cache.get(clave)
+        if valor is not None:
+            return valor
+        rotacion = pieza.rotaciones[0]
+        mejor = VALOR_DERROTA
+        for _, _, _, resultado, lineas in self.colocaciones(filas, pieza, 0, rotacion.columna_inicio, 0):
+            valor = self.evaluar(resultado, lineas_previas + lineas, profundidad - 1)
+            if valor > mejor:
+                mejor = valor
+        if len(self.cache) >= MAX_CACHE:
+            self.cache.clear()
+        self.cache[clave] = mejor
+        return mejor
+
+    def evaluar(self, filas, lineas, profundidad):
+        """Valor del tablero: heurística directa o promedio sobre la siguiente pieza"""
+        self.evaluadas += 1
+        if profundidad <= 0:
+            return self.heuristica(self.caracteristicas(filas, lineas))
+        valores = [self.valor(filas, pieza, profundidad, lineas) for pieza in self.piezas.values()]
+        return sum(valores) / len(valores)
+
+    def mejor(self, juego):
+        """Mejor Colocacion para la pieza actual del juego, o None si no hay ninguna"""
+        busqueda = BusquedaIncremental(self, juego)
+        busqueda.avanzar()
+        return busqueda.resultado
+
+
+class BusquedaIncremental:
+    """Búsqueda repartida en varios pasos: avanzar(presupuesto) evalúa colocaciones de la pieza
+    actual hasta agotar el presupuesto y se puede retomar en el cuadro siguiente"""
+
+    def __init__(self, buscador, juego):
+        self.buscador = buscador
+        self.numero_pieza = juego.piezas_generadas
+        self.filas = buscador.filas_de(juego)
+        self.pendientes = buscador.colocaciones(
+            self.filas, juego.pieza_actual, juego.pieza_rotacion, juego.pieza_x, juego.pieza_y)
+        self.resultado = None
+        self.terminada = False
+
+    def avanzar(self, presupuesto=None):
+        """Evalúa colocaciones durante presupuesto segundos (None = hasta terminar).
+        Devuelve True cuando la búsqueda ha terminado"""
+        limite = None if presupuesto is None else time.perf_counter() + presupuesto
+        buscador = self.buscador
+        for r, x, y, resultado, lineas in self.pendientes:
+            valor = buscador.evaluar(resultado, lineas, buscador.profundidad - 1)
+            if self.resultado is None or valor > self.resultado.valor:
+                self.resultado = Colocacion(r, x, y, lineas, valor)
+            if limite is not None and time.perf_counter() >= limite:
+                return False
+        self.terminada = True
+        return True
+
+
+def acciones_hacia(juego, colocacion):
+    """Siguiente acción para llevar la pieza actual a la colocación (None si ya está)"""
+    if juego.pieza_rotacion != colocacion.rotacion:
+        return 'rotar'
+    if juego.pieza_x < colocacion.x:
+        return 'mover_derecha'
+    if juego.pieza_x > colocacion.x:
+        return 'mover_izquierda'
+    return 'soltar'
+
+
+def crear_politica_busqueda(profundidad=1, heuristica=None):
+    """Política para torneo.py: busca la mejor colocación al aparecer cada pieza y la ejecuta"""
+    estado = {'buscador': None, 'pieza': None, 'objetivo': None}
+
+    def politica(juego):
+        buscador = estado['buscador']
+        if buscador is None or buscador.piezas is not juego.piezas:
+            buscador = estado['buscador'] = Buscador(
+                juego.piezas, juego.ancho, juego.alto, heuristica, profundidad, juego.margen_bits)
+        if estado['pieza'] != juego.piezas_generadas:
+            # Pieza nueva: se planifica desde su posición de aparición
+            estado['pieza'] = juego.piezas_generadas
+            estado['objetivo'] = buscador.mejor(juego)
+        objetivo = estado['objetivo']
+        if objetivo is None:
+            return None
+        accion = acciones_hacia(juego, objetivo)
+        if accion != 'soltar' and juego.pieza_y > objetivo.y:
+            return 'soltar'  # La gravedad adelantó el plan: se suelta donde esté
+        return accion
+
+    def reiniciar(semilla=None):
+        """Nueva partida: se olvida el plan (el buscador y su caché se conservan)"""
+        estado['pieza'] = estado['objetivo'] = None
+    politica.reiniciar = reiniciar
+    return politica
@@ -0,0 +1,67 @@
+# cache_juego.py
+# Caché en disco de juegos .brik compilados
+# Igual que __pycache__: junto al .brik se guarda __brikcache__/<nombre>.v<version>.<hash>.pickle con el
+# AST y las piezas ya validadas. Solo se recompila cuando cambia el contenido del .brik.
+
+import hashlib
+import os
+import pickle
+import re
+
+from analizador import Parser, Tokenizer
+from semantica import analizar_juego
+
+DIRECTORIO_CACHE = '__brikcache__'
+# Cambiar al modificar el formato de lo que se guarda (AST o piezas compiladas)
+VERSION_CACHE = 2
+
+
+def compilar_brik(source):
+    """Analiza y valida un .brik; devuelve el diccionario que se guarda en caché.
+    datos_juego conserva las referencias sin resolver (ver semantica.py)"""
+    datos_juego = Parser(Tokenizer(source).iter_tokens()).parse()
+    config = analizar_juego(datos_juego)
+    return {'datos_juego': datos_juego, 'piezas': config.piezas}
+
+
+def ruta_cache(ruta, contenido, directorio=None):
+    huella = hashlib.sha256(contenido).hexdigest()[:16]
+    directorio = directorio or os.path.join(os.path.dirname(os.path.abspath(ruta)), DIRECTORIO_CACHE)
+    nombre, _ = os.path.splitext(os.path.basename(ruta))
+    return os.path.join(directorio, f"{nombre}.v{VERSION_CACHE}.{huella}.pickle")
+
+
+def cargar_brik(ruta, directorio=None):
+    """Devuelve {'datos_juego', 'piezas'} de un .brik usando la caché si está al día"""
+    with open(ruta, 'rb') as f:
+        contenido = f.read()
+    destino = ruta_cache(ruta, contenido, directorio)
+
+    try:
+        with open(destino, 'rb') as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        pass  # No hay caché válida: se recompila
+
+    compilado = compilar_brik(contenido.decode('utf-8'))
+    guardar_cache(destino, compilado)
+    return compilado
+
+
+def guardar_cache(destino, compilado):
+    """Escribe la caché de forma atómica y borra las versiones anteriores del mismo archivo.
+    Si no se puede escribir (directorio de solo lectura) se continúa sin caché"""
+    directorio = os.path.dirname(destino)
+    nombre = os.path.basename(destino).rsplit('.', 3)[0]
+    anteriores = re.compile(re.escape(nombre) + r'\.v\d+\.[0-9a-f]{16}\.pickle$')
+    try:
+        os.makedirs(directorio, exist_ok=True)
+        temporal = f"{destino}.{os.getpid()}.tmp"
+        with open(temporal, 'wb') as f:
+            pickle.dump(compilado, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporal, destino)
+        for archivo in os.listdir(directorio):
+            if anteriores.match(archivo) and os.path.join(directorio, archivo) != destino:
+                os.remove(os.path.join(directorio, archivo))
+    except OSError:
+        pass
@@ -0,0 +1,95 @@
+# celdas_libres.py
+# Índice de celdas libres del tablero con altas, bajas y muestreo aleatorio en O(1)
+# Cada celda (x, y) se guarda como el entero y * ancho + x.
+# Las dos tablas del índice se guardan en bloques de "ancho" entradas (uno por fila del tablero,
+# como el grid de Tetris): copia() solo copia la lista de bloques y cada copia duplica un bloque
+# la primera vez que lo modifica, así que copiar el índice tras una instantánea cuesta O(alto) y
+# cada movimiento posterior solo copia los bloques que toca.
+
+class CeldasLibres:
+    def __init__(self, ancho, alto):
+        self.ancho = ancho
+        self.alto = alto
+        filas = [list(range(y * ancho, (y + 1) * ancho)) for y in range(alto)]
+        self.libres = ancho * alto
+        # celdas: las celdas libres en bloques de ancho (el último puede estar incompleto)
+        self.celdas = filas
+        # posicion[y][x] = índice de la celda dentro de celdas, o -1 si está ocupada
+        self.posicion = [fila[:] for fila in filas]
+        # Bloques que pertenecen a este índice (los demás se comparten con alguna copia)
+        self.celdas_propias = set(range(alto))
+        self.posicion_propias = set(range(alto))
+
+    def copia(self):
+        """Copia independiente del índice; comparte los bloques hasta que alguno se modifica"""
+        nueva = CeldasLibres.__new__(CeldasLibres)
+        nueva.ancho = self.ancho
+        nueva.alto = self.alto
+        nueva.libres = self.libres
+        nueva.celdas = self.celdas[:]
+        nueva.posicion = self.posicion[:]
+        nueva.celdas_propias = set()
+        nueva.posicion_propias = set()
+        self.celdas_propias = set()
+        self.posicion_propias = set()
+        return nueva
+
+    def bloque_celdas(self, b):
+        """Bloque b de celdas listo para modificar (se copia si es compartido)"""
+        if b not in self.celdas_propias:
+            self.celdas[b] = self.celdas[b][:]
+            self.celdas_propias.add(b)
+        return self.celdas[b]
+
+    def fila_posicion(self, y):
+        if y not in self.posicion_propias:
+            self.posicion[y] = self.posicion[y][:]
+            self.posicion_propias.add(y)
+        return self.posicion[y]
+
+    def __len__(self):
+        return self.libres
+
+    def __contains__(self, celda):
+        x, y = celda
+        return self.posicion[y][x] >= 0
+
+    def ocupar(self, celda):
+        """Quita la celda del índice (intercambia con la última y la elimina)"""
+        x, y = celda
+        indice = self.posicion[y][x]
+        if indice < 0:
+            return
+        ancho = self.ancho
+        self.libres -= 1
+        b = self.libres // ancho
+        bloque = self.bloque_celdas(b)
+        ultima = bloque.pop()
+        if not bloque:
+            self.celdas.pop()
+            self.celdas_propias.discard(b)
+        if ultima != y * ancho + x:
+            self.bloque_celdas(indice // ancho)[indice % ancho] = ultima
+            self.fila_posicion(ultima // ancho)[ultima % ancho] = indice
+        self.fila_posicion(y)[x] = -1
+
+    def liberar(self, celda):
+        """Vuelve a añadir la celda al índice"""
+        x, y = celda
+        if self.posicion[y][x] >= 0:
+            return
+        b = self.libres // self.ancho
+        if b == len(self.celdas):
+            self.celdas.append([])
+            self.celdas_propias.add(b)
+        self.bloque_celdas(b).append(y * self.ancho + x)
+        self.fila_posicion(y)[x] = self.libres
+        self.libres += 1
+
+    def elegir(self, rng):
+        """Devuelve una celda libre uniforme al azar, o None si no queda ninguna"""
+        if not self.libres:
+            return None
+        i = rng.randrange(self.libres)
+        c = self.celdas[i // self.ancho][i % self.ancho]
+        return (c % self.ancho, c // self.ancho)
@@ -0,0 +1,75 @@
+# cuerpo_serpiente.py
+# Cuerpo de la serpiente como búfer circular que se puede compartir con las instantáneas
+# Cada segmento tiene un índice absoluto que solo crece: la cabeza nueva se escribe en "fin" y la
+# cola se quita avanzando "inicio", así que mover la serpiente no desplaza nada. Los segmentos se
+# guardan en bloques de tamano_bloque entradas (el índice k va en el bloque k // tamano_bloque,
+# módulo el número de bloques). Solo se escribe en el bloque de la cabeza: copia() copia la lista
+# de bloques y los dos índices, y cada copia duplica el bloque de la cabeza la primera vez que
+# escribe en él, así que separar el cuerpo de una instantánea no depende de la longitud de la
+# serpiente (como en celdas_libres.py).
+
+class CuerpoSerpiente:
+    def __init__(self, capacidad, tamano_bloque):
+        self.tamano_bloque = tamano_bloque
+        # Sobran dos bloques para que la cabeza nueva nunca caiga en el bloque de la cola
+        self.bloques = [None] * (capacidad // tamano_bloque + 3)
+        self.inicio = 0  # Índice absoluto de la cola
+        self.fin = 0     # Índice absoluto siguiente a la cabeza
+        self.cabeza = None
+        # Bloque de la cabeza si pertenece a este cuerpo (None si se comparte con alguna copia)
+        self.bloque_cabeza = None
+
+    def copia(self):
+        """Copia independiente del cuerpo; comparte los bloques hasta que alguno se modifica"""
+        nueva = CuerpoSerpiente.__new__(CuerpoSerpiente)
+        nueva.tamano_bloque = self.tamano_bloque
+        nueva.bloques = self.bloques[:]
+        nueva.inicio = self.inicio
+        nueva.fin = self.fin
+        nueva.cabeza = self.cabeza
+        nueva.bloque_cabeza = None
+        self.bloque_cabeza = None
+        return nueva
+
+    def segmento(self, k):
+        """Segmento con índice absoluto k"""
+        b, i = divmod(k, self.tamano_bloque)
+        return self.bloques[b % len(self.bloques)][i]
+
+    def __len__(self):
+        return self.fin - self.inicio
+
+    def __getitem__(self, i):
+        """Segmento i contando desde la cabeza (0 es la cabeza y -1 la cola)"""
+        n = self.fin - self.inicio
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("índice fuera del cuerpo de la serpiente")
+        return self.segmento(self.fin - 1 - i)
+
+    def __iter__(self):
+        """Segmentos de la cabeza a la cola"""
+        for k in range(self.fin - 1, self.inicio - 1, -1):
+            yield self.segmento(k)
+
+    def agregar_cabeza(self, celda):
+        i = self.fin % self.tamano_bloque
+        bloque = self.bloque_cabeza
+        if bloque is None or i == 0:
+            # Al empezar un bloque lo que hubiera en esa posición ya no pertenece a este cuerpo
+            b = self.fin // self.tamano_bloque % len(self.bloques)
+            bloque = [None] * self.tamano_bloque if i == 0 else self.bloques[b][:]
+            self.bloques[b] = self.bloque_cabeza = bloque
+        bloque[i] = celda
+        self.fin += 1
+        self.cabeza = celda
+
+    def quitar_cola(self):
+        """Quita la cola y la devuelve"""
+        if self.fin == self.inicio:
+            raise IndexError("la serpiente no tiene segmentos")
+        b, i = divmod(self.inicio, self.tamano_bloque)
+        celda = self.bloques[b % len(self.bloques)][i]
+        self.inicio += 1
+        return celda
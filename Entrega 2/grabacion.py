@@ -0,0 +1,135 @@
+# grabacion.py
+# Grabación y reproducción de partidas
+# Una grabación guarda la semilla, la huella del AST y las acciones como pares (tick, acción):
+# la acción se aplicó cuando ya se habían ejecutado "tick" ticks de lógica. Como toda la
+# aleatoriedad sale de juego.rng, reproducir esas acciones sobre el mismo AST da la misma
+# partida, sin esperas ni pantalla, y se comprueba con la puntuación y la huella del tablero.
+
+import hashlib
+import json
+import time
+
+import ast_binario
+from semantica import resolver_referencias
+
+# 2: la huella del AST se calcula con las referencias resueltas
+VERSION_GRABACION = 2
+VERSIONES_ADMITIDAS = (1, 2)
+
+
+def huella_ast(datos_juego, version=VERSION_GRABACION):
+    """Huella del AST con las referencias resueltas, independiente de si viene de un .brik,
+    un .ast o un .astb. Las grabaciones de la versión 1 usan la huella del AST sin resolver"""
+    datos = ast_binario.a_python(resolver_referencias(datos_juego) if version >= 2 else datos_juego)
+    texto = json.dumps(datos, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()[:16]
+
+
+def huella_estado(juego):
+    """Huella del tablero y de la pieza o serpiente; igual con y sin tablero de bits"""
+    h = hashlib.sha256()
+    if juego.tipo_juego == "TETRIS":
+        grid = juego.tablero.a_grid() if juego.tablero else juego.grid
+        for fila in grid:
+            h.update(bytes(fila))
+        pieza = juego.pieza_actual.nombre if juego.pieza_actual else ''
+        h.update(f"|{pieza}|{juego.pieza_x}|{juego.pieza_y}|{juego.pieza_rotacion}".encode())
+    else:
+        h.update(repr((list(juego.serpiente_cuerpo), juego.posicion_comida)).encode())
+    return h.hexdigest()[:16]
+
+
+class Grabacion:
+    def __init__(self, semilla, huella, tipo_juego, eventos=None, final=None, version=VERSION_GRABACION):
+        self.version = version
+        self.semilla = semilla
+        self.huella = huella
+        self.tipo_juego = tipo_juego
+        self.eventos = eventos if eventos is not None else []   # [(tick, accion), ...]
+        self.final = final                                     # {'puntuacion', 'ticks', 'estado'}
+
+    @classmethod
+    def para(cls, juego):
+        """Empieza a grabar la partida en curso (el juego debe tener semilla)"""
+        grabacion = cls(juego.semilla, huella_ast(juego.datos_juego), juego.tipo_juego)
+        juego.grabacion = grabacion.eventos
+        return grabacion
+
+    def cerrar(self, juego):
+        """Anota el resultado final con el que se validará la reproducción"""
+        self.final = {
+            'puntuacion': juego.puntuacion,
+            'ticks': juego.ticks,
+            'estado': huella_estado(juego),
+        }
+
+    def guardar(self, ruta, acciones):
+        """Escribe la grabación; los ticks se guardan como diferencias y las acciones por índice"""
+        codigos = {accion: i for i, accion in enumerate(acciones)}
+        planos, anterior = [], 0
+        for tick, accion in self.eventos:
+            planos += (tick - anterior, codigos[accion])
+            anterior = tick
+        datos = {
+            'version': self.version,
+            'tipo_juego': self.tipo_juego,
+            'semilla': self.semilla,
+            'ast': self.huella,
+            'acciones': list(acciones),
+            'eventos': planos,
+            'final': self.final,
+        }
+        with open(ruta, 'w', encoding='utf-8') as f:
+            json.dump(datos, f, separators=(',', ':'))
+
+    @classmethod
+    def cargar(cls, ruta):
+        with open(ruta, 'r', encoding='utf-8') as f:
+            datos = json.load(f)
+        if datos.get('version') not in VERSIONES_ADMITIDAS:
+            raise ValueError(f"Versión de grabación no soportada: {datos.get('version')}")
+        acciones = datos['acciones']
+        planos = datos['eventos']
+        eventos, tick = [], 0
+        for i in range(0, len(planos), 2):
+            tick += planos[i]
+            eventos.append((tick, acciones[planos[i + 1]]))
+        return cls(datos['semilla'], datos['ast'], datos['tipo_juego'], eventos, datos['final'],
+                   datos['version'])
+
+
+def reproducir(grabacion, juego):
+    """Reproduce la grabación a máxima velocidad sobre un Juego recién creado.
+    Devuelve un diccionario con el resultado, las diferencias y el rendimiento"""
+    if huella_ast(juego.datos_juego, grabacion.version) != grabacion.huella:
+        raise ValueError("La grabación se hizo con otra versión del juego (la huella del AST no coincide).")
+    juego.reset(grabacion.semilla)
+
+    inicio = time.perf_counter()
+    for tick, accion in grabacion.eventos:
+        while juego.ticks < tick and not juego.juego_terminado:
+            juego.tick()
+        if juego.juego_terminado:
+            break
+        juego.aplicar_accion(accion)
+    ticks_finales = grabacion.final['ticks']
+    while juego.ticks < ticks_finales and not juego.juego_terminado:
+        juego.tick()
+    segundos = time.perf_counter() - inicio
+
+    obtenido = {
+        'puntuacion': juego.puntuacion,
+        'ticks': juego.ticks,
+        'estado': huella_estado(juego),
+    }
+    diferencias = [
+        clave for clave, valor in grabacion.final.items() if obtenido.get(clave) != valor
+    ]
+    return {
+        'correcta': not diferencias,
+        'diferencias': diferencias,
+        'esperado': grabacion.final,
+        'obtenido': obtenido,
+        'segundos': segundos,
+        'ticks_por_segundo': juego.ticks / segundos if segundos > 0 else 0.0,
+    }
@@ -0,0 +1,82 @@
+# instantanea.py
+# Instantáneas del estado de una partida (guardar y restaurar un Juego)
+# Una instantánea no copia el tablero: guarda referencias a las estructuras del juego y las marca
+# como compartidas; el juego las copia (copia superficial) justo antes de volver a modificarlas
+# (ver Juego.separar y Juego.separar_rng). Las filas del tablero son inmutables (tuplas o enteros
+# de bits), así que esas copias comparten todas las filas que no cambian, y tomar o restaurar una
+# instantánea es O(1).
+# La clave de una instantánea identifica la posición de juego y sirve para deduplicar estados.
+
+import operator
+
+CAMPOS_COMUNES = (
+    'semilla', 'rng', 'puntuacion', 'juego_terminado', 'victoria', 'ticks', 'ticks_descartados', 'timer',
+)
+CAMPOS = {
+    "TETRIS": CAMPOS_COMUNES + (
+        'tablero', 'grid', 'alturas', 'pieza_actual', 'piezas_generadas',
+        'pieza_x', 'pieza_y', 'pieza_rotacion', 'velocidad_caida',
+    ),
+    "SNAKE": CAMPOS_COMUNES + (
+        'serpiente_cuerpo', 'celdas_libres',
+        'serpiente_direccion', 'posicion_comida', 'velocidad_movimiento',
+    ),
+}
+LECTORES = {tipo: operator.attrgetter(*campos) for tipo, campos in CAMPOS.items()}
+
+
+class Instantanea:
+    """Estado completo de un Juego; se toma con juego.instantanea() y se aplica con juego.restaurar()"""
+
+    __slots__ = ('tipo_juego', 'valores', 'clave_estado', 'hash_estado')
+
+    def __init__(self, tipo_juego, valores):
+        self.tipo_juego = tipo_juego
+        self.valores = valores
+        self.clave_estado = None
+        self.hash_estado = None
+
+    @classmethod
+    def de(cls, juego):
+        """Toma la instantánea; desde ahora las estructuras del juego son compartidas"""
+        juego.compartido = juego.rng_compartido = True
+        return cls(juego.tipo_juego, LECTORES[juego.tipo_juego](juego))
+
+    def aplicar(self, juego):
+        if juego.tipo_juego != self.tipo_juego:
+            raise ValueError(f"No se puede restaurar una instantánea de {self.tipo_juego} en {juego.tipo_juego}.")
+        for campo, valor in zip(CAMPOS[self.tipo_juego], self.valores):
+            setattr(juego, campo, valor)
+        juego.compartido = juego.rng_compartido = True
+
+    def __getitem__(self, campo):
+        return self.valores[CAMPOS[self.tipo_juego].index(campo)]
+
+    def clave(self):
+        """Tupla que identifica la posición: tablero y pieza, o serpiente, dirección y comida,
+        más la puntuación. No incluye los ticks ni el estado del generador aleatorio"""
+        if self.clave_estado is None:
+            if self.tipo_juego == "TETRIS":
+                tablero = self['tablero']
+                filas = tuple(tablero.filas) if tablero else tuple(self['grid'])
+                pieza = self['pieza_actual']
+                posicion = (pieza.nombre if pieza else None,
+                            self['pieza_x'], self['pieza_y'], self['pieza_rotacion'])
+            else:
+                filas = tuple(self['serpiente_cuerpo'])
+                posicion = (self['serpiente_direccion'], self['posicion_comida'])
+            self.clave_estado = (filas, posicion, self['puntuacion'], self['juego_terminado'])
+        return self.clave_estado
+
+    def __hash__(self):
+        if self.hash_estado is None:
+            self.hash_estado = hash(self.clave())
+        return self.hash_estado
+
+    def __eq__(self, otra):
+        if not isinstance(otra, Instantanea):
+            return NotImplemented
+        return self is otra or (hash(self) == hash(otra) and self.clave() == otra.clave())
+
+    def __repr__(self):
+        return f"Instantanea({self.tipo_juego}, ticks={self['ticks']}, puntuacion={self['puntuacion']})"
@@ -0,0 +1,143 @@
+# paquete.py
+# Paquetes de contenido (.brikpak): muchos juegos compilados y sus piezas en un solo archivo
+# Estructura (little endian):
+#   'BRKP' | u8 versión | u32 longitud del índice | u32 número de piezas | índice
+#   | tabla de piezas: (u64 desplazamiento, u32 longitud) por pieza | secciones
+# El índice es un AST binario (ver ast_binario.py) con el nombre, tipo y tablero de cada juego y la
+# posición de su sección; los desplazamientos son relativos al comienzo de las secciones. La sección
+# de un juego es su AST con "piezas" como {nombre: número de pieza}, y cada pieza tiene su propia
+# sección: las piezas idénticas de varios juegos se guardan una sola vez.
+# Al abrir un paquete se mapea con mmap y solo se lee el índice: listar los juegos no deserializa
+# ninguno, y cargar(clave) lee únicamente la sección del juego y las de sus piezas.
+
+import mmap
+import os
+import struct
+
+import ast_binario
+from semantica import analizar_juego
+
+MAGICO = b'BRKP'
+VERSION = 1
+EXTENSION = '.brikpak'
+
+_CABECERA = struct.Struct('<4sBII')
+_POSICION = struct.Struct('<QI')
+
+
+# ===== ESCRITURA =====
+def volcar_paquete(juegos):
+    """Serializa {clave: AST resuelto} a bytes; lanza ValueError si algún juego no es válido"""
+    secciones = []
+    tamano = 0
+    tabla_piezas = []
+    numeros_piezas = {}     # bytes de la pieza -> número de pieza
+    indice = {}
+
+    def agregar(datos):
+        nonlocal tamano
+        posicion = (tamano, len(datos))
+        secciones.append(datos)
+        tamano += len(datos)
+        return posicion
+
+    for clave, ast in juegos.items():
+        try:
+            config = analizar_juego(ast)
+        except ValueError as e:
+            raise ValueError(f"{clave}: {e}") from None
+        seccion = dict(ast)
+        if ast.get('piezas'):
+            piezas = {}
+            for nombre, pieza in ast['piezas'].items():
+                datos = ast_binario.volcar(pieza)
+                if datos not in numeros_piezas:
+                    numeros_piezas[datos] = len(tabla_piezas)
+                    tabla_piezas.append(_POSICION.pack(*agregar(datos)))
+                piezas[nombre] = numeros_piezas[datos]
+            seccion['piezas'] = piezas
+        desplazamiento, longitud = agregar(ast_binario.volcar(seccion))
+        indice[clave] = {
+            'nombre': config.nombre,
+            'tipo': config.tipo,
+            'ancho': config.tablero.ancho,
+            'alto': config.tablero.alto,
+            'desplazamiento': desplazamiento,
+            'longitud': longitud,
+        }
+
+    datos_indice = ast_binario.volcar(indice)
+    cabecera = _CABECERA.pack(MAGICO, VERSION, len(datos_indice), len(tabla_piezas))
+    return b''.join([cabecera, datos_indice] + tabla_piezas + secciones)
+
+
+def guardar_paquete(juegos, ruta):
+    with open(ruta, 'wb') as f:
+        f.write(volcar_paquete(juegos))
+
+
+# ===== LECTURA =====
+class Paquete:
+    """Paquete abierto con mmap; usar como gestor de contexto o llamar a cerrar()"""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        with open(ruta, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < _CABECERA.size:
+                raise ValueError(f"{ruta} no es un paquete de juegos (archivo demasiado corto).")
+            self.mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magico, version, longitud, self.numero_piezas = _CABECERA.unpack_from(self.mapa)
+        if magico != MAGICO:
+            raise ValueError(f"{ruta} no es un paquete de juegos (cabecera incorrecta).")
+        if version != VERSION:
+            raise ValueError(f"Versión de paquete no soportada: {version}.")
+        self.vista = memoryview(self.mapa)
+        self.tabla_piezas = _CABECERA.size + longitud
+        self.inicio = self.tabla_piezas + self.numero_piezas * _POSICION.size
+        self.indice = ast_binario.leer(self.vista[_CABECERA.size:self.tabla_piezas])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+        return False
+
+    def cerrar(self):
+        """Libera la vista del archivo; las matrices de piezas ya cargadas siguen siendo válidas"""
+        self.vista.release()
+
+    def juegos(self):
+        """{clave: {'nombre', 'tipo', 'ancho', 'alto'}} de los juegos del paquete (solo el índice)"""
+        return {
+            clave: {campo: entrada[campo] for campo in ('nombre', 'tipo', 'ancho', 'alto')}
+            for clave, entrada in self.indice.items()
+        }
+
+    def seccion(self, desplazamiento, longitud):
+        inicio = self.inicio + desplazamiento
+        return ast_binario.leer(self.vista[inicio:inicio + longitud])
+
+    def pieza(self, numero):
+        if not 0 <= numero < self.numero_piezas:
+            raise ValueError(f"Paquete corrupto: no existe la pieza {numero}.")
+        return self.seccion(*_POSICION.unpack_from(self.vista, self.tabla_piezas + numero * _POSICION.size))
+
+    def cargar(self, clave):
+        """AST del juego con sus piezas; las matrices de las piezas quedan sobre el archivo mapeado"""
+        entrada = self.indice.get(clave)
+        if entrada is None:
+            raise ValueError(f"El paquete {self.ruta} no contiene el juego '{clave}' "
+                             f"(disponibles: {', '.join(self.indice)}).")
+        ast = self.seccion(entrada['desplazamiento'], entrada['longitud'])
+        if ast.get('piezas'):
+            ast['piezas'] = {nombre: self.pieza(numero) for nombre, numero in ast['piezas'].items()}
+        return ast
+
+    def clave_unica(self):
+        """Clave del único juego del paquete; ValueError si hay varios"""
+        claves = list(self.indice)
+        if len(claves) != 1:
+            raise ValueError(f"El paquete {self.ruta} contiene {len(claves)} juegos; "
+                             f"elige uno con --juego ({', '.join(claves)}).")
+        return claves[0]
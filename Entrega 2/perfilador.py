@@ -0,0 +1,159 @@
+# perfilador.py
+# Perfilado por fases del bucle interactivo (opcional, con --perfil)
+# Cada cuadro dibujado suma el tiempo pasado en manejar_input, en los ticks de lógica y en dibujar
+# desde el cuadro anterior, y lo guarda en histogramas de tamaño fijo. De ahí salen los percentiles,
+# los ticks por segundo y los ticks descartados que se ven en el panel y en el JSON final.
+
+import json
+import math
+import time
+
+FASES = ('input', 'update', 'dibujar')
+INTERVALO_PANEL = 0.5       # Segundos entre actualizaciones de las estadísticas del panel
+
+
+class Histograma:
+    """Histograma logarítmico de duraciones con un número fijo de cubetas.
+    Cubre de minimo a maximo segundos con cubetas_por_decada cubetas por cada factor 10"""
+
+    def __init__(self, minimo=1e-5, maximo=1.0, cubetas_por_decada=20):
+        self.minimo = minimo
+        self.cubetas_por_decada = cubetas_por_decada
+        num_cubetas = int(round(math.log10(maximo / minimo) * cubetas_por_decada)) + 1
+        self.cuentas = [0] * num_cubetas
+        self.total = 0
+        self.suma = 0.0
+        self.mayor = 0.0
+
+    def agregar(self, segundos):
+        if segundos <= self.minimo:
+            indice = 0
+        else:
+            indice = min(int(math.log10(segundos / self.minimo) * self.cubetas_por_decada) + 1,
+                         len(self.cuentas) - 1)
+        self.cuentas[indice] += 1
+        self.total += 1
+        self.suma += segundos
+        if segundos > self.mayor:
+            self.mayor = segundos
+
+    def limite(self, indice):
+        """Límite superior de la cubeta indice (la última no tiene límite)"""
+        return self.minimo * 10 ** (indice / self.cubetas_por_decada)
+
+    def percentil(self, p):
+        """Valor por debajo del cual queda el p% de las muestras (límite superior de su cubeta)"""
+        if not self.total:
+            return 0.0
+        objetivo = math.ceil(self.total * p / 100)
+        acumulado = 0
+        for indice, cuenta in enumerate(self.cuentas):
+            acumulado += cuenta
+            if acumulado >= objetivo:
+                return min(self.limite(indice), self.mayor)
+        return self.mayor
+
+    def media(self):
+        return self.suma / self.total if self.total else 0.0
+
+    def a_dict(self):
+        return {
+            'muestras': self.total,
+            'media': self.media(),
+            'p50': self.percentil(50),
+            'p90': self.percentil(90),
+            'p99': self.percentil(99),
+            'max': self.mayor,
+            'limites': [self.limite(i) for i in range(len(self.cuentas) - 1)],
+            'cuentas': list(self.cuentas),
+        }
+
+
+class PerfiladorCuadros:
+    def __init__(self, ruta_json=None, reloj=time.perf_counter):
+        self.ruta_json = ruta_json
+        self.reloj = reloj
+        self.histogramas = {fase: Histograma() for fase in FASES + ('cuadro', 'intervalo')}
+        self.acumulado = dict.fromkeys(FASES, 0.0)
+        self.cuadros = 0
+        self.lineas = []
+        self.inicio = None
+
+    def iniciar(self, juego):
+        """Empieza la medición al entrar en el bucle del juego"""
+        ahora = self.reloj()
+        self.inicio = self.marca = ahora
+        self.ultimo_cuadro = None
+        self.ticks_inicio = juego.ticks
+        self.ventana = (ahora, juego.ticks, self.cuadros)
+
+    def marcar(self):
+        """Empieza a contar una fase (el tiempo desde la marca anterior no se atribuye)"""
+        self.marca = self.reloj()
+
+    def acumular(self, fase):
+        """Atribuye a la fase el tiempo desde la última marca"""
+        ahora = self.reloj()
+        self.acumulado[fase] += ahora - self.marca
+        self.marca = ahora
+
+    def reanudar(self):
+        """Tras una pausa: se descarta el cuadro en curso para no contar la espera"""
+        self.acumulado = dict.fromkeys(FASES, 0.0)
+        self.ultimo_cuadro = None
+        self.marca = self.reloj()
+
+    def cerrar_cuadro(self, juego):
+        """Registra el cuadro recién dibujado y refresca las líneas del panel cada INTERVALO_PANEL"""
+        ahora = self.marca
+        trabajo = 0.0
+        for fase, segundos in self.acumulado.items():
+            self.histogramas[fase].agregar(segundos)
+            trabajo += segundos
+            self.acumulado[fase] = 0.0
+        self.histogramas['cuadro'].agregar(trabajo)
+        if self.ultimo_cuadro is not None:
+            self.histogramas['intervalo'].agregar(ahora - self.ultimo_cuadro)
+        self.ultimo_cuadro = ahora
+        self.cuadros += 1
+
+        inicio_ventana, ticks_ventana, cuadros_ventana = self.ventana
+        transcurrido = ahora - inicio_ventana
+        if transcurrido >= INTERVALO_PANEL:
+            tps = (juego.ticks - ticks_ventana) / transcurrido
+            fps = (self.cuadros - cuadros_ventana) / transcurrido
+            self.lineas = self.construir_lineas(juego, fps, tps)
+            self.ventana = (ahora, juego.ticks, self.cuadros)
+
+    def construir_lineas(self, juego, fps, tps):
+        def ms(fase, p):
+            return f"{self.histogramas[fase].percentil(p) * 1000:.2f}"
+        return [
+            "",
+            "  RENDIMIENTO (p50/p99 ms):",
+            f"  FPS: {fps:.0f}  TPS: {tps:.1f}",
+            f"  Input:   {ms('input', 50)}/{ms('input', 99)}",
+            f"  Update:  {ms('update', 50)}/{ms('update', 99)}",
+            f"  Dibujar: {ms('dibujar', 50)}/{ms('dibujar', 99)}",
+            f"  Cuadro:  {ms('cuadro', 50)}/{ms('cuadro', 99)}",
+            f"  Ticks descartados: {juego.ticks_descartados}",
+        ]
+
+    def resumen(self, juego):
+        if self.inicio is None:
+            duracion, ticks = 0.0, 0
+        else:
+            duracion, ticks = self.marca - self.inicio, juego.ticks - self.ticks_inicio
+        return {
+            'duracion': duracion,
+            'cuadros': self.cuadros,
+            'ticks': ticks,
+            'ticks_descartados': juego.ticks_descartados,
+            'fps': self.cuadros / duracion if duracion > 0 else 0.0,
+            'tps': ticks / duracion if duracion > 0 else 0.0,
+            'fases': {nombre: histograma.a_dict() for nombre, histograma in self.histogramas.items()},
+        }
+
+    def guardar(self, juego):
+        with open(self.ruta_json, 'w', encoding='utf-8') as f:
+            json.dump(self.resumen(juego), f, indent=2)
@@ -0,0 +1,124 @@
+# piezas.py
+# Compilador de piezas de Tetris
+# Convierte la sección "piezas" del AST en objetos inmutables con las celdas
+# ocupadas ya calculadas, para que la lógica del juego no recorra matrices.
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+from tablero_bits import compilar_mascaras
+
+# Piezas usadas cuando el .brik no define ninguna
+PIEZAS_POR_DEFECTO = {
+    "I": {"rotaciones": [[[0,0,0,0], [1,1,1,1], [0,0,0,0], [0,0,0,0]]]}
+}
+
+
+@dataclass(frozen=True, slots=True)
+class Rotacion:
+    celdas: tuple           # ((dx, dy), ...) de las celdas ocupadas
+    mascaras: tuple         # ((dy, mascara), ...) para el tablero de bits
+    min_x: int
+    max_x: int
+    min_y: int
+    max_y: int
+    perfil: tuple           # ((dx, dy más bajo), ...) por cada columna ocupada
+    columna_inicio: int     # pieza_x que centra la pieza en el tablero
+
+    @property
+    def ancho(self):
+        return self.max_x - self.min_x + 1
+
+    @property
+    def alto(self):
+        return self.max_y - self.min_y + 1
+
+
+@dataclass(frozen=True, slots=True)
+class Pieza:
+    nombre: str
+    color: str
+    rotaciones: tuple
+
+
+def es_secuencia(valor):
+    """Listas del AST JSON o matrices/filas en memoria del AST binario"""
+    return isinstance(valor, Sequence) and not isinstance(valor, (str, bytes))
+
+
+def validar_matriz(nombre, indice, matriz):
+    """Comprueba que una rotación sea una matriz rectangular de 0/1 con al menos una celda"""
+    if not es_secuencia(matriz) or not matriz:
+        raise ValueError(f"Pieza '{nombre}', rotación {indice}: se esperaba una matriz no vacía.")
+    ancho = None
+    for fila in matriz:
+        if not es_secuencia(fila) or not fila:
+            raise ValueError(f"Pieza '{nombre}', rotación {indice}: cada fila debe ser una lista no vacía.")
+        if ancho is None:
+            ancho = len(fila)
+        elif len(fila) != ancho:
+            raise ValueError(f"Pieza '{nombre}', rotación {indice}: las filas tienen longitudes distintas.")
+        for celda in fila:
+            if isinstance(celda, bool) or celda not in (0, 1):
+                raise ValueError(f"Pieza '{nombre}', rotación {indice}: valor de celda inválido {celda!r}.")
+    if not any(1 in fila for fila in matriz):
+        raise ValueError(f"Pieza '{nombre}', rotación {indice}: la matriz no tiene celdas ocupadas.")
+
+
+def compilar_rotacion(matriz, ancho_tablero):
+    """Compila una matriz de rotación ya validada"""
+    celdas = tuple(
+        (dx, dy)
+        for dy, fila in enumerate(matriz)
+        for dx, celda in enumerate(fila)
+        if celda == 1
+    )
+    xs = [dx for dx, _ in celdas]
+    ys = [dy for _, dy in celdas]
+    min_x, max_x = min(xs), max(xs)
+
+    mas_bajo = {}
+    for dx, dy in celdas:
+        if dy > mas_bajo.get(dx, -1):
+            mas_bajo[dx] = dy
+    perfil = tuple(sorted(mas_bajo.items()))
+
+    ancho_pieza = max_x - min_x + 1
+    return Rotacion(
+        celdas=celdas,
+        mascaras=compilar_mascaras(matriz),
+        min_x=min_x,
+        max_x=max_x,
+        min_y=min(ys),
+        max_y=max(ys),
+        perfil=perfil,
+        columna_inicio=(ancho_tablero - ancho_pieza) // 2 - min_x
+    )
+
+
+def compilar_piezas(datos_piezas, ancho_tablero):
+    """Compila la sección "piezas" del AST en un diccionario nombre -> Pieza"""
+    if not datos_piezas:
+        datos_piezas = PIEZAS_POR_DEFECTO
+    if not isinstance(datos_piezas, dict):
+        raise ValueError("La sección 'piezas' debe ser un bloque { nombre: pieza }.")
+
+    piezas = {}
+    for nombre, datos in datos_piezas.items():
+        if not isinstance(datos, dict):
+            raise ValueError(f"Pieza '{nombre}': se esperaba un bloque con 'rotaciones'.")
+        rotaciones = datos.get('rotaciones')
+        if es_secuencia(rotaciones):
+            # Los .ast del analizador de la Entrega 1 intercalan las etiquetas de los comentarios
+            # ("Rotación", 0, ...) entre las matrices; se ignoran
+            rotaciones = [matriz for matriz in rotaciones if not isinstance(matriz, (str, int, float))]
+        if not es_secuencia(rotaciones) or not rotaciones:
+            raise ValueError(f"Pieza '{nombre}': 'rotaciones' debe ser una lista no vacía.")
+        for indice, matriz in enumerate(rotaciones):
+            validar_matriz(nombre, indice, matriz)
+        piezas[nombre] = Pieza(
+            nombre=nombre,
+            color=datos.get('color', ''),
+            rotaciones=tuple(compilar_rotacion(matriz, ancho_tablero) for matriz in rotaciones)
+        )
+    return piezas
@@ -0,0 +1,196 @@
+# pruebas/test_analizador.py
+# El analizador con pila explícita: mismo resultado que el recursivo anterior, varios errores por
+# archivo y anidamiento sin límite de recursión
+
+import contextlib
+import io
+import json
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from analizador import BrikSyntaxError, Parser, Tokenizer, batch_main, syntax_error_lines
+
+ENTREGA_2 = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def analizar(texto):
+    return Parser(Tokenizer(texto).iter_tokens()).parse()
+
+
+# ===== ANALIZADOR RECURSIVO ANTERIOR (referencia) =====
+class ParserRecursivo:
+    def __init__(self, tokens):
+        self.tokens = iter(tokens)
+        self.lookahead = next(self.tokens, None)
+
+    def get_token(self):
+        t = self.lookahead
+        if t is not None:
+            self.lookahead = next(self.tokens, None)
+        return t
+
+    def parse(self):
+        tabla = {}
+        while self.lookahead is not None:
+            key = self.get_token()[1]
+            self.get_token()  # '='
+            tabla[key] = self.parse_value()
+        return tabla
+
+    def parse_value(self):
+        ttype, tval, _ = self.lookahead
+        if ttype == 'OPERATOR' and tval == '{':
+            return self.parse_block()
+        if ttype == 'OPERATOR' and tval == '[':
+            return self.parse_list()
+        self.get_token()
+        return tval
+
+    def parse_block(self):
+        self.get_token()  # '{'
+        block = {}
+        while self.lookahead[1] != '}':
+            key = self.get_token()[1]
+            self.get_token()  # ':' o '='
+            block[key] = self.parse_value()
+            if self.lookahead[1] == ',':
+                self.get_token()
+        self.get_token()
+        return block
+
+    def parse_list(self):
+        self.get_token()  # '['
+        items = []
+        while self.lookahead[1] != ']':
+            items.append(self.parse_value())
+            if self.lookahead[1] == ',':
+                self.get_token()
+        self.get_token()
+        return items
+
+
+# ===== GENERADOR DE ENTRADAS VÁLIDAS =====
+def valor_aleatorio(rng, profundidad):
+    tipo = rng.randrange(6 if profundidad < 5 else 4)
+    if tipo == 0:
+        return str(rng.randrange(1000))
+    if tipo == 1:
+        return f"{rng.randrange(100)}.{rng.randrange(100)}"
+    if tipo == 2:
+        return f'"texto {rng.randrange(100)}"'
+    if tipo == 3:
+        return rng.choice(('verdadero', 'falso', 'velocidad', 'regla_1'))
+    if tipo == 4:
+        entradas = [f'"c{i}"{rng.choice((":", " =", ": "))} {valor_aleatorio(rng, profundidad + 1)}'
+                    for i in range(rng.randrange(4))]
+        return '{' + separar(rng, entradas) + '}'
+    elementos = [valor_aleatorio(rng, profundidad + 1) for _ in range(rng.randrange(4))]
+    return '[' + separar(rng, elementos) + ']'
+
+
+def separar(rng, partes):
+    # Las comas entre elementos y la final son opcionales en BRIK
+    texto = rng.choice((', ', ',\n    ', ' ')).join(partes)
+    return texto + (',' if partes and rng.random() < 0.3 else '')
+
+
+def archivo_aleatorio(rng):
+    lineas = ['# generado']
+    for i in range(rng.randrange(1, 8)):
+        lineas.append(f'def_{i} = {valor_aleatorio(rng, 0)}')
+    return '\n'.join(lineas) + '\n'
+
+
+class PruebaEquivalencia(unittest.TestCase):
+    def test_mismo_resultado_que_el_analizador_recursivo(self):
+        rng = random.Random(2025)
+        for i in range(500):
+            texto = archivo_aleatorio(rng)
+            with self.subTest(i, texto=texto):
+                esperado = ParserRecursivo(Tokenizer(texto).iter_tokens()).parse()
+                self.assertEqual(analizar(texto), esperado)
+
+    def test_brik_publicados(self):
+        for nombre in ('snake.brik', 'tetris.brik'):
+            with self.subTest(nombre):
+                with open(os.path.join(ENTREGA_2, nombre), encoding='utf-8') as f:
+                    texto = f.read()
+                esperado = ParserRecursivo(Tokenizer(texto).iter_tokens()).parse()
+                self.assertEqual(analizar(texto), esperado)
+
+
+class PruebaTokenizer(unittest.TestCase):
+    def test_bloques_no_cambian_los_tokens(self):
+        with open(os.path.join(ENTREGA_2, 'tetris.brik'), encoding='utf-8') as f:
+            texto = f.read() + '\n  # comentario\nx = [1.5, "", ٣]\n'
+        esperado = list(Tokenizer(texto).iter_tokens())
+        ultima = texto.count('\n')
+        self.assertEqual([(tipo, valor) for tipo, valor, linea in esperado if linea == ultima],
+                         [('IDENTIFIER', 'x'), ('OPERATOR', '='), ('OPERATOR', '['), ('NUMBER', 1.5),
+                          ('OPERATOR', ','), ('STRING', ''), ('OPERATOR', ','), ('NUMBER', 3),
+                          ('OPERATOR', ']')])
+        for tamano in (1, 7, 100):
+            with self.subTest(tamano):
+                tokenizer = Tokenizer(texto)
+                tokenizer.block_size = tamano
+                self.assertEqual(list(tokenizer.iter_tokens()), esperado)
+
+
+class PruebaErrores(unittest.TestCase):
+    def errores(self, texto):
+        with self.assertRaises(BrikSyntaxError) as contexto:
+            analizar(texto)
+        return syntax_error_lines(contexto.exception)
+
+    def test_varios_errores_en_un_archivo(self):
+        lineas = self.errores('a = { "x" 1 }\nb = 2\nc = = 3\nd = }\ne = [1, 2\n')
+        self.assertEqual([linea.split(':')[0] for linea in lineas],
+                         ['Línea 1', 'Línea 3', 'Línea 4', 'Línea 5'])
+
+    def test_cierre_sobrante_tras_un_cierre_equivocado(self):
+        lineas = self.errores('a = { "x": { "y": 1 ] }\nb = 2\n')
+        self.assertEqual(len(lineas), 2)
+        self.assertIn("se encontró ']'", lineas[0])
+        self.assertIn("'}' no cierra", lineas[1])
+
+    def test_el_error_resume_todos_los_mensajes(self):
+        with self.assertRaises(BrikSyntaxError) as contexto:
+            analizar('a = }\nb = ]\n')
+        self.assertEqual(len(contexto.exception.errors), 2)
+        self.assertIn('1 errores más', str(contexto.exception))
+
+
+class PruebaAnidamiento(unittest.TestCase):
+    def test_100000_niveles(self):
+        n = 100_000
+        for abrir, cerrar in (('[', ']'), ('{"a": ', '}')):
+            with self.subTest(abrir):
+                valor = analizar('x = ' + abrir * n + '1' + cerrar * n)['x']
+                for _ in range(n):
+                    valor = valor[0] if isinstance(valor, list) else valor['a']
+                self.assertEqual(valor, 1)
+
+
+class PruebaLotes(unittest.TestCase):
+    def test_salidas_repetidas(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            for subdirectorio, nombre in (('a', 'tetris.brik'), ('b', 'snake.brik')):
+                os.makedirs(os.path.join(directorio, subdirectorio))
+                shutil.copy(os.path.join(ENTREGA_2, nombre), os.path.join(directorio, subdirectorio, 'nivel.brik'))
+            salida = os.path.join(directorio, 'salida')
+            errores = io.StringIO()
+            with contextlib.redirect_stderr(errores), contextlib.redirect_stdout(io.StringIO()):
+                codigo = batch_main([os.path.join(directorio, 'a'), os.path.join(directorio, 'b'),
+                                     os.path.join(directorio, 'a', 'nivel.brik'), '-o', salida, '-j', '1'])
+            self.assertEqual(codigo, 1)
+            self.assertEqual(errores.getvalue().count("ya la genera"), 1)
+            self.assertIn("aviso: Regla 'regla_acelerar_caida'", errores.getvalue())
+            with open(os.path.join(salida, 'arbol_nivel.ast'), encoding='utf-8') as f:
+                self.assertEqual(json.load(f)['nombre_juego'], 'Tetris Clasico')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+# pruebas/test_grabacion.py
+# Grabar una partida con semilla, guardarla, cargarla y reproducirla da el mismo estado final
+
+import os
+import random
+import tempfile
+import unittest
+
+from busqueda import crear_politica_busqueda
+from grabacion import Grabacion, huella_ast, huella_estado, reproducir
+from runtime import Juego, cargar_juego
+
+ENTREGA_2 = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+DIRECCIONES = {
+    'mover_arriba': (0, -1), 'mover_abajo': (0, 1), 'mover_izquierda': (-1, 0), 'mover_derecha': (1, 0),
+}
+
+
+def politica_serpiente(juego):
+    """Avanza hacia la comida por una celda libre, para que la partida dure y puntúe"""
+    cabeza_x, cabeza_y = juego.serpiente_cuerpo[0]
+    comida_x, comida_y = juego.posicion_comida or (cabeza_x, cabeza_y)
+    opciones = []
+    for accion, (dx, dy) in DIRECCIONES.items():
+        x, y = cabeza_x + dx, cabeza_y + dy
+        if 0 <= x < juego.ancho and 0 <= y < juego.alto and (x, y) in juego.celdas_libres:
+            opciones.append((abs(comida_x - x) + abs(comida_y - y), accion))
+    return min(opciones)[1] if opciones else None
+
+
+def grabar_partida(datos, piezas, semilla, version=None):
+    juego = Juego(datos, semilla=semilla, piezas=piezas)
+    grabacion = Grabacion.para(juego)
+    if version is not None:
+        grabacion.version = version
+        grabacion.huella = huella_ast(datos, version)
+    politica = crear_politica_busqueda() if juego.tipo_juego == "TETRIS" else politica_serpiente
+    rng = random.Random(semilla)
+    for _ in range(2000):
+        # Alguna acción al azar para que la partida no dependa solo de la política
+        accion = politica(juego) if rng.random() < 0.95 else rng.choice(juego.acciones[:-1] + (None,))
+        juego.step(accion)
+    grabacion.cerrar(juego)
+    return juego, grabacion
+
+
+class PruebaGrabacion(unittest.TestCase):
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directorio.cleanup)
+
+    def guardar_y_cargar(self, grabacion, acciones):
+        ruta = os.path.join(self.directorio.name, 'partida.rec')
+        grabacion.guardar(ruta, acciones)
+        return Grabacion.cargar(ruta)
+
+    def test_ida_y_vuelta(self):
+        for nombre in ('snake.brik', 'tetris.brik'):
+            datos, piezas = cargar_juego(os.path.join(ENTREGA_2, nombre))
+            for semilla in range(5):
+                with self.subTest(nombre, semilla=semilla):
+                    original, grabacion = grabar_partida(datos, piezas, semilla)
+                    self.assertGreater(original.puntuacion, 0)
+                    cargada = self.guardar_y_cargar(grabacion, original.acciones)
+                    self.assertEqual(cargada.eventos, grabacion.eventos)
+                    for bitboard in (False, True):
+                        juego = Juego(datos, semilla=None, bitboard=bitboard, piezas=piezas)
+                        resultado = reproducir(cargada, juego)
+                        self.assertTrue(resultado['correcta'], resultado['diferencias'])
+                        self.assertEqual(juego.puntuacion, original.puntuacion)
+                        self.assertEqual(juego.ticks, original.ticks)
+                        self.assertEqual(huella_estado(juego), huella_estado(original))
+
+    def test_grabacion_de_la_version_1(self):
+        datos, piezas = cargar_juego(os.path.join(ENTREGA_2, 'tetris.brik'))
+        original, grabacion = grabar_partida(datos, piezas, 3, version=1)
+        cargada = self.guardar_y_cargar(grabacion, original.acciones)
+        self.assertEqual(cargada.version, 1)
+        resultado = reproducir(cargada, Juego(datos, piezas=piezas))
+        self.assertTrue(resultado['correcta'], resultado['diferencias'])
+
+    def test_detecta_un_final_distinto(self):
+        datos, piezas = cargar_juego(os.path.join(ENTREGA_2, 'snake.brik'))
+        original, grabacion = grabar_partida(datos, piezas, 1)
+        grabacion.final['puntuacion'] += 10
+        cargada = self.guardar_y_cargar(grabacion, original.acciones)
+        resultado = reproducir(cargada, Juego(datos, piezas=piezas))
+        self.assertEqual(resultado['diferencias'], ['puntuacion'])
+
+    def test_rechaza_otro_ast(self):
+        datos, piezas = cargar_juego(os.path.join(ENTREGA_2, 'tetris.brik'))
+        original, grabacion = grabar_partida(datos, piezas, 2)
+        otro = dict(datos, nombre_juego='Otro')
+        with self.assertRaisesRegex(ValueError, 'huella del AST'):
+            reproducir(grabacion, Juego(otro, piezas=piezas))
+
+
+if __name__ == '__main__':
+    unittest.main()
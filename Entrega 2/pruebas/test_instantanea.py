@@ -0,0 +1,73 @@
+# pruebas/test_instantanea.py
+# Restaurar una instantánea y repetir las mismas acciones da la misma partida
+
+import os
+import random
+import unittest
+from collections import deque
+
+from celdas_libres import CeldasLibres
+from cuerpo_serpiente import CuerpoSerpiente
+from runtime import Juego, cargar_juego
+
+ENTREGA_2 = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def jugar(juego, acciones):
+    for accion in acciones:
+        juego.step(accion)
+    return juego.instantanea().clave(), juego.ticks
+
+
+class PruebaInstantanea(unittest.TestCase):
+    def test_restaurar_y_repetir(self):
+        for nombre in ('snake.brik', 'tetris.brik'):
+            datos, piezas = cargar_juego(os.path.join(ENTREGA_2, nombre))
+            for semilla in range(10):
+                with self.subTest(nombre, semilla=semilla):
+                    juego = Juego(datos, semilla=semilla, piezas=piezas)
+                    rng = random.Random(semilla)
+                    jugar(juego, [rng.choice(juego.acciones[:-1]) for _ in range(30)])
+                    instantanea = juego.instantanea()
+                    acciones = [rng.choice(juego.acciones[:-1]) for _ in range(100)]
+                    esperado = jugar(juego, acciones)
+                    # Otra rama desde la misma instantánea no debe alterarla
+                    juego.restaurar(instantanea)
+                    jugar(juego, [rng.choice(juego.acciones[:-1]) for _ in range(100)])
+                    juego.restaurar(instantanea)
+                    self.assertEqual(jugar(juego, acciones), esperado)
+
+    def test_copia_de_celdas_libres_independiente(self):
+        celdas = CeldasLibres(5, 4)
+        celdas.ocupar((1, 1))
+        copia = celdas.copia()
+        copia.ocupar((2, 3))
+        copia.liberar((1, 1))
+        self.assertEqual(len(celdas), 19)
+        self.assertIn((2, 3), celdas)
+        self.assertNotIn((1, 1), celdas)
+        self.assertEqual(len(copia), 19)
+        self.assertNotIn((2, 3), copia)
+
+    def test_copias_del_cuerpo_independientes(self):
+        # Bloques de 3 segmentos y capacidad 8: las ramas dan varias vueltas al búfer
+        rng = random.Random(7)
+        ramas = [(CuerpoSerpiente(8, 3), deque())]
+        for paso in range(3000):
+            cuerpo, modelo = rng.choice(ramas)
+            if rng.random() < 0.1:
+                ramas.append((cuerpo.copia(), modelo.copy()))
+                ramas = ramas[-6:]
+            elif modelo and (len(modelo) == 8 or rng.random() < 0.5):
+                self.assertEqual(cuerpo.quitar_cola(), modelo.pop())
+            else:
+                cuerpo.agregar_cabeza(paso)
+                modelo.appendleft(paso)
+            for cuerpo, modelo in ramas:
+                self.assertEqual(list(cuerpo), list(modelo))
+                if modelo:
+                    self.assertEqual((cuerpo[0], cuerpo[-1], cuerpo.cabeza), (modelo[0], modelo[-1], modelo[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,28 @@
+# pruebas/test_panel.py
+# Los controles del panel lateral salen del mapa de controles del juego
+
+import os
+import unittest
+
+from runtime import Juego, cargar_juego
+
+ENTREGA_2 = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class PruebaPanelControles(unittest.TestCase):
+    def test_teclas_por_defecto(self):
+        datos, piezas = cargar_juego(os.path.join(ENTREGA_2, 'tetris.brik'))
+        panel = Juego(datos, semilla=0, piezas=piezas).panel_base
+        self.assertIn("  S: Bajar  ESPACIO: Soltar", panel)
+        self.assertIn("  P: Pausa  Q: Salir", panel)
+
+    def test_teclas_redefinidas(self):
+        datos, _ = cargar_juego(os.path.join(ENTREGA_2, 'snake.brik'))
+        controles = {'mover_arriba': 'i', 'mover_izquierda': 'j', 'mover_abajo': 'k',
+                     'mover_derecha': 'l', 'salir': 'x'}
+        panel = Juego(dict(datos, controles=controles), semilla=0).panel_base
+        self.assertEqual(panel[6:9], ["  IJKL: Mover", "  P: Pausa", "  X: Salir"])
+
+
+if __name__ == '__main__':
+    unittest.main()
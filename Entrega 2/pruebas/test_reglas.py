@@ -0,0 +1,92 @@
+# pruebas/test_reglas.py
+# Compilación de las reglas "regla_*" en la tabla evento -> manejadores
+
+import os
+import unittest
+
+from reglas import compilar_reglas
+from runtime import Juego, cargar_juego
+
+ENTREGA_2 = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class JuegoFalso:
+    """Lo mínimo que usan los efectos de las reglas"""
+
+    def __init__(self, motor):
+        self.reglas = motor
+        self.puntuacion = 0
+        self.velocidad = 1.0
+        self.juego_terminado = False
+
+    def sumar_puntos(self, puntos):
+        self.puntuacion += puntos
+        self.reglas.disparar(self, 'puntuacion_cambiada')
+
+    def multiplicar_velocidad(self, factor):
+        self.velocidad *= factor
+
+
+def compilar(reglas, tipo="TETRIS"):
+    motor = compilar_reglas(reglas, tipo)
+    return motor, JuegoFalso(motor)
+
+
+class PruebaReglas(unittest.TestCase):
+    def test_puntos_por_linea(self):
+        motor, juego = compilar({'regla_lineas': {'evento': 'linea_completada', 'puntos_por_linea_despejada': 40}})
+        motor.disparar(juego, 'linea_completada', 3)
+        self.assertEqual(juego.puntuacion, 120)
+        self.assertEqual(motor.puntos, {'linea_completada': 40})
+
+    def test_condiciones_unidas_con_o(self):
+        motor, juego = compilar({'regla_fin': {'condicion': 'colision_pared o colision_propia',
+                                               'accion': 'terminar_partida'}}, "SNAKE")
+        motor.disparar(juego, 'cabeza_toca_cuerpo')
+        self.assertTrue(juego.juego_terminado)
+
+    def test_multiplicar_velocidad_en_multiplo_de_puntuacion(self):
+        motor, juego = compilar({
+            'regla_comer': {'condicion': 'serpiente_come_comida', 'puntos_sumados': 10},
+            'regla_dificultad': {'condicion': 'puntaje_multiplo_de_30', 'multiplicar_velocidad': 2},
+        }, "SNAKE")
+        velocidades = []
+        for _ in range(6):
+            motor.disparar(juego, 'serpiente_come_comida')
+            velocidades.append(juego.velocidad)
+        self.assertEqual(velocidades, [1, 1, 2, 2, 2, 4])
+
+    def test_reglas_por_defecto_en_snake(self):
+        datos, _ = cargar_juego(os.path.join(ENTREGA_2, 'snake.brik'))
+        sin_reglas = {clave: valor for clave, valor in datos.items() if not clave.startswith('regla_')}
+        juego = Juego(sin_reglas, semilla=0)
+        velocidad = juego.velocidad_movimiento
+        for _ in range(5):
+            juego.sumar_puntos(10)
+        self.assertAlmostEqual(juego.velocidad_movimiento, velocidad * 1.2)
+
+    def test_tecla_presionada(self):
+        motor, juego = compilar({'regla_turbo': {'condicion': 'tecla_presionada', 'control': 'soltar',
+                                                 'puntos_sumados': 5}})
+        motor.disparar(juego, 'tecla_presionada:soltar')
+        self.assertEqual(juego.puntuacion, 5)
+        self.assertEqual(motor.advertencias, [])
+
+    def test_aviso_de_tecla_presionada_sin_control(self):
+        datos, _ = cargar_juego(os.path.join(ENTREGA_2, 'tetris.brik'))
+        motor = Juego(datos, semilla=0).reglas
+        self.assertEqual(len(motor.advertencias), 1)
+        self.assertIn('regla_acelerar_caida', motor.advertencias[0])
+
+    def test_errores(self):
+        for regla, mensaje in (({'condicion': 'a y b'}, "con 'o'"),
+                               ({'condicion': 'no_existe'}, 'condición desconocida'),
+                               ({'condicion': 'linea_completada', 'accion': 'bailar'}, 'acción desconocida'),
+                               ({'condicion': 'linea_completada', 'multiplicar_velocidad': 0}, 'positivo')):
+            with self.subTest(mensaje):
+                with self.assertRaisesRegex(ValueError, mensaje):
+                    compilar_reglas({'regla_x': regla}, "TETRIS")
+
+
+if __name__ == '__main__':
+    unittest.main()
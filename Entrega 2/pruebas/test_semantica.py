@@ -0,0 +1,76 @@
+# pruebas/test_semantica.py
+# Resolución de referencias y compatibilidad con los .ast ya generados
+# Uso (desde "Entrega 2"): python -m pytest pruebas   o   python -m unittest discover pruebas
+
+import dataclasses
+import os
+import unittest
+
+import ast_binario
+from analizador import Parser, Tokenizer
+from grabacion import huella_ast
+from runtime import Juego, cargar_datos_juego, cargar_juego
+from semantica import analizar_juego, marcar_referencias, resolver_referencias
+
+ENTREGA_2 = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTREGA_1 = os.path.join(os.path.dirname(ENTREGA_2), 'Entrega 1')
+
+
+def analizar(texto):
+    return Parser(Tokenizer(texto).iter_tokens()).parse()
+
+
+def sin_reglas(config):
+    """ConfigJuego comparable (MotorReglas no define igualdad)"""
+    return dataclasses.replace(config, reglas=None)
+
+
+class PruebaAstPublicados(unittest.TestCase):
+    def test_cargan_los_ast_de_la_entrega_1(self):
+        for nombre, tipo in (('arbol_snake.ast', 'SNAKE'), ('arbol_tetris.ast', 'TETRIS')):
+            with self.subTest(nombre):
+                juego = Juego(cargar_datos_juego(os.path.join(ENTREGA_1, nombre)), semilla=0)
+                self.assertEqual(juego.tipo_juego, tipo)
+                for _ in range(50):
+                    juego.step()
+
+    def test_ast_json_equivale_al_brik(self):
+        for nombre in ('snake.brik', 'tetris.brik'):
+            with self.subTest(nombre):
+                datos, _ = cargar_juego(os.path.join(ENTREGA_2, nombre))
+                # Al pasar por JSON los identificadores se convierten en cadenas normales, y
+                # cargar_juego los vuelve a marcar
+                plano = marcar_referencias(ast_binario.a_python(ast_binario.leer(ast_binario.volcar(datos))))
+                self.assertEqual(sin_reglas(analizar_juego(plano)), sin_reglas(analizar_juego(datos)))
+                self.assertEqual(huella_ast(plano), huella_ast(datos))
+
+
+class PruebaReferencias(unittest.TestCase):
+    def test_cadena_entre_comillas_no_es_referencia(self):
+        with open(os.path.join(ENTREGA_2, 'tetris.brik'), encoding='utf-8') as f:
+            texto = f.read()
+        # Literales que coinciden con nombres de definiciones de primer nivel
+        datos = analizar(texto + '\nnombre_juego = "piezas"\nclasico = "modo"\nmodo = "clasico"\n'
+                                 'estilo = { "color": "tablero", "copia": tablero }\n')
+        resuelto = resolver_referencias(datos)
+        self.assertEqual(resuelto['nombre_juego'], 'piezas')
+        self.assertEqual(resuelto['modo'], 'clasico')
+        self.assertEqual(resuelto['estilo'], {'color': 'tablero', 'copia': resuelto['tablero']})
+        self.assertEqual(analizar_juego(datos).nombre, 'piezas')
+
+    def test_ast_antiguo_con_cadena_que_nombra_una_definicion(self):
+        tabla = {'longitud_inicial': 4, 'serpiente': {'longitud_inicial': 'longitud_inicial'}}
+        self.assertEqual(resolver_referencias(tabla), tabla)
+        self.assertEqual(resolver_referencias(marcar_referencias(tabla))['serpiente']['longitud_inicial'], 4)
+
+    def test_ast_antiguo_con_su_propio_nombre_es_texto(self):
+        tabla = {'modo': 'modo', 'otro': 'modo'}
+        self.assertEqual(resolver_referencias(marcar_referencias(tabla)), {'modo': 'modo', 'otro': 'modo'})
+
+    def test_referencia_circular(self):
+        with self.assertRaisesRegex(ValueError, 'Referencia circular'):
+            resolver_referencias(analizar('a = b\nb = { "x": a }\n'))
+
+
+if __name__ == '__main__':
+    unittest.main()
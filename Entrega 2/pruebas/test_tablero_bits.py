@@ -0,0 +1,57 @@
+# pruebas/test_tablero_bits.py
+# El tablero de bits y el de listas juegan la misma partida con la misma semilla y acciones
+
+import os
+import random
+import unittest
+
+from busqueda import crear_politica_busqueda
+from runtime import Juego, cargar_juego
+
+ENTREGA_2 = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def con_tablero(datos, ancho, alto):
+    return dict(datos, tablero={'ancho': ancho, 'alto': alto})
+
+
+def observar(juego):
+    grid = juego.tablero.a_grid() if juego.bitboard else [list(fila) for fila in juego.grid]
+    pieza = juego.pieza_actual.nombre if juego.pieza_actual else None
+    return (grid, juego.puntuacion, juego.juego_terminado, juego.alturas,
+            pieza, juego.pieza_x, juego.pieza_y, juego.pieza_rotacion)
+
+
+class PruebaParidadTableroBits(unittest.TestCase):
+    def test_misma_partida_en_ambos_tableros(self):
+        datos, _ = cargar_juego(os.path.join(ENTREGA_2, 'tetris.brik'))
+        # Tableros estrechos y anchos para probar los muros de los dos lados. Las piezas se
+        # compilan para el ancho de cada variante, que fija la columna en la que aparecen
+        for ancho, alto in ((10, 20), (7, 16), (37, 15)):
+            variante = con_tablero(datos, ancho, alto)
+            for semilla in range(3):
+                with self.subTest(ancho=ancho, alto=alto, semilla=semilla):
+                    listas = Juego(variante, semilla=semilla)
+                    bits = Juego(variante, semilla=semilla, bitboard=True)
+                    self.assertTrue(bits.bitboard)
+                    rotacion = listas.pieza_actual.rotaciones[0]
+                    self.assertEqual(listas.pieza_x + rotacion.min_x, (ancho - rotacion.ancho) // 2)
+                    # La búsqueda despeja líneas; las acciones al azar la desvían de vez en cuando
+                    politica = crear_politica_busqueda()
+                    rng = random.Random(semilla)
+                    for paso in range(1500):
+                        if rng.random() < 0.9:
+                            accion = politica(listas)
+                        else:
+                            accion = rng.choice(listas.acciones[:-2] + (None,))
+                        listas.step(accion)
+                        bits.step(accion)
+                        self.assertEqual(observar(bits), observar(listas), f"paso {paso}")
+                        if listas.juego_terminado:
+                            break
+                    if (ancho, alto) == (10, 20):
+                        self.assertGreater(listas.puntuacion, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+# recarga.py
+# Vigila un archivo .brik y entrega solo las definiciones de primer nivel que cambiaron
+# Se consulta desde el bucle del juego (sin hilos): cada consulta es un os.stat.
+
+import os
+
+from analizador import IncrementalParser
+
+
+class VigilanteBrik:
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.analizador = IncrementalParser()
+        self.firma = None
+        self.revisar()  # Análisis inicial completo
+
+    def firma_archivo(self):
+        estado = os.stat(self.ruta)
+        return (estado.st_mtime_ns, estado.st_size)
+
+    def revisar(self):
+        """Devuelve (datos_juego, claves_cambiadas) si el archivo cambió desde la última vez,
+        o None. Un error de sintaxis lanza SyntaxError y se reintenta al siguiente guardado"""
+        try:
+            firma = self.firma_archivo()
+        except OSError:
+            return None  # El editor puede estar reemplazando el archivo
+        if firma == self.firma:
+            return None
+        self.firma = firma
+
+        with open(self.ruta, 'r', encoding='utf-8') as f:
+            source = f.read()
+        datos_juego, cambiadas = self.analizador.update(source)
+        return (datos_juego, cambiadas) if cambiadas else None
@@ -0,0 +1,163 @@
+# reglas.py
+# Compilador de las reglas "regla_*" del .brik
+# Las condiciones ("pieza_toca_otra_pieza o pieza_toca_fondo") y acciones se analizan una sola
+# vez al cargar el juego y se convierten en una tabla evento -> manejadores (closures).
+# Durante la partida el juego solo dispara los eventos que ocurren; no se interpreta texto.
+
+import re
+
+# Átomo de condición -> evento que dispara el motor
+EVENTOS = {
+    # Tetris
+    'pieza_toca_otra_pieza': 'pieza_fijada',
+    'pieza_toca_fondo': 'pieza_fijada',
+    'linea_completada': 'linea_completada',
+    'pieza_alcanza_tope': 'pieza_alcanza_tope',
+    # Snake
+    'tiempo_transcurrido': 'tiempo_transcurrido',
+    'serpiente_come_comida': 'serpiente_come_comida',
+    'cabeza_fuera_del_tablero': 'cabeza_fuera_del_tablero',
+    'colision_pared': 'cabeza_fuera_del_tablero',
+    'cabeza_toca_cuerpo': 'cabeza_toca_cuerpo',
+    'colision_propia': 'cabeza_toca_cuerpo',
+}
+
+# Condiciones que son un estado y no un evento: se evalúan cuando cambia la puntuación
+PREDICADO_MULTIPLO = re.compile(r'puntaje_multiplo_de_(\d+)$')
+
+# Acciones descriptivas que el motor ya realiza por sí mismo
+ACCIONES_INTEGRADAS = {
+    'pieza_baja', 'pieza_se_detiene', 'eliminar_fila', 'bajan_piezas_superiores',
+    'agregar_filas_vacias', 'rotar_pieza_90', 'avanzar_un_paso', 'aumentar_longitud',
+    'generar_nueva_comida', 'incrementar_velocidad', 'mostrar_mensaje_game_over',
+}
+
+# Reglas usadas cuando el .brik no define ninguna (el comportamiento clásico)
+REGLAS_POR_DEFECTO = {
+    "TETRIS": {
+        'regla_linea_completa': {'evento': 'linea_completada', 'puntos_por_linea_despejada': 100},
+    },
+    "SNAKE": {
+        'regla_crecimiento': {'condicion': 'serpiente_come_comida', 'puntos_sumados': 10},
+        'regla_aumento_dificultad': {'condicion': 'puntaje_multiplo_de_50', 'multiplicar_velocidad': 1.2},
+    },
+}
+
+
+class MotorReglas:
+    def __init__(self):
+        self.manejadores = {}        # evento -> tupla de funciones manejador(juego, n)
+        self.puntos = {}             # evento -> puntos fijos por ocurrencia (para VecJuego)
+        self.aparicion_aleatoria = True
+        self.advertencias = []       # Reglas que no tendrán efecto (las muestran analizador y runtime)
+
+    def agregar(self, evento, manejador):
+        self.manejadores[evento] = self.manejadores.get(evento, ()) + (manejador,)
+
+    def disparar(self, juego, evento, n=1):
+        """Ejecuta los manejadores del evento; n es el número de ocurrencias (p. ej. líneas)"""
+        for manejador in self.manejadores.get(evento, ()):
+            manejador(juego, n)
+
+
+# ===== COMPILACIÓN =====
+def compilar_reglas(datos_juego, tipo_juego):
+    """Compila todas las reglas del AST en un MotorReglas"""
+    reglas = {clave: valor for clave, valor in datos_juego.items() if clave.startswith('regla_')}
+    if not reglas:
+        reglas = REGLAS_POR_DEFECTO[tipo_juego]
+
+    motor = MotorReglas()
+    for nombre, regla in reglas.items():
+        if not isinstance(regla, dict):
+            raise ValueError(f"La regla '{nombre}' debe ser un bloque {{ ... }}.")
+        compilar_regla(motor, nombre, regla)
+    return motor
+
+
+def compilar_regla(motor, nombre, regla):
+    if 'aparicion_aleatoria' in regla:
+        motor.aparicion_aleatoria = regla['aparicion_aleatoria'] != 'no'
+
+    texto_condicion = regla.get('evento', regla.get('condicion'))
+    if texto_condicion is None:
+        return  # Regla de configuración sin condición
+    if not isinstance(texto_condicion, str):
+        raise ValueError(f"Regla '{nombre}': la condición debe ser una cadena.")
+
+    efectos = compilar_acciones(nombre, regla)
+    disparadores = compilar_condicion(motor, nombre, regla, texto_condicion, bool(efectos))
+    if not efectos:
+        return
+
+    def manejador(juego, n, efectos=efectos):
+        for efecto in efectos:
+            efecto(juego, n)
+
+    for evento, guarda in disparadores:
+        if guarda is None:
+            motor.agregar(evento, manejador if len(efectos) > 1 else efectos[0])
+            for clave in ('puntos_por_linea_despejada', 'puntos_sumados'):
+                if clave in regla:
+                    motor.puntos[evento] = motor.puntos.get(evento, 0) + regla[clave]
+        else:
+            motor.agregar(evento, lambda juego, n, guarda=guarda: guarda(juego) and manejador(juego, n))
+
+
+def compilar_condicion(motor, nombre, regla, texto, con_efectos=True):
+    """Convierte 'a o b' en una lista de (evento, guarda); guarda es None o una función(juego)"""
+    if re.search(r'\sy\s', texto):
+        raise ValueError(f"Regla '{nombre}': solo se admiten condiciones unidas con 'o'.")
+
+    disparadores = []
+    for atomo in (parte.strip() for parte in texto.split(' o ')):
+        multiplo = PREDICADO_MULTIPLO.match(atomo)
+        if atomo in EVENTOS:
+            disparadores.append((EVENTOS[atomo], None))
+        elif multiplo:
+            divisor = int(multiplo.group(1))
+            disparadores.append(('puntuacion_cambiada', lambda juego, d=divisor: juego.puntuacion % d == 0))
+        elif atomo == 'tecla_presionada':
+            # Se asocia a la acción indicada en "control"; sin ella la regla solo documenta el control
+            control = regla.get('control')
+            if control is None:
+                if con_efectos:
+                    motor.advertencias.append(f"Regla '{nombre}': 'tecla_presionada' sin 'control' "
+                                             f"(p. ej. \"control\": \"acelerar_abajo\"); se ignora.")
+                continue
+            disparadores.append((f"tecla_presionada:{control}", None))
+        else:
+            raise ValueError(f"Regla '{nombre}': condición desconocida '{atomo}'.")
+    return disparadores
+
+
+def compilar_acciones(nombre, regla):
+    """Devuelve la lista de efectos (funciones efecto(juego, n)) de la regla"""
+    efectos = []
+    for clave, valor in regla.items():
+        if clave == 'accion' or clave.startswith('accion_'):
+            for accion in (parte.strip() for parte in str(valor).split(' o ')):
+                if accion == 'terminar_partida':
+                    efectos.append(terminar_partida)
+                elif accion not in ACCIONES_INTEGRADAS:
+                    raise ValueError(f"Regla '{nombre}': acción desconocida '{accion}'.")
+        elif clave in ('puntos_por_linea_despejada', 'puntos_sumados'):
+            efectos.append(sumar_puntos(nombre, clave, valor))
+        elif clave == 'multiplicar_velocidad':
+            if isinstance(valor, bool) or not isinstance(valor, (int, float)) or valor <= 0:
+                raise ValueError(f"Regla '{nombre}': '{clave}' debe ser un número positivo.")
+            efectos.append(lambda juego, n, factor=valor: juego.multiplicar_velocidad(factor ** n))
+    return efectos
+
+
+def sumar_puntos(nombre, clave, valor):
+    if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+        raise ValueError(f"Regla '{nombre}': '{clave}' debe ser un número.")
+
+    def efecto(juego, n):
+        juego.sumar_puntos(valor * n)
+    return efecto
+
+
+def terminar_partida(juego, n):
+    juego.juego_terminado = True
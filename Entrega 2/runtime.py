@@ -2,43 +2,210 @@
 # Motor de juego para Tetris y Snake
 #Usa el documento .json generado por el analizador.py
 
+import argparse
 import sys
 import json
 import os
 import time
 import random
-import msvcrt
+
+import ast_binario
+import paquete
+from analizador import syntax_error_lines
+from busqueda import Buscador, BusquedaIncremental
+from grabacion import Grabacion, reproducir
+from instantanea import Instantanea
+from perfilador import PerfiladorCuadros
+from cache_juego import cargar_brik
+from celdas_libres import CeldasLibres
+from cuerpo_serpiente import CuerpoSerpiente
+from piezas import compilar_piezas
+from recarga import VigilanteBrik
+from semantica import analizar_juego, marcar_referencias, resolver_referencias
+from tablero_bits import TableroBits
+from terminal import RenderizadorANSI, Teclado, seguir_foco, tam_vista_terminal
+
+# Acciones aceptadas por step(); los nombres coinciden con las claves de "controles" del .brik
+ACCIONES_TETRIS = ('mover_izquierda', 'mover_derecha', 'acelerar_abajo', 'rotar', 'soltar', 'salir')
+ACCIONES_SNAKE = ('mover_arriba', 'mover_abajo', 'mover_izquierda', 'mover_derecha', 'salir')
+
+# Teclas por defecto de cada acción
+TECLAS_TETRIS = {
+    'mover_izquierda': 'a',
+    'mover_derecha': 'd',
+    'acelerar_abajo': 's',
+    'rotar': 'w',
+    'soltar': ' ',
+    'pausar': 'p',
+    'salir': 'q'
+}
+TECLAS_SNAKE = {
+    'mover_arriba': 'w',
+    'mover_abajo': 's',
+    'mover_izquierda': 'a',
+    'mover_derecha': 'd',
+    'pausar': 'p',
+    'salir': 'q'
+}
+
+DIRECCIONES_SNAKE = {
+    'mover_arriba': (0, -1),
+    'mover_abajo': (0, 1),
+    'mover_izquierda': (-1, 0),
+    'mover_derecha': (1, 0)
+}
+
+# Bucle en tiempo real
+FPS_RENDER = 30             # Cuadros dibujados por segundo
+MAX_TICKS_POR_CUADRO = 10   # Ticks de recuperación como máximo antes de descartar
+MARGEN_ESPERA = 0.001       # Último tramo de la espera hecho con espera activa (s)
+PRESUPUESTO_PISTA = 0.002   # Segundos por cuadro dedicados a buscar la pista (--pistas)
+
+
+def cargar_juego(ruta, clave=None):
+    """Carga un juego desde un .ast (JSON), un .astb (binario, con mmap), un paquete .brikpak
+    (clave elige el juego; solo se lee ese juego y sus piezas) o directamente desde un .brik
+    (con caché compilada).
+    Devuelve (datos_juego, piezas); piezas es None si aún no están compiladas"""
+    _, extension = os.path.splitext(ruta)
+    if extension == '.brik':
+        compilado = cargar_brik(ruta)
+        return compilado['datos_juego'], compilado['piezas']
+    if extension == paquete.EXTENSION:
+        with paquete.Paquete(ruta) as contenido:
+            return contenido.cargar(clave or contenido.clave_unica()), None
+    if extension == '.astb':
+        datos = ast_binario.cargar(ruta)
+    else:
+        with open(ruta, 'r', encoding='utf-8') as f:
+            datos = json.load(f)
+    # Un .ast o .astb puede traer referencias sin resolver escritas como cadenas
+    return marcar_referencias(datos), None
+
+
+def cargar_datos_juego(ruta):
+    """Carga solo la configuración (AST) de un juego"""
+    return cargar_juego(ruta)[0]
+
+
+def dormir_hasta(limite):
+    """Duerme hasta el instante limite de time.perf_counter() con precisión de ~1 ms"""
+    restante = limite - time.perf_counter()
+    if restante > MARGEN_ESPERA:
+        time.sleep(restante - MARGEN_ESPERA)
+    while time.perf_counter() < limite:
+        pass
+
+
+def etiqueta_tecla(tecla):
+    """Nombre de una tecla (bytes) para el panel: 'a' -> 'A', ' ' -> 'ESPACIO'"""
+    texto = tecla.decode(errors='replace')
+    return "ESPACIO" if texto == " " else texto.upper()
+
 
 class Juego:
-    def __init__(self, datos_juego):
+    def __init__(self, datos_juego, semilla=None, bitboard=False, piezas=None, config=None):
         self.datos_juego = datos_juego
-        self.nombre_juego = self.datos_juego.get('nombre_juego', 'Juego Desconocido')
-        self.tipo_juego = "SNAKE" if "serpiente" in self.datos_juego else "TETRIS"
+        # Análisis semántico: referencias resueltas, tipos comprobados, reglas y piezas compiladas.
+        # Un ConfigJuego ya analizado (inmutable) se puede compartir entre muchas partidas
+        self.config = config or analizar_juego(datos_juego, piezas)
+        self.nombre_juego = self.config.nombre
+        self.tipo_juego = self.config.tipo
         
-        tablero = self.datos_juego.get('tablero', {})
-        self.ancho = tablero.get('ancho', 10)
-        self.alto = tablero.get('alto', 20)
-        self.grid = [[0 for _ in range(self.ancho)] for _ in range(self.alto)]
+        self.ancho = self.config.tablero.ancho
+        self.alto = self.config.tablero.alto
+        self.controles = self.config.controles
+        self.bitboard = bitboard and self.tipo_juego == "TETRIS"
+        # Las reglas "regla_*" se compilan una vez en una tabla evento -> manejadores
+        self.reglas = self.config.reglas
+        
+        # Configuración específica por tipo de juego
+        if self.tipo_juego == "TETRIS":
+            # Las piezas se compilan y validan una sola vez al cargar el juego (o vienen de la caché)
+            self.piezas = self.config.piezas
+            self.nombres_piezas = list(self.piezas.keys())
+            self.margen_bits = self.calcular_margen_bits()
+            self.acciones = ACCIONES_TETRIS
+            self.teclas_defecto = TECLAS_TETRIS
+        
+        elif self.tipo_juego == "SNAKE":
+            self.longitud_serpiente = self.config.longitud_inicial
+            self.acciones = ACCIONES_SNAKE
+            self.teclas_defecto = TECLAS_SNAKE
+        
+        self.teclas = self.construir_teclas()
+        self.panel_base = self.construir_panel_base()
+        self.renderizador = None
+        self.vigilante = None
+        self.grabacion = None   # Lista de (tick, acción) mientras se graba la partida
+        self.perfilador = None  # PerfiladorCuadros si se pidió --perfil
+        self.tam_vista = None   # (ancho, alto) máximos visibles; None = tablero completo
+        self.vista = None
+        self.fantasma_y = None  # pieza_y de la pieza fantasma del último cuadro
+        self.pistas = False     # Sugerir la mejor colocación de cada pieza (Tetris)
+        self.pista = None       # BusquedaIncremental de la pieza actual
+        self.reset(semilla)
+
+    def calcular_margen_bits(self):
+        """Ancho de los muros del tablero de bits: la mayor extensión horizontal de una pieza"""
+        return max(
+            rotacion.max_x + 1
+            for pieza in self.piezas.values() for rotacion in pieza.rotaciones
+        )
+
+    def construir_teclas(self):
+        """Construye el mapa tecla -> acción a partir de los controles del .brik"""
+        teclas = {}
+        for accion, tecla in self.teclas_defecto.items():
+            tecla = self.controles.get(accion, tecla)
+            if isinstance(tecla, str) and tecla:
+                teclas[tecla.encode()] = accion
+        return teclas
+
+    def reset(self, semilla=None):
+        """Reinicia la partida; con la misma semilla la partida es reproducible"""
+        self.semilla = semilla
+        self.rng = random.Random(semilla)
+        if self.bitboard:
+            self.tablero = TableroBits(self.ancho, self.alto, self.margen_bits)
+            self.grid = None
+        else:
+            self.tablero = None
+            # Filas inmutables: se sustituyen al cambiar, así las instantáneas las comparten
+            self.grid = [(0,) * self.ancho] * self.alto
         self.puntuacion = 0
         self.juego_terminado = False
+        self.victoria = False
+        self.ticks = 0
+        self.ticks_descartados = 0
         
-        # Configuración específica por tipo de juego
         if self.tipo_juego == "TETRIS":
             self.pieza_actual = None
+            self.piezas_generadas = 0
+            # Fila de la celda ocupada más alta de cada columna (alto si está vacía)
+            self.alturas = [self.alto] * self.ancho
             self.pieza_x, self.pieza_y, self.pieza_rotacion = 0, 0, 0
-            self.velocidad_caida = self.datos_juego.get('velocidad_inicial', 1.0)
-            self.piezas = self.datos_juego.get('piezas', {})
+            self.velocidad_caida = self.config.velocidad_inicial
         
         elif self.tipo_juego == "SNAKE":
-            self.serpiente_cuerpo = []
+            # Caben todas las celdas del tablero más los segmentos iniciales que quedan fuera
+            self.serpiente_cuerpo = CuerpoSerpiente(self.ancho * self.alto + self.longitud_serpiente, self.ancho)
+            # Las celdas del tablero que no están libres son las que ocupa la serpiente
+            self.celdas_libres = CeldasLibres(self.ancho, self.alto)
             self.serpiente_direccion = (1, 0)
             self.posicion_comida = None
-            self.velocidad_movimiento = self.datos_juego.get('velocidad_inicial', 3.0)
-            self.longitud_serpiente = self.datos_juego.get('longitud_inicial', 3)
-            self.controles = self.datos_juego.get('controles', {})
+            self.velocidad_movimiento = self.config.velocidad_inicial
         
         self.timer = 0
+        # Estructuras mutables compartidas con una instantánea (ver separar)
+        self.compartido = False
+        self.rng_compartido = False
+        # Filas del tablero que cambiaron desde el último cuadro (ver construir_cuadro)
+        self.filas_sucias = set()
+        self.filas_pieza_dibujadas = frozenset()
+        self.todo_sucio = True
         self.inicializar_juego()
+        return self.estado()
 
     def inicializar_juego(self):
         """Inicializa el juego según el tipo"""
@@ -48,182 +215,474 @@ class Juego:
         elif self.tipo_juego == "SNAKE":
             # Posicionar serpiente en el centro
             centro_x, centro_y = self.ancho // 2, self.alto // 2
-            self.serpiente_cuerpo = [(centro_x, centro_y)]
-            for i in range(1, self.longitud_serpiente):
-                self.serpiente_cuerpo.append((centro_x - i, centro_y))
+            segmentos = [(centro_x - i, centro_y) for i in range(self.longitud_serpiente)]
+            for segmento in reversed(segmentos):
+                self.serpiente_cuerpo.agregar_cabeza(segmento)
+            for segmento in segmentos:
+                if segmento[0] >= 0:
+                    self.celdas_libres.ocupar(segmento)
             
             self.generar_comida()
 
-    def run(self):
+    # ===== MODO HEADLESS =====
+    def step(self, accion=None):
+        """Aplica una acción y avanza un tick de lógica, sin esperas ni E/S.
+        Devuelve (estado, puntuacion, terminado)"""
+        if not self.juego_terminado:
+            if accion is not None:
+                self.aplicar_accion(accion)
+            if not self.juego_terminado:
+                self.tick()
+        return self.estado(), self.puntuacion, self.juego_terminado
+
+    def tick(self):
+        """Avanza un paso de la lógica del juego (caída o movimiento)"""
+        self.ticks += 1
+        self.reglas.disparar(self, 'tiempo_transcurrido')
+        if self.tipo_juego == "TETRIS":
+            self.mover_pieza_abajo()
+        elif self.tipo_juego == "SNAKE":
+            self.mover_serpiente()
+
+    def aplicar_accion(self, accion):
+        """Ejecuta una acción con nombre (ver ACCIONES_TETRIS y ACCIONES_SNAKE)"""
+        if self.grabacion is not None:
+            self.grabacion.append((self.ticks, accion))
+        
+        if accion == 'salir':
+            self.juego_terminado = True
+            return
+        
+        elif self.tipo_juego == "TETRIS":
+            if accion == 'mover_izquierda':
+                self.mover_pieza_lateral(-1)
+            elif accion == 'mover_derecha':
+                self.mover_pieza_lateral(1)
+            elif accion == 'acelerar_abajo':
+                self.mover_pieza_abajo()
+            elif accion == 'rotar':
+                self.rotar_pieza()
+            elif accion == 'soltar':
+                self.soltar_pieza()
+            else:
+                raise ValueError(f"Acción desconocida para Tetris: {accion}")
+        
+        elif self.tipo_juego == "SNAKE":
+            direccion = DIRECCIONES_SNAKE.get(accion)
+            if direccion is None:
+                raise ValueError(f"Acción desconocida para Snake: {accion}")
+            # No se permite invertir la dirección sobre el propio cuerpo
+            if direccion != (-self.serpiente_direccion[0], -self.serpiente_direccion[1]):
+                self.serpiente_direccion = direccion
+        
+        self.reglas.disparar(self, 'tecla_presionada:' + accion)
+
+    # ===== EFECTOS DE LAS REGLAS =====
+    def sumar_puntos(self, puntos):
+        """Suma puntos y avisa a las reglas que dependen de la puntuación"""
+        self.puntuacion += puntos
+        self.reglas.disparar(self, 'puntuacion_cambiada')
+
+    def multiplicar_velocidad(self, factor):
+        if self.tipo_juego == "TETRIS":
+            self.velocidad_caida *= factor
+        else:
+            self.velocidad_movimiento *= factor
+
+    def estado(self):
+        """Estado observable del juego (referencias al estado interno, sin copias)"""
+        if self.tipo_juego == "TETRIS":
+            filas = self.tablero.filas if self.tablero else self.grid
+            return (filas, self.pieza_x, self.pieza_y, self.pieza_rotacion)
+        return (self.serpiente_cuerpo, self.posicion_comida, self.serpiente_direccion)
+
+    # ===== INSTANTÁNEAS =====
+    def instantanea(self):
+        """Instantánea del estado de la partida en O(1), sin copiar el tablero"""
+        return Instantanea.de(self)
+
+    def restaurar(self, instantanea):
+        """Vuelve al estado de la instantánea, que se puede restaurar de nuevo más adelante"""
+        instantanea.aplicar(self)
+        self.pista = None
+        self.filas_sucias.clear()
+        self.todo_sucio = True
+
+    def separar(self):
+        """Copia las estructuras compartidas con alguna instantánea antes de modificarlas.
+        Las copias son superficiales: filas, segmentos y celdas siguen compartidos"""
+        if not self.compartido:
+            return
+        self.compartido = False
+        if self.tipo_juego == "TETRIS":
+            if self.tablero:
+                self.tablero = self.tablero.copia()
+            else:
+                self.grid = self.grid[:]
+            self.alturas = self.alturas[:]
+        else:
+            self.serpiente_cuerpo = self.serpiente_cuerpo.copia()
+            self.celdas_libres = self.celdas_libres.copia()
+
+    def separar_rng(self):
+        """Como separar, para el generador aleatorio (solo se usa al sacar pieza o comida)"""
+        if not self.rng_compartido:
+            return
+        self.rng_compartido = False
+        rng = random.Random.__new__(random.Random)  # Sin sembrarlo desde el sistema
+        rng.setstate(self.rng.getstate())
+        self.rng = rng
+
+    # ===== MODO INTERACTIVO =====
+    def run(self, fps=FPS_RENDER):
         """Bucle principal del juego"""
-        tiempo_anterior = time.time()
+        if self.tam_vista is None:
+            self.tam_vista = tam_vista_terminal()
+        with Teclado() as self.teclado:
+            self.renderizador = RenderizadorANSI()
+            self.bucle(fps)
+            self.mostrar_game_over()
+
+    def intervalo_tick(self):
+        """Segundos entre dos ticks de lógica según la velocidad actual"""
+        if self.tipo_juego == "TETRIS":
+            return 1.0 / self.velocidad_caida
+        return 1.0 / self.velocidad_movimiento
+
+    def bucle(self, fps=FPS_RENDER):
+        """Avanza el juego en tiempo real con paso fijo hasta que termina.
+        self.timer acumula el tiempo pendiente; por cada intervalo completo se ejecuta
+        un tick, de modo que la velocidad del .brik se respeta aunque supere a los fps"""
+        periodo_cuadro = 1.0 / fps
+        perfil = self.perfilador
+        if perfil:
+            perfil.iniciar(self)
+        self.reloj = time.perf_counter()
+        siguiente_cuadro = self.reloj
         
         while not self.juego_terminado:
-            delta_tiempo = time.time() - tiempo_anterior
-            tiempo_anterior = time.time()
-            
             self.manejar_input()
+            if perfil:
+                perfil.acumular('input')
             
-            # Actualizar según el tipo de juego
-            if self.tipo_juego == "TETRIS":
-                self.timer += delta_tiempo
-                if self.timer > 1.0 / self.velocidad_caida:
-                    self.timer = 0
-                    self.mover_pieza_abajo()
+            ahora = time.perf_counter()
+            self.timer += ahora - self.reloj
+            self.reloj = ahora
             
-            elif self.tipo_juego == "SNAKE":
-                self.timer += delta_tiempo
-                if self.timer > 1.0 / self.velocidad_movimiento:
-                    self.timer = 0
-                    self.mover_serpiente()
+            # Ejecutar todos los ticks vencidos (recuperación si vamos atrasados)
+            intervalo = self.intervalo_tick()
+            ticks_cuadro = 0
+            while self.timer >= intervalo and not self.juego_terminado:
+                if ticks_cuadro == MAX_TICKS_POR_CUADRO:
+                    # Demasiado atraso: se descarta en lugar de acumular sin límite
+                    self.ticks_descartados += int(self.timer // intervalo)
+                    self.timer %= intervalo
+                    break
+                self.tick()
+                self.timer -= intervalo
+                ticks_cuadro += 1
+                intervalo = self.intervalo_tick()
+            if perfil:
+                perfil.acumular('update')
             
-            self.dibujar()
-            time.sleep(0.05)
+            if ahora >= siguiente_cuadro:
+                if self.vigilante:
+                    self.revisar_recarga()
+                if self.pistas:
+                    self.avanzar_pista()
+                if perfil:
+                    perfil.marcar()
+                self.dibujar()
+                if perfil:
+                    perfil.acumular('dibujar')
+                    perfil.cerrar_cuadro(self)
+                siguiente_cuadro += periodo_cuadro
+                if siguiente_cuadro < ahora:
+                    siguiente_cuadro = ahora + periodo_cuadro
+            
+            # Dormir hasta el próximo tick o cuadro, lo que llegue antes
+            siguiente_tick = ahora + (intervalo - self.timer)
+            dormir_hasta(min(siguiente_tick, siguiente_cuadro))
+            if perfil:
+                perfil.marcar()  # La espera no cuenta en ninguna fase
+
+    # ===== RECARGA EN CALIENTE =====
+    def revisar_recarga(self):
+        """Aplica los cambios del .brik vigilado, si los hay, sin reiniciar la partida"""
+        try:
+            cambios = self.vigilante.revisar()
+            if not cambios:
+                return
+            datos_nuevos, claves = cambios
+            pendientes = self.recargar(datos_nuevos, claves)
+        except (SyntaxError, ValueError) as e:
+            self.renderizador.mensaje(f"Error en {self.vigilante.ruta}: {e}")
+            return
+        texto = "Recargado: " + ", ".join(sorted(claves))
+        if pendientes:
+            texto += " (requieren reiniciar: " + ", ".join(sorted(pendientes)) + ")"
+        self.renderizador.mensaje(texto)
+
+    def recargar(self, datos_nuevos, claves):
+        """Aplica en la partida en curso las definiciones de primer nivel que cambiaron,
+        conservando el tablero. Devuelve las partes que solo tendrán efecto al reiniciar"""
+        claves = [clave for clave in claves if clave in datos_nuevos]  # Las eliminadas se conservan
+        datos = dict(self.datos_juego)
+        datos.update((clave, datos_nuevos[clave]) for clave in claves)
+        # Validar todo antes de tocar nada, para no dejar la partida a medio actualizar.
+        # Se comparan las configuraciones resueltas: cambiar una definición a la que otras hacen
+        # referencia también cuenta como cambio de estas
+        config = self.config
+        nueva = analizar_juego(datos)
+        if nueva.tipo != self.tipo_juego:
+            raise ValueError("El tipo de juego no se puede cambiar sin reiniciar el programa.")
+        if self.tipo_juego == "TETRIS" and nueva.piezas != config.piezas:
+            piezas = nueva.piezas
+            if nueva.tablero.ancho != self.ancho:
+                # El tablero nuevo aún no está en uso: las piezas se centran en el actual
+                piezas = compilar_piezas(resolver_referencias(datos).get('piezas', {}), self.ancho)
+            self.recargar_piezas(piezas)
         
-        self.mostrar_game_over()
+        if nueva.velocidad_inicial != config.velocidad_inicial:
+            self.recargar_velocidad(config.velocidad_inicial, nueva.velocidad_inicial)
+        self.nombre_juego = nueva.nombre
+        self.controles = nueva.controles
+        self.reglas = nueva.reglas
+        pendientes = []
+        if nueva.tablero != config.tablero:
+            pendientes.append('tablero')
+        if self.tipo_juego == "SNAKE" and nueva.longitud_inicial != config.longitud_inicial:
+            self.longitud_serpiente = nueva.longitud_inicial
+            pendientes.append('longitud_inicial')
+        self.datos_juego.update((clave, datos_nuevos[clave]) for clave in claves)
+        self.config = nueva
+        
+        self.todo_sucio = True
+        self.teclas = self.construir_teclas()
+        self.panel_base = self.construir_panel_base()
+        if self.renderizador:
+            self.renderizador.invalidar()
+        return pendientes
+
+    def recargar_velocidad(self, anterior, nueva):
+        """Cambia la velocidad base conservando los aumentos ganados durante la partida"""
+        factor = nueva / anterior if isinstance(anterior, (int, float)) and anterior > 0 else None
+        if self.tipo_juego == "TETRIS":
+            self.velocidad_caida = self.velocidad_caida * factor if factor else nueva
+        else:
+            self.velocidad_movimiento = self.velocidad_movimiento * factor if factor else nueva
+
+    def recargar_piezas(self, piezas):
+        """Sustituye el conjunto de piezas; la pieza en juego toma su nueva forma si cabe"""
+        self.piezas = piezas
+        self.nombres_piezas = list(piezas.keys())
+        self.margen_bits = self.calcular_margen_bits()
+        if self.tablero and self.margen_bits > self.tablero.margen:
+            self.tablero = TableroBits.desde_grid(self.tablero.a_grid(), self.margen_bits)
+        
+        nueva = piezas.get(self.pieza_actual.nombre) if self.pieza_actual else None
+        if nueva:
+            anterior = (self.pieza_actual, self.pieza_rotacion)
+            self.pieza_actual = nueva
+            self.pieza_rotacion %= len(nueva.rotaciones)
+            if self.verificar_colision_tetris():
+                self.pieza_actual, self.pieza_rotacion = anterior
 
     def manejar_input(self):
         """Maneja las entradas del teclado"""
-        if msvcrt.kbhit():
-            key = msvcrt.getch()
-            
-            if self.tipo_juego == "TETRIS":
-                if key == b'a':  # Mover izquierda
-                    self.mover_pieza_lateral(-1)
-                elif key == b'd':  # Mover derecha
-                    self.mover_pieza_lateral(1)
-                elif key == b's':  # Acelerar caída
-                    self.mover_pieza_abajo()
-                elif key == b'w':  # Rotar
-                    self.rotar_pieza()
-                elif key == b'p':  # Pausa
-                    self.pausar()
-                elif key == b'q':  # Salir
-                    self.juego_terminado = True
+        if self.teclado.hay_tecla():
+            key = self.teclado.leer()
+            accion = self.teclas.get(key)
             
-            elif self.tipo_juego == "SNAKE":
-                if key == b'w' and self.serpiente_direccion != (0, 1):  # Arriba
-                    self.serpiente_direccion = (0, -1)
-                elif key == b's' and self.serpiente_direccion != (0, -1):  # Abajo
-                    self.serpiente_direccion = (0, 1)
-                elif key == b'a' and self.serpiente_direccion != (1, 0):  # Izquierda
-                    self.serpiente_direccion = (-1, 0)
-                elif key == b'd' and self.serpiente_direccion != (-1, 0):  # Derecha
-                    self.serpiente_direccion = (1, 0)
-                elif key == b'p':  # Pausa
-                    self.pausar()
-                elif key == b'q':  # Salir
-                    self.juego_terminado = True
+            if accion == 'pausar':
+                self.pausar()
+            elif accion is not None:
+                self.aplicar_accion(accion)
 
-    def dibujar(self):
-        """Renderiza el juego en pantalla"""
-        os.system('cls')
-        grid_display = [list(fila) for fila in self.grid]
+    def construir_panel_base(self):
+        """Textos fijos del panel lateral (se calculan una sola vez)"""
+        panel = [""] * 10
+        panel[1] = f"  {self.nombre_juego}"
+        panel[5] = "  CONTROLES:"
+        # Las teclas salen del mapa de controles cargado (incluidas las redefinidas en el .brik)
+        etiquetas = {accion: etiqueta_tecla(tecla) for tecla, accion in self.teclas.items()}
+
+        def linea(*acciones):
+            partes = [f"{etiquetas[accion]}: {texto}" for accion, texto in acciones if accion in etiquetas]
+            return "  " + "  ".join(partes) if partes else ""
+
+        if self.tipo_juego == "TETRIS":
+            panel[6:10] = [
+                linea(('mover_izquierda', "Izquierda")),
+                linea(('mover_derecha', "Derecha")),
+                linea(('rotar', "Rotar")),
+                linea(('acelerar_abajo', "Bajar"), ('soltar', "Soltar")),
+            ]
+            panel.append(linea(('pausar', "Pausa"), ('salir', "Salir")))
+        else:
+            direcciones = [etiquetas.get(accion, "-") for accion in
+                           ('mover_arriba', 'mover_izquierda', 'mover_abajo', 'mover_derecha')]
+            separador = "" if all(len(e) == 1 for e in direcciones) else "/"
+            panel[6:9] = [f"  {separador.join(direcciones)}: Mover",
+                          linea(('pausar', "Pausa")), linea(('salir', "Salir"))]
+        return panel
+
+    def construir_panel(self):
+        """Panel lateral del cuadro actual"""
+        panel = list(self.panel_base)
+        panel[3] = f"  PUNTUACION: {self.puntuacion}"
+        x0, y0, ancho_vista, alto_vista = self.vista or (0, 0, self.ancho, self.alto)
+        if (ancho_vista, alto_vista) != (self.ancho, self.alto):
+            panel[4] = f"  VISTA: {x0},{y0} ({self.ancho}x{self.alto})"
+        if self.pista and self.pista.resultado:
+            colocacion = self.pista.resultado
+            panel.append(f"  PISTA: rotación {colocacion.rotacion}, columna {colocacion.x}")
+        if self.perfilador:
+            panel += self.perfilador.lineas
+        return panel
+
+    def avanzar_pista(self):
+        """Continúa la búsqueda de la mejor colocación sin pasar de PRESUPUESTO_PISTA por cuadro"""
+        if self.tipo_juego != "TETRIS" or not self.pieza_actual:
+            return
+        if self.pista is None or self.pista.numero_pieza != self.piezas_generadas:
+            if self.pista is None or self.pista.buscador.piezas is not self.piezas:
+                buscador = Buscador(self.piezas, self.ancho, self.alto, margen=self.margen_bits)
+            else:
+                buscador = self.pista.buscador
+            self.pista = BusquedaIncremental(buscador, self)
+        if not self.pista.terminada:
+            self.pista.avanzar(PRESUPUESTO_PISTA)
+
+    def calcular_vista(self):
+        """Ventana visible del tablero (x0, y0, ancho, alto); sigue a la pieza o a la cabeza"""
+        if self.tam_vista is None:
+            return (0, 0, self.ancho, self.alto)
+        ancho_vista = min(self.tam_vista[0], self.ancho)
+        alto_vista = min(self.tam_vista[1], self.alto)
         
         if self.tipo_juego == "TETRIS" and self.pieza_actual:
-            # Dibujar pieza actual
-            matriz_pieza = self.pieza_actual['rotaciones'][self.pieza_rotacion]
-            for y_offset, fila in enumerate(matriz_pieza):
-                for x_offset, celda in enumerate(fila):
-                    if celda == 1:
-                        pos_x, pos_y = self.pieza_x + x_offset, self.pieza_y + y_offset
-                        if 0 <= pos_y < self.alto and 0 <= pos_x < self.ancho:
-                            grid_display[pos_y][pos_x] = 2
+            rotacion = self.pieza_actual.rotaciones[self.pieza_rotacion]
+            foco_x = self.pieza_x + rotacion.min_x + rotacion.ancho // 2
+            foco_y = self.pieza_y + rotacion.min_y
+        elif self.tipo_juego == "SNAKE" and self.serpiente_cuerpo:
+            foco_x, foco_y = self.serpiente_cuerpo[0]
+        else:
+            return self.vista or (0, 0, ancho_vista, alto_vista)
         
-        elif self.tipo_juego == "SNAKE":
-            # Dibujar serpiente
-            for i, (x, y) in enumerate(self.serpiente_cuerpo):
-                if 0 <= y < self.alto and 0 <= x < self.ancho:
-                    grid_display[y][x] = 3 if i == 0 else 2  # Cabeza diferente
-            
-            # Dibujar comida
-            if self.posicion_comida:
-                x, y = self.posicion_comida
-                if 0 <= y < self.alto and 0 <= x < self.ancho:
-                    grid_display[y][x] = 4
-
-        # Construir pantalla
-        buffer_pantalla = ["#" + "-" * (self.ancho * 2) + "#"]
+        x0, y0 = (self.vista or (0, 0))[:2]
+        return (seguir_foco(x0, foco_x, ancho_vista, self.ancho),
+                seguir_foco(y0, foco_y, alto_vista, self.alto),
+                ancho_vista, alto_vista)
+
+    def filas_pieza(self, pieza_y=None):
+        """Filas del tablero que ocupa la pieza en juego (o la pieza si estuviera en pieza_y)"""
+        if self.tipo_juego != "TETRIS" or not self.pieza_actual:
+            return frozenset()
+        if pieza_y is None:
+            pieza_y = self.pieza_y
+        rotacion = self.pieza_actual.rotaciones[self.pieza_rotacion]
+        return frozenset(range(max(pieza_y + rotacion.min_y, 0),
+                               min(pieza_y + rotacion.max_y + 1, self.alto)))
+
+    def construir_fila(self, y):
+        """Códigos de celda de la fila y del tablero dentro de la vista actual"""
+        x0, _, ancho_vista, _ = self.vista
+        x1 = x0 + ancho_vista
         
-        for y in range(self.alto):
-            linea = "|"
-            for x in range(self.ancho):
-                celda = grid_display[y][x]
-                if celda == 0: 
-                    linea += "  "  # Vacío
-                elif celda == 1: 
-                    linea += "[]"  # Bloque fijo (Tetris)
-                elif celda == 2: 
-                    linea += "[]"  # Bloque móvil/Serpiente cuerpo
-                elif celda == 3: 
-                    linea += "()"  # Cabeza serpiente
-                elif celda == 4: 
-                    linea += "**"  # Comida
-            linea += "|"
-            
-            # Información lateral
-            if y == 1:
-                linea += f"  {self.nombre_juego}"
-            elif y == 3:
-                linea += f"  PUNTUACION: {self.puntuacion}"
-            elif y == 5:
-                linea += "  CONTROLES:"
-            elif y == 6:
-                if self.tipo_juego == "TETRIS":
-                    linea += "  A: Izquierda"
-                else:
-                    linea += "  WASD: Mover"
-            elif y == 7:
-                if self.tipo_juego == "TETRIS":
-                    linea += "  D: Derecha"
-                else:
-                    linea += "  P: Pausa"
-            elif y == 8:
-                if self.tipo_juego == "TETRIS":
-                    linea += "  W: Rotar"
-                else:
-                    linea += "  Q: Salir"
-            elif y == 9:
-                if self.tipo_juego == "TETRIS":
-                    linea += "  S: Bajar"
-            
-            buffer_pantalla.append(linea)
+        if self.tipo_juego == "TETRIS":
+            if self.tablero:
+                bits = self.tablero.filas[y] >> (self.tablero.margen + x0)
+                fila = [(bits >> x) & 1 for x in range(ancho_vista)]
+            else:
+                fila = list(self.grid[y][x0:x1])
+            # Dibujar la pieza fantasma (donde aterrizaría) y encima la pieza actual
+            if self.pieza_actual:
+                rotacion = self.pieza_actual.rotaciones[self.pieza_rotacion]
+                for pieza_y, codigo in ((self.fantasma_y, 5), (self.pieza_y, 2)):
+                    if pieza_y is None:
+                        continue
+                    for x_offset, y_offset in rotacion.celdas:
+                        pos_x = self.pieza_x + x_offset
+                        if pieza_y + y_offset == y and x0 <= pos_x < x1:
+                            fila[pos_x - x0] = codigo
+            return fila
         
-        buffer_pantalla.append("#" + "-" * (self.ancho * 2) + "#")
-        print("\n".join(buffer_pantalla))
+        # Dibujar serpiente (cabeza diferente) y comida
+        posicion = self.celdas_libres.posicion[y]
+        fila = [2 if indice < 0 else 0 for indice in posicion[x0:x1]]
+        cabeza = self.serpiente_cuerpo[0] if self.serpiente_cuerpo else None
+        for celda, codigo in ((cabeza, 3), (self.posicion_comida, 4)):
+            if celda and celda[1] == y and x0 <= celda[0] < x1:
+                fila[celda[0] - x0] = codigo
+        return fila
+
+    def construir_cuadro(self):
+        """Devuelve (filas, sucias): los códigos de celda de la vista y los índices (relativos
+        a la vista) de las filas que cambiaron desde el cuadro anterior, o None si cambió todo.
+        Solo se reconstruyen las filas marcadas como sucias y las de la pieza en juego"""
+        vista = self.calcular_vista()
+        filas_pieza = self.filas_pieza()
+        self.fantasma_y = None
+        if self.tipo_juego == "TETRIS" and self.pieza_actual and not self.juego_terminado:
+            self.fantasma_y = self.fila_aterrizaje()
+            filas_pieza |= self.filas_pieza(self.fantasma_y)
+        _, y0, _, alto_vista = vista
+        
+        if self.todo_sucio or vista != self.vista:
+            self.vista = vista
+            self.cuadro = [self.construir_fila(y) for y in range(y0, y0 + alto_vista)]
+            sucias = None
+        else:
+            sucias = []
+            for y in self.filas_sucias | self.filas_pieza_dibujadas | filas_pieza:
+                if y0 <= y < y0 + alto_vista:
+                    self.cuadro[y - y0] = self.construir_fila(y)
+                    sucias.append(y - y0)
+        
+        self.todo_sucio = False
+        self.filas_sucias.clear()
+        self.filas_pieza_dibujadas = filas_pieza
+        return self.cuadro, sucias
+
+    def dibujar(self):
+        """Renderiza el juego en pantalla (solo las filas que cambiaron)"""
+        filas, sucias = self.construir_cuadro()
+        self.renderizador.dibujar(filas, self.construir_panel(), sucias)
 
     # ===== LÓGICA TETRIS =====
     def generar_nueva_pieza(self):
         """Genera una nueva pieza para Tetris"""
-        if not self.piezas:
-            # Piezas por defecto si no hay definidas
-            self.piezas = {
-                "I": {"rotaciones": [[0,0,0,0], [1,1,1,1], [0,0,0,0], [0,0,0,0]]}
-            }
-        
-        nombre_pieza = random.choice(list(self.piezas.keys()))
+        if self.reglas.aparicion_aleatoria:
+            self.separar_rng()
+            nombre_pieza = self.rng.choice(self.nombres_piezas)
+        else:
+            nombre_pieza = self.nombres_piezas[self.piezas_generadas % len(self.nombres_piezas)]
+        self.piezas_generadas += 1
         self.pieza_actual = self.piezas[nombre_pieza]
-        self.pieza_x = self.ancho // 2 - 2
-        self.pieza_y = 0
         self.pieza_rotacion = 0
+        self.pieza_x = self.pieza_actual.rotaciones[0].columna_inicio
+        self.pieza_y = 0
         
         # Verificar game over
         if self.verificar_colision_tetris():
             self.juego_terminado = True
+            self.reglas.disparar(self, 'pieza_alcanza_tope')
 
     def verificar_colision_tetris(self):
         """Verifica colisiones en Tetris"""
         if not self.pieza_actual:
             return False
+        
+        rotacion = self.pieza_actual.rotaciones[self.pieza_rotacion]
+        if self.tablero:
+            return self.tablero.colisiona(rotacion.mascaras, self.pieza_x, self.pieza_y)
             
-        matriz = self.pieza_actual['rotaciones'][self.pieza_rotacion]
-        for y_offset, fila in enumerate(matriz):
-            for x_offset, celda in enumerate(fila):
-                if celda == 1:
-                    x, y = self.pieza_x + x_offset, self.pieza_y + y_offset
-                    if (x < 0 or x >= self.ancho or y >= self.alto or 
-                        (y >= 0 and self.grid[y][x] == 1)):
-                        return True
+        for x_offset, y_offset in rotacion.celdas:
+            x, y = self.pieza_x + x_offset, self.pieza_y + y_offset
+            if (x < 0 or x >= self.ancho or y >= self.alto or 
+                (y >= 0 and self.grid[y][x] == 1)):
+                return True
         return False
 
     def mover_pieza_lateral(self, dx):
@@ -243,9 +702,56 @@ class Juego:
         self.pieza_y += 1
         if self.verificar_colision_tetris():
             self.pieza_y -= 1
-            self.fijar_pieza()
-            self.verificar_lineas_completas()
-            self.generar_nueva_pieza()
+            self.asentar_pieza()
+
+    def asentar_pieza(self):
+        """Fija la pieza donde está, elimina las líneas completas y saca la siguiente"""
+        self.fijar_pieza()
+        self.reglas.disparar(self, 'pieza_fijada')
+        self.verificar_lineas_completas()
+        self.generar_nueva_pieza()
+
+    def soltar_pieza(self):
+        """Caída instantánea: la pieza baja hasta su fila de aterrizaje y se fija"""
+        if not self.pieza_actual:
+            return
+        self.pieza_y = self.fila_aterrizaje()
+        self.asentar_pieza()
+
+    def fila_aterrizaje(self):
+        """pieza_y en la que se detendría la pieza actual si cayera en línea recta.
+        Con el mapa de alturas cuesta O(ancho de la pieza); si la pieza está por debajo
+        del tope de alguna de sus columnas (bajo un saliente) se baja fila a fila"""
+        rotacion = self.pieza_actual.rotaciones[self.pieza_rotacion]
+        alturas = self.alturas
+        x, y = self.pieza_x, self.pieza_y
+        aterrizaje = self.alto
+        for dx, dy in rotacion.perfil:
+            tope = alturas[x + dx]
+            if y + dy >= tope:
+                return self.fila_aterrizaje_lenta()
+            if tope - 1 - dy < aterrizaje:
+                aterrizaje = tope - 1 - dy
+        return aterrizaje
+
+    def fila_aterrizaje_lenta(self):
+        y_original = self.pieza_y
+        while not self.verificar_colision_tetris():
+            self.pieza_y += 1
+        aterrizaje = self.pieza_y - 1
+        self.pieza_y = y_original
+        return aterrizaje
+
+    def recalcular_alturas(self):
+        """Reconstruye el mapa de alturas desde el tablero (tras modificarlo desde fuera)"""
+        self.separar()
+        celda = self.tablero.celda if self.tablero else (lambda x, y: self.grid[y][x])
+        for x in range(self.ancho):
+            y = 0
+            while y < self.alto and not celda(x, y):
+                y += 1
+            self.alturas[x] = y
+        self.todo_sucio = True
 
     def rotar_pieza(self):
         """Rota la pieza actual en Tetris"""
@@ -253,7 +759,7 @@ class Juego:
             return
             
         rotacion_original = self.pieza_rotacion
-        self.pieza_rotacion = (self.pieza_rotacion + 1) % len(self.pieza_actual['rotaciones'])
+        self.pieza_rotacion = (self.pieza_rotacion + 1) % len(self.pieza_actual.rotaciones)
         
         if self.verificar_colision_tetris():
             self.pieza_rotacion = rotacion_original
@@ -262,43 +768,81 @@ class Juego:
         """Fija la pieza actual en el grid de Tetris"""
         if not self.pieza_actual:
             return
+        
+        rotacion = self.pieza_actual.rotaciones[self.pieza_rotacion]
+        self.separar()
+        self.filas_sucias.update(self.filas_pieza())
+        alturas = self.alturas
+        for x_offset, y_offset in rotacion.celdas:
+            x, y = self.pieza_x + x_offset, self.pieza_y + y_offset
+            if 0 <= y < alturas[x]:
+                alturas[x] = y
+        if self.tablero:
+            self.tablero.fijar(rotacion.mascaras, self.pieza_x, self.pieza_y)
+            return
             
-        matriz = self.pieza_actual['rotaciones'][self.pieza_rotacion]
-        for y_offset, fila in enumerate(matriz):
-            for x_offset, celda in enumerate(fila):
-                if celda == 1:
-                    x, y = self.pieza_x + x_offset, self.pieza_y + y_offset
-                    if 0 <= y < self.alto and 0 <= x < self.ancho:
-                        self.grid[y][x] = 1
+        filas = {}
+        for x_offset, y_offset in rotacion.celdas:
+            x, y = self.pieza_x + x_offset, self.pieza_y + y_offset
+            if 0 <= y < self.alto and 0 <= x < self.ancho:
+                if y not in filas:
+                    filas[y] = list(self.grid[y])
+                filas[y][x] = 1
+        for y, fila in filas.items():
+            self.grid[y] = tuple(fila)
 
     def verificar_lineas_completas(self):
         """Verifica y elimina líneas completas en Tetris"""
-        lineas_completas = []
-        for y in range(self.alto):
-            if all(self.grid[y]):
-                lineas_completas.append(y)
+        self.separar()
+        if self.tablero:
+            lineas = self.tablero.limpiar_lineas()
+        else:
+            lineas_completas = []
+            for y in range(self.alto):
+                if all(self.grid[y]):
+                    lineas_completas.append(y)
+            
+            for linea in lineas_completas:
+                del self.grid[linea]
+                self.grid.insert(0, (0,) * self.ancho)
+            lineas = len(lineas_completas)
         
-        for linea in lineas_completas:
-            del self.grid[linea]
-            self.grid.insert(0, [0] * self.ancho)
-            self.puntuacion += 100
+        if lineas:
+            # Solo pueden completarse filas de la pieza recién fijada: bajan todas las de encima
+            self.filas_sucias.update(range(max(self.filas_pieza(), default=self.alto - 1) + 1))
+            self.bajar_alturas()
+            self.reglas.disparar(self, 'linea_completada', lineas)
+
+    def bajar_alturas(self):
+        """Tras eliminar líneas las celdas solo bajan: cada tope se busca desde el anterior"""
+        celda = self.tablero.celda if self.tablero else (lambda x, y: self.grid[y][x])
+        alturas, alto = self.alturas, self.alto
+        for x in range(self.ancho):
+            y = alturas[x]
+            while y < alto and not celda(x, y):
+                y += 1
+            alturas[x] = y
 
     # ===== LÓGICA SNAKE =====
     def generar_comida(self):
-        """Genera comida en una posición aleatoria para Snake"""
-        while True:
-            x = random.randint(0, self.ancho - 1)
-            y = random.randint(0, self.alto - 1)
-            if (x, y) not in self.serpiente_cuerpo:
-                self.posicion_comida = (x, y)
-                break
+        """Genera comida en una celda libre al azar para Snake"""
+        self.separar_rng()
+        if self.posicion_comida:
+            self.filas_sucias.add(self.posicion_comida[1])
+        self.posicion_comida = self.celdas_libres.elegir(self.rng)
+        if self.posicion_comida is None:
+            # La serpiente ocupa todo el tablero
+            self.victoria = True
+            self.juego_terminado = True
+        else:
+            self.filas_sucias.add(self.posicion_comida[1])
 
     def mover_serpiente(self):
         """Mueve la serpiente en la dirección actual"""
         if not self.serpiente_cuerpo:
             return
             
-        cabeza_x, cabeza_y = self.serpiente_cuerpo[0]
+        cabeza_x, cabeza_y = self.serpiente_cuerpo.cabeza
         dir_x, dir_y = self.serpiente_direccion
         nueva_cabeza = (cabeza_x + dir_x, cabeza_y + dir_y)
         
@@ -306,58 +850,178 @@ class Juego:
         if (nueva_cabeza[0] < 0 or nueva_cabeza[0] >= self.ancho or 
             nueva_cabeza[1] < 0 or nueva_cabeza[1] >= self.alto):
             self.juego_terminado = True
+            self.reglas.disparar(self, 'cabeza_fuera_del_tablero')
             return
         
-        # Verificar colisión consigo misma
-        if nueva_cabeza in self.serpiente_cuerpo:
+        # Verificar colisión consigo misma (las celdas que no están libres son de la serpiente)
+        if self.celdas_libres.posicion[nueva_cabeza[1]][nueva_cabeza[0]] < 0:
             self.juego_terminado = True
+            self.reglas.disparar(self, 'cabeza_toca_cuerpo')
             return
         
         # Mover serpiente
-        self.serpiente_cuerpo.insert(0, nueva_cabeza)
+        self.separar()
+        self.filas_sucias.add(cabeza_y)
+        self.filas_sucias.add(nueva_cabeza[1])
+        self.serpiente_cuerpo.agregar_cabeza(nueva_cabeza)
+        self.celdas_libres.ocupar(nueva_cabeza)
         
         # Verificar si come comida
         if nueva_cabeza == self.posicion_comida:
-            self.puntuacion += 10
+            # Los puntos y el aumento de velocidad vienen de las reglas del .brik
+            self.reglas.disparar(self, 'serpiente_come_comida')
             self.generar_comida()
-            # Aumentar velocidad cada 50 puntos
-            if self.puntuacion % 50 == 0:
-                self.velocidad_movimiento *= 1.2
         else:
-            self.serpiente_cuerpo.pop()
+            cola = self.serpiente_cuerpo.quitar_cola()
+            self.filas_sucias.add(cola[1])
+            if cola[0] >= 0:
+                self.celdas_libres.liberar(cola)
 
     def pausar(self):
         """Pausa el juego"""
-        print("\nJUEGO EN PAUSA - Presiona cualquier tecla para continuar...")
-        msvcrt.getch()
+        self.renderizador.mensaje("JUEGO EN PAUSA - Presiona cualquier tecla para continuar...")
+        self.teclado.leer()
+        self.renderizador.mensaje("")
+        # El tiempo en pausa no cuenta para la lógica
+        self.reloj = time.perf_counter()
+        if self.perfilador:
+            self.perfilador.reanudar()
 
     def mostrar_game_over(self):
         """Muestra pantalla de game over"""
-        os.system('cls')
+        self.renderizador.limpiar()
         print("\n" + "=" * 40)
-        print("         JUEGO TERMINADO")
+        print("         ¡VICTORIA!" if self.victoria else "         JUEGO TERMINADO")
         print("=" * 40)
         print(f"    Juego: {self.nombre_juego}")
         print(f"    Puntuación Final: {self.puntuacion}")
+        if self.perfilador and self.perfilador.ruta_json:
+            try:
+                self.perfilador.guardar(self)
+                print(f"    Perfil guardado en {self.perfilador.ruta_json}")
+            except OSError as e:
+                print(f"    No se pudo guardar el perfil: {e}")
         print("\n" + " " * 10 + "Presiona cualquier tecla para salir...")
-        msvcrt.getch()
+        self.teclado.leer()
 
-if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Uso: python runtime.py <archivo_juego.ast>")
-        sys.exit(1)
-    
-    archivo_juego = sys.argv[1]
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Motor de juego para Tetris y Snake.")
+    parser.add_argument('archivo_juego', help="archivo .ast, .astb, .brik o paquete .brikpak")
+    parser.add_argument('--juego', metavar='CLAVE', help="juego del paquete .brikpak que se carga")
+    parser.add_argument('--listar', action='store_true', help="lista los juegos del paquete .brikpak y sale")
+    parser.add_argument('--vigilar', action='store_true',
+                        help="recarga en caliente los cambios del .brik durante la partida")
+    parser.add_argument('--semilla', type=int, default=None, help="semilla de la partida")
+    parser.add_argument('--bitboard', action='store_true', help="usa el tablero de bits (Tetris)")
+    parser.add_argument('--grabar', metavar='ARCHIVO', help="graba las acciones de la partida")
+    parser.add_argument('--reproducir', metavar='ARCHIVO',
+                        help="reproduce una grabación sin pantalla y verifica el resultado")
+    parser.add_argument('--pistas', action='store_true',
+                        help="sugiere en el panel la mejor colocación de cada pieza (Tetris)")
+    parser.add_argument('--vista', metavar='ANCHOxALTO',
+                        help="tamaño máximo de la ventana visible del tablero (por defecto, el de la terminal)")
+    parser.add_argument('--perfil', metavar='ARCHIVO',
+                        help="mide input, lógica y dibujado por cuadro, lo muestra en el panel "
+                             "y lo guarda en este JSON al terminar")
+    args = parser.parse_args(argv)
+    archivo_juego = args.archivo_juego
+    if args.listar:
+        return main_listar(archivo_juego)
     
     try:
-        with open(archivo_juego, 'r', encoding='utf-8') as f:
-            datos_juego = json.load(f)
+        datos_juego, piezas = cargar_juego(archivo_juego, args.juego)
     except IOError:
         print(f"Error: No se pudo encontrar el archivo {archivo_juego}")
-        sys.exit(1)
+        return 1
     except json.JSONDecodeError:
         print(f"Error: El archivo {archivo_juego} no tiene formato JSON válido")
-        sys.exit(1)
+        return 1
+    except SyntaxError as e:
+        print(f"Error de sintaxis en {archivo_juego}:")
+        for mensaje in syntax_error_lines(e):
+            print("  " + mensaje)
+        return 1
+    except ValueError as e:
+        print(f"Error en la definición del juego {archivo_juego}: {e}")
+        return 1
+    
+    if args.reproducir:
+        return main_reproducir(args.reproducir, datos_juego, piezas, args.bitboard)
     
-    juego = Juego(datos_juego)
-    juego.run()
+    semilla = args.semilla
+    if semilla is None and args.grabar:
+        semilla = random.randrange(2**32)   # La grabación necesita una semilla conocida
+    juego = Juego(datos_juego, semilla=semilla, bitboard=args.bitboard, piezas=piezas)
+    if args.vigilar and args.grabar:
+        print("Error: --grabar no es compatible con --vigilar (la recarga no se puede reproducir)")
+        return 1
+    if args.vigilar:
+        if not archivo_juego.endswith('.brik'):
+            print("Error: --vigilar requiere un archivo .brik")
+            return 1
+        juego.vigilante = VigilanteBrik(archivo_juego)
+    
+    if args.vista:
+        try:
+            ancho_vista, alto_vista = (int(valor) for valor in args.vista.lower().split('x'))
+        except ValueError:
+            print(f"Error: --vista debe tener la forma ANCHOxALTO, no {args.vista}")
+            return 1
+        juego.tam_vista = (max(ancho_vista, 1), max(alto_vista, 1))
+    juego.pistas = args.pistas
+    if args.perfil:
+        juego.perfilador = PerfiladorCuadros(args.perfil)
+    grabacion = Grabacion.para(juego) if args.grabar else None
+    try:
+        juego.run()
+    finally:
+        if grabacion:
+            grabacion.cerrar(juego)
+            grabacion.guardar(args.grabar, juego.acciones)
+    if grabacion:
+        print(f"Partida grabada en {args.grabar} (semilla {semilla})")
+    # Se muestran al salir: durante la partida la pantalla la ocupa el juego
+    for aviso in juego.reglas.advertencias:
+        print(f"Aviso: {aviso}")
+    return 0
+
+
+def main_listar(ruta):
+    """Muestra los juegos de un paquete leyendo solo su índice"""
+    try:
+        with paquete.Paquete(ruta) as contenido:
+            juegos = contenido.juegos()
+    except (IOError, ValueError) as e:
+        print(f"Error: No se pudo leer el paquete {ruta}: {e}")
+        return 1
+    for clave, juego in juegos.items():
+        print(f"{clave:20} {juego['tipo']:7} {juego['ancho']}x{juego['alto']:<6} {juego['nombre']}")
+    return 0
+
+
+def main_reproducir(ruta, datos_juego, piezas, bitboard):
+    """Reproduce una grabación; devuelve 1 si el resultado no coincide"""
+    try:
+        grabacion = Grabacion.cargar(ruta)
+        juego = Juego(datos_juego, semilla=grabacion.semilla, bitboard=bitboard, piezas=piezas)
+        resultado = reproducir(grabacion, juego)
+    except (IOError, json.JSONDecodeError, KeyError) as e:
+        print(f"Error: No se pudo leer la grabación {ruta}: {e}")
+        return 1
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    
+    obtenido = resultado['obtenido']
+    print(f"Ticks: {obtenido['ticks']}  Puntuación: {obtenido['puntuacion']}  Estado: {obtenido['estado']}")
+    print(f"Tiempo: {resultado['segundos']:.3f} s ({resultado['ticks_por_segundo']:.0f} ticks/s)")
+    if not resultado['correcta']:
+        esperado = resultado['esperado']
+        for clave in resultado['diferencias']:
+            print(f"DIFERENCIA en {clave}: esperado {esperado[clave]}, obtenido {obtenido[clave]}")
+        return 1
+    print("Reproducción correcta")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
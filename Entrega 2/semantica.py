@@ -0,0 +1,231 @@
+# semantica.py
+# Análisis semántico del AST de un .brik
+# Después del análisis sintáctico: resuelve las referencias a otras definiciones (un identificador sin
+# comillas que nombra una definición de primer nivel, como "longitud_inicial": longitud_inicial),
+# detecta las referencias circulares y comprueba los tipos de las secciones conocidas. El resultado
+# es un ConfigJuego inmutable que el runtime lee por atributos en lugar de buscar claves en el AST.
+
+from dataclasses import dataclass
+
+from piezas import compilar_piezas
+from reglas import compilar_reglas
+
+NOMBRE_POR_DEFECTO = 'Juego Desconocido'
+TABLERO_POR_DEFECTO = (10, 20)
+VELOCIDAD_POR_DEFECTO = {"TETRIS": 1.0, "SNAKE": 3.0}
+LONGITUD_POR_DEFECTO = 3
+
+
+class Identificador(str):
+    """Valor escrito sin comillas en el .brik; si nombra una definición es una referencia a ella.
+    Se comporta como una cadena normal (el AST JSON o binario no lo distingue; ver marcar_referencias)"""
+    __slots__ = ()
+
+
+@dataclass(frozen=True, slots=True)
+class TableroConfig:
+    ancho: int
+    alto: int
+
+
+@dataclass(frozen=True, slots=True)
+class MapaControles:
+    teclas: tuple           # ((acción, tecla), ...) en el orden del .brik
+
+    def get(self, accion, defecto=None):
+        for nombre, tecla in self.teclas:
+            if nombre == accion:
+                return tecla
+        return defecto
+
+
+@dataclass(frozen=True, slots=True)
+class ConfigJuego:
+    nombre: str
+    tipo: str               # "TETRIS" o "SNAKE"
+    tablero: TableroConfig
+    velocidad_inicial: float
+    longitud_inicial: int   # Solo Snake
+    piezas: dict            # nombre -> Pieza (solo Tetris)
+    controles: MapaControles
+    reglas: object          # MotorReglas
+
+
+# ===== REFERENCIAS =====
+def es_contenedor(valor):
+    return isinstance(valor, (dict, list))
+
+
+def referencias(valor):
+    """Identificadores que aparecen dentro de valor (a cualquier profundidad, sin recursión)"""
+    if isinstance(valor, Identificador):
+        yield valor
+        return
+    pendientes = [valor] if es_contenedor(valor) else []
+    while pendientes:
+        actual = pendientes.pop()
+        for hijo in actual.values() if isinstance(actual, dict) else actual:
+            if isinstance(hijo, Identificador):
+                yield hijo
+            elif es_contenedor(hijo):
+                pendientes.append(hijo)
+
+
+def orden_de_resolucion(dependencias):
+    """Orden topológico de las definiciones (cada una después de las que usa).
+    Lanza ValueError con el ciclo si hay referencias circulares"""
+    orden = []
+    estado = {}     # nombre -> 1 en curso, 2 terminado
+    for inicio in dependencias:
+        if inicio in estado:
+            continue
+        estado[inicio] = 1
+        camino = [(inicio, iter(dependencias[inicio]))]
+        while camino:
+            nombre, siguientes = camino[-1]
+            for dependencia in siguientes:
+                marca = estado.get(dependencia)
+                if marca == 1:
+                    ciclo = [n for n, _ in camino]
+                    ciclo = ciclo[ciclo.index(dependencia):] + [dependencia]
+                    raise ValueError("Referencia circular: " + " -> ".join(ciclo))
+                if marca is None:
+                    estado[dependencia] = 1
+                    camino.append((dependencia, iter(dependencias[dependencia])))
+                    break
+            else:
+                estado[nombre] = 2
+                orden.append(nombre)
+                camino.pop()
+    return orden
+
+
+def sustituir(valor, resueltos, tipo=Identificador):
+    """Copia de valor con cada referencia a una definición (valor de clase tipo que la nombra)
+    sustituida por su valor resuelto. Solo se copian los contenedores; el AST original no se modifica"""
+    if isinstance(valor, tipo):
+        return resueltos.get(valor, valor)
+    if not es_contenedor(valor):
+        return valor
+    raiz = type(valor)()
+    pendientes = [(valor, raiz)]
+    while pendientes:
+        original, copia = pendientes.pop()
+        elementos = original.items() if isinstance(original, dict) else enumerate(original)
+        for clave, hijo in elementos:
+            if isinstance(hijo, tipo):
+                hijo = resueltos.get(hijo, hijo)
+            elif es_contenedor(hijo):
+                nuevo = type(hijo)()
+                pendientes.append((hijo, nuevo))
+                hijo = nuevo
+            if copia.__class__ is list:
+                copia.append(hijo)
+            else:
+                copia[clave] = hijo
+    return raiz
+
+
+def resolver_referencias(tabla):
+    """Devuelve la tabla de símbolos con las referencias resueltas. Los identificadores que no
+    nombran ninguna definición se quedan como cadenas (p. ej. nombres de acciones); las cadenas
+    entre comillas nunca son referencias"""
+    dependencias = {
+        nombre: [ref for ref in referencias(valor) if ref in tabla] for nombre, valor in tabla.items()
+    }
+    if not any(dependencias.values()):
+        return tabla
+    resueltos = {}
+    for nombre in orden_de_resolucion(dependencias):
+        valor = tabla[nombre]
+        resueltos[nombre] = sustituir(valor, resueltos) if dependencias[nombre] else valor
+    return {nombre: resueltos[nombre] for nombre in tabla}
+
+
+def marcar_referencias(tabla):
+    """Copia de un AST cargado de un .ast o .astb con las cadenas que nombran otra definición
+    convertidas en Identificador. Esos formatos no distinguen un identificador de una cadena, y los
+    .ast antiguos (Entrega 1) guardan las referencias sin resolver; una cadena con el nombre de su
+    propia definición se deja como texto"""
+    nombres = {nombre: Identificador(nombre) for nombre in tabla}
+    marcada = {}
+    for nombre, valor in tabla.items():
+        propio = nombres.pop(nombre)
+        marcada[nombre] = sustituir(valor, nombres, str)
+        nombres[nombre] = propio
+    return marcada
+
+
+# ===== TIPOS =====
+def describir(valor):
+    if isinstance(valor, Identificador):
+        return f"'{valor}' (no hay ninguna definición con ese nombre)"
+    return repr(valor)
+
+
+def entero_positivo(ruta, valor, minimo=1):
+    if isinstance(valor, bool) or not isinstance(valor, int) or valor < minimo:
+        raise ValueError(f"'{ruta}' debe ser un entero mayor o igual que {minimo}, se encontró {describir(valor)}.")
+    return valor
+
+
+def numero_positivo(ruta, valor):
+    if isinstance(valor, bool) or not isinstance(valor, (int, float)) or valor <= 0:
+        raise ValueError(f"'{ruta}' debe ser un número positivo, se encontró {describir(valor)}.")
+    return valor
+
+
+def bloque(ruta, valor):
+    if not isinstance(valor, dict):
+        raise ValueError(f"'{ruta}' debe ser un bloque {{ ... }}, se encontró {describir(valor)}.")
+    return valor
+
+
+def analizar_tablero(datos):
+    tablero = bloque('tablero', datos.get('tablero', {}))
+    ancho, alto = TABLERO_POR_DEFECTO
+    return TableroConfig(
+        ancho=entero_positivo('tablero.ancho', tablero.get('ancho', ancho)),
+        alto=entero_positivo('tablero.alto', tablero.get('alto', alto)),
+    )
+
+
+def analizar_controles(datos):
+    controles = bloque('controles', datos.get('controles', {}))
+    for accion, tecla in controles.items():
+        if not isinstance(tecla, str):
+            raise ValueError(f"'controles.{accion}' debe ser una cadena, se encontró {describir(tecla)}.")
+    return MapaControles(tuple(controles.items()))
+
+
+def analizar_juego(datos_juego, piezas=None):
+    """Resuelve y valida el AST; devuelve un ConfigJuego o lanza ValueError.
+    piezas permite reutilizar las piezas ya compiladas (caché de .brik)"""
+    datos = resolver_referencias(datos_juego)
+    tipo = "SNAKE" if "serpiente" in datos else "TETRIS"
+    nombre = datos.get('nombre_juego', NOMBRE_POR_DEFECTO)
+    if not isinstance(nombre, str):
+        raise ValueError(f"'nombre_juego' debe ser una cadena, se encontró {describir(nombre)}.")
+    tablero = analizar_tablero(datos)
+    velocidad = numero_positivo('velocidad_inicial', datos.get('velocidad_inicial', VELOCIDAD_POR_DEFECTO[tipo]))
+
+    longitud = LONGITUD_POR_DEFECTO
+    if tipo == "SNAKE":
+        serpiente = bloque('serpiente', datos['serpiente'])
+        if 'longitud_inicial' in serpiente:
+            longitud = entero_positivo('serpiente.longitud_inicial', serpiente['longitud_inicial'])
+        else:
+            longitud = entero_positivo('longitud_inicial', datos.get('longitud_inicial', longitud))
+    elif piezas is None:
+        piezas = compilar_piezas(datos.get('piezas', {}), tablero.ancho)
+
+    return ConfigJuego(
+        nombre=nombre,
+        tipo=tipo,
+        tablero=tablero,
+        velocidad_inicial=velocidad,
+        longitud_inicial=longitud,
+        piezas=piezas if tipo == "TETRIS" else None,
+        controles=analizar_controles(datos),
+        reglas=compilar_reglas(datos, tipo),
+    )
@@ -0,0 +1,378 @@
+# servidor.py
+# Servidor de partidas por telnet: muchas sesiones de juego en un solo proceso y un solo bucle asyncio
+# Uso: python servidor.py <archivo.ast|archivo.brik|paquete.brikpak> [--juego CLAVE] [--anfitrion H]
+#                         [--puerto P] [--max-sesiones N] [--bitboard]
+# Cada conexión es una Sesion con su propio Juego y su RenderizadorANSI (envía solo las celdas que
+# cambiaron). Un único Planificador avanza todas las partidas: una cola de prioridad ordenada por el
+# instante del siguiente tick de cada una, y un dibujado por cuadro de las sesiones que cambiaron.
+# Con clientes lentos no se acumulan cuadros: mientras el búfer de escritura supera el límite alto
+# la sesión no dibuja (el siguiente cuadro trae todo lo pendiente) y si sigue bloqueada demasiado
+# tiempo se desconecta.
+
+import argparse
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import random
+
+from analizador import syntax_error_lines
+from runtime import FPS_RENDER, MAX_TICKS_POR_CUADRO, Juego, cargar_juego
+from semantica import analizar_juego
+from terminal import MOSTRAR_CURSOR, RenderizadorANSI, tam_vista_para
+
+# Comandos y opciones de telnet (RFC 854, 857, 858, 1073)
+IAC, DONT, DO, WONT, WILL, SB, SE = 255, 254, 253, 252, 251, 250, 240
+ECHO, SUPRIMIR_GA, NAWS = 1, 3, 31
+# El servidor hace el eco (es decir, ninguno) y pide modo carácter y el tamaño de la ventana
+NEGOCIACION = bytes((IAC, WILL, ECHO, IAC, WILL, SUPRIMIR_GA, IAC, DO, NAWS))
+
+PANTALLA_POR_DEFECTO = (80, 24)     # Columnas y líneas si el cliente no informa su tamaño (NAWS)
+MAX_TECLAS_POR_LECTURA = 16         # Teclas atendidas por lectura; el resto se descarta
+MAX_SUBNEGOCIACION = 64             # Bytes guardados de una subnegociación telnet
+BUFFER_ALTO = 64 * 1024             # Bytes pendientes de envío a partir de los que se deja de dibujar
+BUFFER_BAJO = 16 * 1024             # Bytes pendientes por debajo de los que se vuelve a dibujar
+MAX_BLOQUEO = 10.0                  # Segundos con el búfer lleno antes de desconectar al cliente
+
+# Estados del filtro telnet
+DATOS, COMANDO, OPCION, SUBNEGOCIACION, SUBNEGOCIACION_IAC = range(5)
+
+registro = logging.getLogger('servidor')
+
+
+class FiltroTelnet:
+    """Separa las teclas de los comandos telnet (IAC ...) de una conexión.
+    Guarda el estado entre lecturas porque un comando puede llegar partido"""
+
+    def __init__(self):
+        self.estado = DATOS
+        self.subnegociacion = bytearray()
+
+    def filtrar(self, datos):
+        """Devuelve (teclas, pantalla): los bytes de teclas y (columnas, lineas) si el cliente
+        informó el tamaño de su ventana en estos datos (si no, None)"""
+        teclas = bytearray()
+        pantalla = None
+        estado = self.estado
+        for byte in datos:
+            if estado == DATOS:
+                if byte == IAC:
+                    estado = COMANDO
+                elif byte not in (0, 10, 13):  # Fin de línea de telnet (CR LF / CR NUL)
+                    teclas.append(byte)
+            elif estado == COMANDO:
+                if byte == IAC:
+                    teclas.append(byte)  # IAC IAC: el byte 255 literal
+                    estado = DATOS
+                elif byte in (WILL, WONT, DO, DONT):
+                    estado = OPCION
+                elif byte == SB:
+                    self.subnegociacion.clear()
+                    estado = SUBNEGOCIACION
+                else:
+                    estado = DATOS
+            elif estado == OPCION:
+                estado = DATOS  # Las respuestas a la negociación no cambian nada
+            elif estado == SUBNEGOCIACION:
+                if byte == IAC:
+                    estado = SUBNEGOCIACION_IAC
+                elif len(self.subnegociacion) < MAX_SUBNEGOCIACION:
+                    self.subnegociacion.append(byte)
+            else:
+                if byte == SE:
+                    pantalla = self.leer_subnegociacion() or pantalla
+                    estado = DATOS
+                else:
+                    if byte == IAC and len(self.subnegociacion) < MAX_SUBNEGOCIACION:
+                        self.subnegociacion.append(byte)
+                    estado = SUBNEGOCIACION
+        self.estado = estado
+        return teclas, pantalla
+
+    def leer_subnegociacion(self):
+        """(columnas, lineas) de una subnegociación NAWS, o None"""
+        datos = self.subnegociacion
+        if len(datos) != 5 or datos[0] != NAWS:
+            return None
+        columnas = (datos[1] << 8) | datos[2]
+        lineas = (datos[3] << 8) | datos[4]
+        if not columnas or not lineas:
+            return None  # 0 = tamaño desconocido
+        return columnas, lineas
+
+
+class Sesion(asyncio.Protocol):
+    """Una conexión: su partida, su renderizador y el estado de su búfer de escritura"""
+
+    def __init__(self, servidor):
+        self.servidor = servidor
+        self.transporte = None
+        self.juego = None
+        self.telnet = FiltroTelnet()
+        self.estado = 'jugando'     # 'jugando', 'pausa' o 'fin'
+        self.sucia = True           # Hay algo que dibujar desde el último cuadro
+        self.bloqueada_desde = None  # Instante en que se llenó el búfer de escritura
+        self.turno = 0              # Invalida las entradas antiguas de la cola del planificador
+
+    # ===== CONEXIÓN =====
+    def connection_made(self, transporte):
+        self.transporte = transporte
+        servidor = self.servidor
+        if len(servidor.sesiones) >= servidor.max_sesiones:
+            transporte.write("Servidor lleno, inténtalo más tarde.\r\n".encode())
+            transporte.close()
+            return
+        transporte.set_write_buffer_limits(high=BUFFER_ALTO, low=BUFFER_BAJO)
+        transporte.write(NEGOCIACION)
+        self.juego = servidor.crear_juego()
+        self.juego.tam_vista = tam_vista_para(*PANTALLA_POR_DEFECTO)
+        self.juego.renderizador = RenderizadorANSI(escribir=self.escribir)
+        servidor.sesiones.add(self)
+        servidor.planificador.programar(self)
+
+    def connection_lost(self, exc):
+        self.turno += 1
+        self.servidor.sesiones.discard(self)
+
+    def escribir(self, texto):
+        self.transporte.write(texto.encode())
+
+    def cerrar(self):
+        self.turno += 1
+        if self.juego:
+            self.juego.renderizador.limpiar()
+        self.transporte.close()
+
+    # ===== CONTROL DE FLUJO =====
+    def pause_writing(self):
+        self.bloqueada_desde = self.servidor.planificador.ahora()
+
+    def resume_writing(self):
+        self.bloqueada_desde = None
+        self.sucia = True
+
+    # ===== ENTRADA =====
+    def data_received(self, datos):
+        if self.juego is None:
+            return
+        teclas, pantalla = self.telnet.filtrar(datos)
+        if pantalla:
+            self.juego.tam_vista = tam_vista_para(*pantalla)
+            self.juego.todo_sucio = True
+            self.sucia = True
+        for byte in teclas[:MAX_TECLAS_POR_LECTURA]:
+            if self.transporte.is_closing():
+                return
+            self.tecla(bytes((byte,)))
+
+    def tecla(self, tecla):
+        juego = self.juego
+        accion = juego.teclas.get(tecla)
+        if accion == 'salir':
+            self.cerrar()  # También en pausa o al terminar la partida
+        elif self.estado == 'fin':
+            self.nueva_partida()
+        elif self.estado == 'pausa':
+            self.estado = 'jugando'
+            juego.renderizador.mensaje("")
+            self.servidor.planificador.programar(self)
+        elif accion == 'pausar':
+            self.estado = 'pausa'
+            self.turno += 1
+            juego.renderizador.mensaje("JUEGO EN PAUSA - Presiona cualquier tecla para continuar...")
+        elif accion is not None:
+            juego.aplicar_accion(accion)
+            self.sucia = True
+            if juego.juego_terminado:
+                self.terminar()
+
+    # ===== PARTIDA =====
+    def tick(self):
+        self.juego.tick()
+        self.sucia = True
+        if self.juego.juego_terminado:
+            self.terminar()
+
+    def terminar(self):
+        """Fin de la partida: se dibuja el último cuadro y se ofrece jugar otra"""
+        juego = self.juego
+        self.estado = 'fin'
+        self.turno += 1
+        if self.bloqueada_desde is None:
+            self.dibujar()
+        titulo = "¡VICTORIA!" if juego.victoria else "JUEGO TERMINADO"
+        juego.renderizador.mensaje(
+            f"{titulo} - Puntuación: {juego.puntuacion}. Q: salir, otra tecla: jugar de nuevo")
+
+    def nueva_partida(self):
+        juego = self.juego
+        juego.reset(random.randrange(2**32))
+        juego.renderizador.limpiar()
+        self.estado = 'jugando'
+        self.sucia = True
+        self.servidor.planificador.programar(self)
+
+    def dibujar(self):
+        self.sucia = False
+        self.juego.dibujar()
+
+    def fallar(self, operacion):
+        """Cierra solo esta sesión tras un error inesperado en su partida (llamar desde un except)"""
+        registro.exception("Error en %s de la sesión %s; se cierra la conexión",
+                           operacion, self.transporte.get_extra_info('peername'))
+        self.turno += 1
+        self.servidor.sesiones.discard(self)
+        self.transporte.abort()
+
+
+class Planificador:
+    """Avanza los ticks de todas las sesiones y dibuja las que cambiaron, desde una sola tarea.
+    La cola guarda (instante del siguiente tick, orden, sesión, turno); las entradas cuyo turno
+    ya no coincide con el de la sesión (pausada, terminada o cerrada) se descartan al salir"""
+
+    def __init__(self, servidor, fps=FPS_RENDER):
+        self.servidor = servidor
+        self.periodo_cuadro = 1.0 / fps
+        self.cola = []
+        self.orden = itertools.count()
+        self.bucle = None
+
+    def ahora(self):
+        return self.bucle.time()
+
+    def programar(self, sesion):
+        """Pone en la cola el siguiente tick de la sesión (y anula los anteriores)"""
+        sesion.turno += 1
+        limite = self.ahora() + sesion.juego.intervalo_tick()
+        heapq.heappush(self.cola, (limite, next(self.orden), sesion, sesion.turno))
+
+    def avanzar_ticks(self, ahora):
+        """Ejecuta los ticks vencidos; cada sesión recupera como mucho MAX_TICKS_POR_CUADRO"""
+        cola = self.cola
+        while cola and cola[0][0] <= ahora:
+            limite, _, sesion, turno = heapq.heappop(cola)
+            if turno != sesion.turno:
+                continue
+            try:
+                sesion.tick()
+            except Exception:
+                sesion.fallar('el tick')
+                continue
+            if turno != sesion.turno:
+                continue  # La partida terminó en este tick
+            juego = sesion.juego
+            intervalo = juego.intervalo_tick()
+            limite += intervalo
+            atraso = ahora - limite
+            if atraso > intervalo * MAX_TICKS_POR_CUADRO:
+                # Demasiado atraso: se descarta en lugar de acumular sin límite
+                descartados = int(atraso // intervalo)
+                juego.ticks_descartados += descartados
+                limite += descartados * intervalo
+            heapq.heappush(cola, (limite, next(self.orden), sesion, turno))
+
+    def dibujar(self, ahora):
+        """Dibuja las sesiones que cambiaron; las que tienen el búfer lleno esperan"""
+        for sesion in list(self.servidor.sesiones):
+            if sesion.bloqueada_desde is not None:
+                if ahora - sesion.bloqueada_desde > MAX_BLOQUEO:
+                    sesion.turno += 1
+                    sesion.transporte.abort()
+            elif sesion.sucia and sesion.estado != 'fin':
+                try:
+                    sesion.dibujar()
+                except Exception:
+                    sesion.fallar('el dibujado')
+
+    async def ejecutar(self):
+        siguiente_cuadro = self.ahora()
+        while True:
+            ahora = self.ahora()
+            self.avanzar_ticks(ahora)
+            if ahora >= siguiente_cuadro:
+                self.dibujar(ahora)
+                siguiente_cuadro += self.periodo_cuadro
+                if siguiente_cuadro < ahora:
+                    siguiente_cuadro = ahora + self.periodo_cuadro
+            # Dormir hasta el próximo tick o cuadro, lo que llegue antes
+            siguiente = siguiente_cuadro
+            if self.cola and self.cola[0][0] < siguiente:
+                siguiente = self.cola[0][0]
+            await asyncio.sleep(max(siguiente - self.ahora(), 0))
+
+
+class Servidor:
+    def __init__(self, datos_juego, piezas=None, bitboard=False, max_sesiones=10000, fps=FPS_RENDER):
+        self.datos_juego = datos_juego
+        # Se analiza una vez; todas las partidas comparten el ConfigJuego inmutable
+        self.config = analizar_juego(datos_juego, piezas)
+        self.bitboard = bitboard
+        self.max_sesiones = max_sesiones
+        self.sesiones = set()
+        self.planificador = Planificador(self, fps)
+
+    def crear_juego(self):
+        return Juego(self.datos_juego, semilla=random.randrange(2**32), bitboard=self.bitboard,
+                     config=self.config)
+
+    async def servir(self, anfitrion, puerto, al_iniciar=None):
+        """Acepta conexiones y avanza las partidas hasta que se cancela la tarea"""
+        bucle = self.planificador.bucle = asyncio.get_running_loop()
+        servidor = await bucle.create_server(lambda: Sesion(self), anfitrion, puerto)
+        tarea = asyncio.ensure_future(self.planificador.ejecutar())
+        if al_iniciar:
+            al_iniciar(servidor)
+        try:
+            async with servidor:
+                await servidor.serve_forever()
+        finally:
+            tarea.cancel()
+            for sesion in list(self.sesiones):
+                sesion.escribir(MOSTRAR_CURSOR + "\r\nServidor detenido.\r\n")
+                sesion.transporte.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor telnet de partidas de Tetris y Snake.")
+    parser.add_argument('archivo_juego', help="archivo .ast, .astb, .brik o paquete .brikpak")
+    parser.add_argument('--juego', metavar='CLAVE', help="juego del paquete .brikpak que se sirve")
+    parser.add_argument('--anfitrion', default='0.0.0.0', help="dirección en la que escuchar")
+    parser.add_argument('--puerto', type=int, default=2323, help="puerto TCP")
+    parser.add_argument('--max-sesiones', type=int, default=10000,
+                        help="conexiones simultáneas como máximo")
+    parser.add_argument('--bitboard', action='store_true', help="usa el tablero de bits (Tetris)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(format="%(asctime)s %(levelname)s %(message)s")
+
+    try:
+        datos_juego, piezas = cargar_juego(args.archivo_juego, args.juego)
+        servidor = Servidor(datos_juego, piezas, args.bitboard, args.max_sesiones)
+    except IOError:
+        print(f"Error: No se pudo encontrar el archivo {args.archivo_juego}")
+        return 1
+    except json.JSONDecodeError:
+        print(f"Error: El archivo {args.archivo_juego} no tiene formato JSON válido")
+        return 1
+    except SyntaxError as e:
+        print(f"Error de sintaxis en {args.archivo_juego}:")
+        for mensaje in syntax_error_lines(e):
+            print("  " + mensaje)
+        return 1
+    except ValueError as e:
+        print(f"Error en la definición del juego {args.archivo_juego}: {e}")
+        return 1
+
+    def al_iniciar(servidor_tcp):
+        direcciones = ", ".join(str(s.getsockname()[:2]) for s in servidor_tcp.sockets)
+        print(f"{servidor.config.nombre}: escuchando en {direcciones} (telnet)")
+
+    try:
+        asyncio.run(servidor.servir(args.anfitrion, args.puerto, al_iniciar))
+    except KeyboardInterrupt:
+        print("Servidor detenido")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
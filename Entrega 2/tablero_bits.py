@@ -0,0 +1,90 @@
+# tablero_bits.py
+# Tablero de Tetris representado con una máscara de bits por fila
+# El bit (margen + x) de cada fila indica si la celda x está ocupada.
+# A ambos lados de las celdas hay "muros" de margen bits siempre a 1, de modo que
+# una pieza que se sale lateralmente colisiona con un simple AND.
+
+def compilar_mascaras(matriz):
+    """Convierte una matriz de rotación (filas de 0/1) en una tupla de (dy, mascara)"""
+    mascaras = []
+    for dy, fila in enumerate(matriz):
+        mascara = 0
+        for dx, celda in enumerate(fila):
+            if celda == 1:
+                mascara |= 1 << dx
+        if mascara:
+            mascaras.append((dy, mascara))
+    return tuple(mascaras)
+
+
+class TableroBits:
+    def __init__(self, ancho, alto, margen=4):
+        self.ancho = ancho
+        self.alto = alto
+        self.margen = margen
+        muro_izquierdo = (1 << margen) - 1
+        muro_derecho = ((1 << margen) - 1) << (margen + ancho)
+        self.vacia = muro_izquierdo | muro_derecho
+        self.llena = (1 << (2 * margen + ancho)) - 1
+        self.filas = [self.vacia] * alto
+
+    @classmethod
+    def desde_grid(cls, grid, margen=4):
+        """Construye un tablero a partir de una lista de listas de 0/1"""
+        tablero = cls(len(grid[0]) if grid else 0, len(grid), margen)
+        tablero.filas = [
+            tablero.vacia | sum(1 << (margen + x) for x, celda in enumerate(fila) if celda)
+            for fila in grid
+        ]
+        return tablero
+
+    def copia(self):
+        """Copia del tablero que comparte las filas (enteros inmutables) con el original"""
+        nuevo = TableroBits.__new__(TableroBits)
+        nuevo.ancho, nuevo.alto, nuevo.margen = self.ancho, self.alto, self.margen
+        nuevo.vacia, nuevo.llena = self.vacia, self.llena
+        nuevo.filas = self.filas[:]
+        return nuevo
+
+    def colisiona(self, mascaras, x, y):
+        """Indica si la pieza con esas máscaras choca en la posición (x, y)"""
+        desplazamiento = x + self.margen
+        if desplazamiento < 0:
+            return True
+        filas = self.filas
+        for dy, mascara in mascaras:
+            fila_y = y + dy
+            if fila_y >= self.alto:
+                return True
+            fila = filas[fila_y] if fila_y >= 0 else self.vacia
+            if fila & (mascara << desplazamiento):
+                return True
+        return False
+
+    def fijar(self, mascaras, x, y):
+        """Fija la pieza en el tablero (las celdas por encima del tope se descartan)"""
+        desplazamiento = x + self.margen
+        filas = self.filas
+        for dy, mascara in mascaras:
+            fila_y = y + dy
+            if 0 <= fila_y < self.alto:
+                filas[fila_y] |= mascara << desplazamiento
+
+    def limpiar_lineas(self):
+        """Elimina las filas completas y devuelve cuántas se eliminaron"""
+        llena = self.llena
+        restantes = [fila for fila in self.filas if fila != llena]
+        eliminadas = self.alto - len(restantes)
+        if eliminadas:
+            self.filas = [self.vacia] * eliminadas + restantes
+        return eliminadas
+
+    def celda(self, x, y):
+        """Devuelve 1 si la celda (x, y) está ocupada, 0 si no"""
+        return (self.filas[y] >> (x + self.margen)) & 1
+
+    def a_grid(self):
+        """Convierte el tablero a la lista de listas de 0/1 que usa la pantalla"""
+        margen = self.margen
+        rango_x = range(margen, margen + self.ancho)
+        return [[(fila >> bit) & 1 for bit in rango_x] for fila in self.filas]
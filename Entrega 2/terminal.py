@@ -0,0 +1,168 @@
+# terminal.py
+# Entrada y salida de terminal para el modo interactivo
+# - RenderizadorANSI: dibuja solo las celdas que cambiaron respecto al cuadro anterior
+# - Teclado: lectura de teclas sin bloqueo en Windows (msvcrt) y POSIX (termios)
+
+import os
+import shutil
+import sys
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+    import select
+    import termios
+    import tty
+
+# Texto de cada código de celda: 0 vacío, 1 bloque fijo, 2 bloque móvil/cuerpo, 3 cabeza, 4 comida,
+# 5 pieza fantasma (donde aterrizará la pieza)
+GLIFOS = ("  ", "[]", "[]", "()", "**", "::")
+
+ESC = "\x1b["
+LIMPIAR_PANTALLA = ESC + "2J"
+LIMPIAR_LINEA = ESC + "K"
+OCULTAR_CURSOR = ESC + "?25l"
+MOSTRAR_CURSOR = ESC + "?25h"
+
+ANCHO_PANEL = 30    # Columnas reservadas para el panel lateral
+
+
+def mover_cursor(fila, columna):
+    """Secuencia ANSI para posicionar el cursor (fila y columna empiezan en 1)"""
+    return f"{ESC}{fila};{columna}H"
+
+
+def tam_vista_para(columnas, lineas):
+    """(ancho, alto) en celdas del tablero que caben en una pantalla de columnas x lineas junto al panel"""
+    return (max((columnas - ANCHO_PANEL - 2) // 2, 4), max(lineas - 4, 4))
+
+
+def tam_vista_terminal():
+    """(ancho, alto) en celdas del tablero que caben en la terminal junto al panel"""
+    return tam_vista_para(*shutil.get_terminal_size())
+
+
+def seguir_foco(origen, foco, tam, total):
+    """Desplaza el origen de una ventana de tam celdas para que el foco no se acerque
+    a menos de un cuarto de ventana del borde, sin salirse de [0, total)"""
+    margen = tam // 4
+    if foco < origen + margen:
+        origen = foco - margen
+    elif foco >= origen + tam - margen:
+        origen = foco - tam + margen + 1
+    return max(0, min(origen, total - tam))
+
+
+class RenderizadorANSI:
+    def __init__(self, escribir=None):
+        if escribir is None:
+            if os.name == 'nt':
+                os.system('')  # Activa el procesamiento de secuencias ANSI en la consola de Windows
+            escribir = self.escribir_stdout
+        self.escribir = escribir
+        self.invalidar()
+
+    @staticmethod
+    def escribir_stdout(texto):
+        sys.stdout.write(texto)
+        sys.stdout.flush()
+
+    def invalidar(self):
+        """Olvida el cuadro anterior para que el siguiente se dibuje completo"""
+        self.anterior = None
+        self.panel_anterior = None
+
+    def dibujar(self, filas, panel, sucias=None):
+        """Dibuja un cuadro. filas: listas de códigos de celda; panel: texto lateral por fila;
+        sucias: índices de las filas que pueden haber cambiado (None = comparar todas).
+        Devuelve True si se escribió algo"""
+        partes = []
+        alto = len(filas)
+        ancho = len(filas[0]) if alto else 0
+        anterior = self.anterior
+
+        if anterior is None or len(anterior) != alto or (alto and len(anterior[0]) != ancho):
+            # Cuadro completo: borde, todas las celdas y todo el panel
+            borde = "#" + "-" * (ancho * 2) + "#"
+            partes.append(OCULTAR_CURSOR + LIMPIAR_PANTALLA + mover_cursor(1, 1) + borde)
+            for y, fila in enumerate(filas):
+                partes.append(mover_cursor(y + 2, 1) + "|" + "".join([GLIFOS[c] for c in fila]) + "|")
+            partes.append(mover_cursor(alto + 2, 1) + borde)
+            panel_anterior = [None] * alto
+            sucias = None
+        else:
+            for y in range(alto) if sucias is None else sucias:
+                fila = filas[y]
+                fila_anterior = anterior[y]
+                if fila == fila_anterior:
+                    continue
+                # Emitir solo los tramos de celdas que cambiaron
+                x = 0
+                while x < ancho:
+                    if fila[x] == fila_anterior[x]:
+                        x += 1
+                        continue
+                    inicio = x
+                    while x < ancho and fila[x] != fila_anterior[x]:
+                        x += 1
+                    partes.append(mover_cursor(y + 2, 2 * inicio + 2) + "".join([GLIFOS[c] for c in fila[inicio:x]]))
+            panel_anterior = self.panel_anterior
+
+        columna_panel = ancho * 2 + 3
+        for y in range(alto):
+            texto = panel[y] if y < len(panel) else ""
+            if texto != panel_anterior[y]:
+                partes.append(mover_cursor(y + 2, columna_panel) + texto + LIMPIAR_LINEA)
+
+        if sucias is None:
+            self.anterior = [list(fila) for fila in filas]
+        else:
+            for y in sucias:
+                anterior[y] = list(filas[y])
+        self.panel_anterior = [panel[y] if y < len(panel) else "" for y in range(alto)]
+
+        if not partes:
+            return False
+        partes.append(mover_cursor(alto + 3, 1))
+        self.escribir("".join(partes))
+        return True
+
+    def mensaje(self, texto):
+        """Escribe un mensaje debajo del tablero"""
+        fila = len(self.anterior) + 3 if self.anterior is not None else 1
+        self.escribir(mover_cursor(fila, 1) + texto + LIMPIAR_LINEA)
+
+    def limpiar(self):
+        """Borra la pantalla y restaura el cursor"""
+        self.escribir(LIMPIAR_PANTALLA + mover_cursor(1, 1) + MOSTRAR_CURSOR)
+        self.invalidar()
+
+
+class Teclado:
+    """Lectura de teclas sin bloqueo; usar como gestor de contexto"""
+
+    def __enter__(self):
+        self.atributos = None
+        if msvcrt is None and sys.stdin.isatty():
+            # Modo cbreak: teclas sin esperar Enter y sin eco
+            self.atributos = termios.tcgetattr(sys.stdin)
+            tty.setcbreak(sys.stdin.fileno())
+        return self
+
+    def __exit__(self, *exc):
+        if self.atributos is not None:
+            termios.tcsetattr(sys.stdin, termios.TCSADRAIN, self.atributos)
+        return False
+
+    def hay_tecla(self):
+        if msvcrt is not None:
+            return msvcrt.kbhit()
+        listos, _, _ = select.select([sys.stdin], [], [], 0)
+        return bool(listos)
+
+    def leer(self):
+        """Lee una tecla (bloquea si no hay ninguna pendiente)"""
+        if msvcrt is not None:
+            return msvcrt.getch()
+        return os.read(sys.stdin.fileno(), 1)
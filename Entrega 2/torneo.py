@@ -0,0 +1,217 @@
+# torneo.py
+# Ejecuta muchas partidas headless con semilla en varios procesos y resume los resultados
+# Uso: python torneo.py <archivo.ast|archivo.brik|paquete.brikpak> [--juego CLAVE]
+#                       [--politica aleatoria|guion|modulo:funcion] [--partidas N] [--procesos W]
+#                       [--semilla S] [--max-ticks T] [--json salida.json]
+
+import argparse
+import importlib
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from busqueda import crear_politica_busqueda
+from runtime import Juego, cargar_juego
+
+PARTIDAS_POR_TAREA = 50
+
+# Estado de cada proceso trabajador (se carga una vez en inicializar_trabajador)
+_datos_juego = None
+_piezas = None
+_politica = None
+
+
+# ===== POLÍTICAS =====
+# Una política recibe el Juego y devuelve el nombre de una acción o None. Cada proceso carga la
+# política una vez; si tiene un atributo reiniciar(semilla), se llama al empezar cada partida
+
+def crear_politica_aleatoria(semilla):
+    rng = random.Random(semilla)
+
+    def politica(juego):
+        return rng.choice(juego.acciones[:-1])  # Todas menos 'salir'
+    politica.reiniciar = rng.seed
+    return politica
+
+
+def politica_guion(juego):
+    """Heurística simple: Snake persigue la comida; Tetris lleva la pieza a la columna más baja"""
+    if juego.tipo_juego == "SNAKE":
+        cabeza_x, cabeza_y = juego.serpiente_cuerpo[0]
+        comida_x, comida_y = juego.posicion_comida
+        if comida_x < cabeza_x:
+            return 'mover_izquierda'
+        if comida_x > cabeza_x:
+            return 'mover_derecha'
+        return 'mover_arriba' if comida_y < cabeza_y else 'mover_abajo'
+
+    alturas = juego.alturas
+    objetivo = max(range(juego.ancho), key=alturas.__getitem__)
+    rotacion = juego.pieza_actual.rotaciones[juego.pieza_rotacion]
+    x = juego.pieza_x + rotacion.min_x
+    if x < objetivo:
+        return 'mover_derecha'
+    if x > objetivo:
+        return 'mover_izquierda'
+    return None
+
+
+def cargar_politica(nombre, semilla):
+    """Resuelve 'aleatoria', 'guion', 'busqueda', 'busqueda2' o 'modulo:funcion'"""
+    if nombre == 'aleatoria':
+        return crear_politica_aleatoria(semilla)
+    if nombre == 'guion':
+        return politica_guion
+    if nombre in ('busqueda', 'busqueda2'):
+        # Búsqueda de colocaciones de Tetris mirando 1 o 2 piezas por delante
+        return crear_politica_busqueda(profundidad=2 if nombre == 'busqueda2' else 1)
+    if ':' not in nombre:
+        raise ValueError(f"Política desconocida '{nombre}'. Use aleatoria, guion, busqueda, "
+                         "busqueda2 o modulo:funcion.")
+    modulo, funcion = nombre.split(':', 1)
+    return getattr(importlib.import_module(modulo), funcion)
+
+
+# ===== TRABAJADORES =====
+def inicializar_trabajador(ruta, clave, nombre_politica):
+    global _datos_juego, _piezas, _politica
+    _datos_juego, _piezas = cargar_juego(ruta, clave)
+    _politica = cargar_politica(nombre_politica, 0)
+
+
+def jugar_partidas(semillas, max_ticks, bitboard):
+    """Juega una tanda de partidas; devuelve una lista de resultados"""
+    juego = Juego(_datos_juego, bitboard=bitboard, piezas=_piezas)
+    politica = _politica
+    reiniciar = getattr(politica, 'reiniciar', None)
+    resultados = []
+    for semilla in semillas:
+        juego.reset(semilla)
+        # La política también usa la semilla de la partida, así cada resultado es reproducible
+        if reiniciar:
+            reiniciar(semilla)
+        inicio = time.perf_counter()
+        while not juego.juego_terminado and juego.ticks < max_ticks:
+            juego.step(politica(juego))
+        resultados.append({
+            'semilla': semilla,
+            'puntuacion': juego.puntuacion,
+            'ticks': juego.ticks,
+            'segundos': time.perf_counter() - inicio,
+            'proceso': os.getpid()
+        })
+    return resultados
+
+
+# ===== RESUMEN =====
+def percentil(valores_ordenados, p):
+    indice = min(len(valores_ordenados) - 1, int(p / 100 * len(valores_ordenados)))
+    return valores_ordenados[indice]
+
+
+def resumir(resultados, segundos_totales):
+    puntuaciones = sorted(r['puntuacion'] for r in resultados)
+    duraciones = sorted(r['ticks'] for r in resultados)
+    ticks_totales = sum(duraciones)
+
+    por_proceso = {}
+    for r in resultados:
+        ticks, segundos = por_proceso.get(r['proceso'], (0, 0.0))
+        por_proceso[r['proceso']] = (ticks + r['ticks'], segundos + r['segundos'])
+
+    return {
+        'partidas': len(resultados),
+        'puntuacion': {
+            'min': puntuaciones[0],
+            'media': statistics.mean(puntuaciones),
+            'p50': percentil(puntuaciones, 50),
+            'p90': percentil(puntuaciones, 90),
+            'max': puntuaciones[-1],
+            'distribucion': {str(p): n for p, n in sorted(Counter(puntuaciones).items())}
+        },
+        'duracion_ticks': {
+            'min': duraciones[0],
+            'media': statistics.mean(duraciones),
+            'p50': percentil(duraciones, 50),
+            'max': duraciones[-1]
+        },
+        'ticks_por_segundo_proceso': {
+            str(pid): ticks / segundos if segundos else 0.0
+            for pid, (ticks, segundos) in por_proceso.items()
+        },
+        'ticks_totales': ticks_totales,
+        'segundos': segundos_totales,
+        'ticks_por_segundo_total': ticks_totales / segundos_totales if segundos_totales else 0.0
+    }
+
+
+def imprimir_resumen(resumen):
+    p, d = resumen['puntuacion'], resumen['duracion_ticks']
+    print(f"\n--- Resumen de {resumen['partidas']} partidas ---")
+    print(f"Puntuación: min {p['min']}  media {p['media']:.1f}  p50 {p['p50']}  p90 {p['p90']}  max {p['max']}")
+    print(f"Duración (ticks): min {d['min']}  media {d['media']:.1f}  p50 {d['p50']}  max {d['max']}")
+    for pid, tps in resumen['ticks_por_segundo_proceso'].items():
+        print(f"  proceso {pid}: {tps:,.0f} ticks/s")
+    print(f"Total: {resumen['ticks_totales']:,} ticks en {resumen['segundos']:.2f} s "
+          f"({resumen['ticks_por_segundo_total']:,.0f} ticks/s)")
+
+
+# ===== main =====
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Torneo headless de partidas con semilla.")
+    parser.add_argument('archivo', help="archivo .ast, .astb, .brik o paquete .brikpak del juego")
+    parser.add_argument('--juego', metavar='CLAVE', help="juego del paquete .brikpak que se juega")
+    parser.add_argument('--politica', default='aleatoria', help="aleatoria, guion, busqueda, busqueda2 o modulo:funcion")
+    parser.add_argument('--partidas', type=int, default=1000)
+    parser.add_argument('--procesos', type=int, default=os.cpu_count())
+    parser.add_argument('--semilla', type=int, default=0, help="semilla de la primera partida")
+    parser.add_argument('--max-ticks', type=int, default=100000, help="corta las partidas más largas")
+    parser.add_argument('--bitboard', action='store_true', help="usa el tablero de bits en Tetris")
+    parser.add_argument('--json', help="guarda el resumen en este archivo")
+    args = parser.parse_args(argv)
+
+    try:
+        cargar_juego(args.archivo, args.juego)
+        cargar_politica(args.politica, 0)
+    except (IOError, ValueError, SyntaxError, ImportError, AttributeError) as e:
+        print("Error:", e)
+        return 1
+
+    semillas = list(range(args.semilla, args.semilla + args.partidas))
+    tandas = [semillas[i:i + PARTIDAS_POR_TAREA] for i in range(0, len(semillas), PARTIDAS_POR_TAREA)]
+    if not semillas:
+        print("No hay partidas que jugar.")
+        return 1
+    resultados = []
+    ticks_acumulados = puntos_acumulados = 0
+    inicio = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=args.procesos, initializer=inicializar_trabajador,
+                             initargs=(args.archivo, args.juego, args.politica)) as ejecutor:
+        tareas = [ejecutor.submit(jugar_partidas, tanda, args.max_ticks, args.bitboard) for tanda in tandas]
+        # Los resultados se muestran a medida que llegan
+        for tarea in as_completed(tareas):
+            tanda = tarea.result()
+            resultados.extend(tanda)
+            ticks_acumulados += sum(r['ticks'] for r in tanda)
+            puntos_acumulados += sum(r['puntuacion'] for r in tanda)
+            transcurrido = time.perf_counter() - inicio
+            print(f"\r{len(resultados)}/{len(semillas)} partidas  "
+                  f"media {puntos_acumulados / len(resultados):.1f}  "
+                  f"{ticks_acumulados / transcurrido:,.0f} ticks/s", end='', flush=True)
+
+    resumen = resumir(resultados, time.perf_counter() - inicio)
+    imprimir_resumen(resumen)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(resumen, f, indent=4, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
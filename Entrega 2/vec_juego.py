@@ -0,0 +1,282 @@
+# vec_juego.py
+# Entorno vectorizado: N partidas de Tetris o Snake avanzadas a la vez con NumPy
+# Pensado para entrenamiento de IA: cada paso recibe un lote de acciones y devuelve
+# observaciones, recompensas y banderas de fin. Las partidas terminadas se reinician solas.
+# Requiere numpy (pip install numpy).
+
+import numpy as np
+
+from semantica import analizar_juego
+
+# Código de acción -> nombre (0 = no hacer nada); mismos nombres que Juego.step
+ACCIONES_VEC_TETRIS = (None, 'mover_izquierda', 'mover_derecha', 'acelerar_abajo', 'rotar')
+ACCIONES_VEC_SNAKE = (None, 'mover_arriba', 'mover_abajo', 'mover_izquierda', 'mover_derecha')
+
+# Direcciones de Snake en el orden de ACCIONES_VEC_SNAKE[1:]
+DIRECCION_X = np.array([0, 0, -1, 1])
+DIRECCION_Y = np.array([-1, 1, 0, 0])
+DIRECCION_OPUESTA = np.array([1, 0, 3, 2])
+DERECHA = 3
+
+# Códigos de celda de las observaciones (los mismos que usa la pantalla)
+CELDA_FIJA, CELDA_MOVIL, CELDA_CABEZA, CELDA_COMIDA = 1, 2, 3, 4
+
+
+class VecJuego:
+    def __init__(self, datos_juego, n, semilla=None):
+        self.n = n
+        config = analizar_juego(datos_juego)
+        self.nombre_juego = config.nombre
+        self.tipo_juego = config.tipo
+
+        self.ancho = config.tablero.ancho
+        self.alto = config.tablero.alto
+        self.rng = np.random.default_rng(semilla)
+        self.todos = np.arange(n)
+        # Solo se vectorizan los puntos fijos de las reglas; las reglas condicionadas no aplican
+        puntos = config.reglas.puntos
+        self.puntos_por_linea = puntos.get('linea_completada', 0)
+        self.puntos_por_comida = puntos.get('serpiente_come_comida', 0)
+
+        # Tetris: celdas fijas; Snake: celdas ocupadas por el cuerpo
+        self.tableros = np.zeros((n, self.alto, self.ancho), dtype=np.uint8)
+        self.puntuaciones = np.zeros(n, dtype=np.int64)
+        self.puntuaciones_finales = np.zeros(n, dtype=np.int64)
+        self.pasos = np.zeros(n, dtype=np.int64)
+
+        if self.tipo_juego == "TETRIS":
+            self.acciones = ACCIONES_VEC_TETRIS
+            self.compilar_tablas(config.piezas)
+            self.pieza = np.zeros(n, dtype=np.int64)
+            self.rotacion = np.zeros(n, dtype=np.int64)
+            self.pieza_x = np.zeros(n, dtype=np.int64)
+            self.pieza_y = np.zeros(n, dtype=np.int64)
+        else:
+            self.acciones = ACCIONES_VEC_SNAKE
+            # Las celdas iniciales fuera del tablero no se representan
+            self.longitud_inicial = max(1, min(config.longitud_inicial, self.ancho // 2 + 1))
+            # Cuerpo como búfer circular de celdas (y * ancho + x); cabeza = índice de la cabeza
+            self.cuerpo = np.zeros((n, self.alto * self.ancho), dtype=np.int64)
+            self.cabeza = np.zeros(n, dtype=np.int64)
+            self.longitud = np.zeros(n, dtype=np.int64)
+            self.direccion = np.zeros(n, dtype=np.int64)
+            self.comida = np.zeros(n, dtype=np.int64)
+
+        self.reset()
+
+    def compilar_tablas(self, piezas):
+        """Pasa las piezas compiladas a tablas (pieza, rotación, celda) para indexar en lote"""
+        piezas = list(piezas.values())
+        max_rotaciones = max(len(pieza.rotaciones) for pieza in piezas)
+        max_celdas = max(len(rotacion.celdas) for pieza in piezas for rotacion in pieza.rotaciones)
+        forma = (len(piezas), max_rotaciones, max_celdas)
+
+        self.celdas_dx = np.zeros(forma, dtype=np.int64)
+        self.celdas_dy = np.zeros(forma, dtype=np.int64)
+        self.celdas_validas = np.zeros(forma, dtype=bool)
+        self.num_rotaciones = np.array([len(pieza.rotaciones) for pieza in piezas])
+        self.columna_inicio = np.array([pieza.rotaciones[0].columna_inicio for pieza in piezas])
+        for p, pieza in enumerate(piezas):
+            for r, rotacion in enumerate(pieza.rotaciones):
+                for k, (dx, dy) in enumerate(rotacion.celdas):
+                    self.celdas_dx[p, r, k] = dx
+                    self.celdas_dy[p, r, k] = dy
+                    self.celdas_validas[p, r, k] = True
+
+    # ===== API =====
+    def reset(self):
+        """Reinicia todas las partidas y devuelve las observaciones"""
+        self.reiniciar(self.todos)
+        return self.observar()
+
+    def step(self, acciones):
+        """Aplica un lote de códigos de acción (índices de self.acciones) y avanza un tick.
+        Devuelve (observaciones, recompensas, terminados)"""
+        acciones = np.asarray(acciones)
+        recompensas = np.zeros(self.n, dtype=np.int64)
+        terminados = np.zeros(self.n, dtype=bool)
+
+        if self.tipo_juego == "TETRIS":
+            self.step_tetris(acciones, recompensas, terminados)
+        else:
+            self.step_snake(acciones, recompensas, terminados)
+
+        self.puntuaciones += recompensas
+        self.pasos += 1
+        finalizados = self.todos[terminados]
+        if finalizados.size:
+            self.puntuaciones_finales[finalizados] = self.puntuaciones[finalizados]
+            self.reiniciar(finalizados)
+        return self.observar(), recompensas, terminados
+
+    def reiniciar(self, indices):
+        """Reinicia solo las partidas indicadas"""
+        self.tableros[indices] = 0
+        self.puntuaciones[indices] = 0
+        self.pasos[indices] = 0
+        if self.tipo_juego == "TETRIS":
+            self.generar_piezas(indices)
+        else:
+            self.colocar_serpientes(indices)
+
+    def observar(self):
+        """Tableros (n, alto, ancho) con los mismos códigos de celda que la pantalla"""
+        if self.tipo_juego == "TETRIS":
+            observaciones = self.tableros.copy()
+            xs, ys, dentro = self.celdas_pieza(self.pieza, self.rotacion, self.pieza_x, self.pieza_y)
+            partidas = np.broadcast_to(self.todos[:, None], xs.shape)
+            observaciones[partidas[dentro], ys[dentro], xs[dentro]] = CELDA_MOVIL
+            return observaciones
+
+        observaciones = self.tableros * np.uint8(CELDA_MOVIL)
+        planas = observaciones.reshape(self.n, -1)
+        planas[self.todos, self.cuerpo[self.todos, self.cabeza]] = CELDA_CABEZA
+        planas[self.todos, self.comida] = CELDA_COMIDA
+        return observaciones
+
+    # ===== TETRIS =====
+    def celdas_pieza(self, pieza, rotacion, x, y):
+        """Coordenadas de las celdas de cada pieza y máscara de las que caen dentro del tablero"""
+        xs = x[:, None] + self.celdas_dx[pieza, rotacion]
+        ys = y[:, None] + self.celdas_dy[pieza, rotacion]
+        dentro = (self.celdas_validas[pieza, rotacion] &
+                  (xs >= 0) & (xs < self.ancho) & (ys >= 0) & (ys < self.alto))
+        return xs, ys, dentro
+
+    def colisiona(self, indices, pieza, rotacion, x, y):
+        """Versión en lote de Juego.verificar_colision_tetris"""
+        validas = self.celdas_validas[pieza, rotacion]
+        xs = x[:, None] + self.celdas_dx[pieza, rotacion]
+        ys = y[:, None] + self.celdas_dy[pieza, rotacion]
+        fuera = (xs < 0) | (xs >= self.ancho) | (ys >= self.alto)
+        ocupadas = self.tableros[
+            indices[:, None],
+            np.clip(ys, 0, self.alto - 1),
+            np.clip(xs, 0, self.ancho - 1)
+        ] != 0
+        return (validas & (fuera | ((ys >= 0) & ocupadas))).any(axis=1)
+
+    def step_tetris(self, acciones, recompensas, terminados):
+        for codigo, dx in ((1, -1), (2, 1)):
+            indices = self.todos[acciones == codigo]
+            if indices.size:
+                nueva_x = self.pieza_x[indices] + dx
+                libres = ~self.colisiona(indices, self.pieza[indices], self.rotacion[indices],
+                                         nueva_x, self.pieza_y[indices])
+                self.pieza_x[indices[libres]] = nueva_x[libres]
+
+        indices = self.todos[acciones == 4]
+        if indices.size:
+            nueva_rotacion = (self.rotacion[indices] + 1) % self.num_rotaciones[self.pieza[indices]]
+            libres = ~self.colisiona(indices, self.pieza[indices], nueva_rotacion,
+                                     self.pieza_x[indices], self.pieza_y[indices])
+            self.rotacion[indices[libres]] = nueva_rotacion[libres]
+
+        # Igual que Juego.step: la acción de bajar y luego el tick de caída
+        self.bajar(self.todos[acciones == 3], recompensas, terminados)
+        self.bajar(self.todos[~terminados], recompensas, terminados)
+
+    def bajar(self, indices, recompensas, terminados):
+        """Baja una fila las piezas indicadas; las que chocan se fijan"""
+        if not indices.size:
+            return
+        nueva_y = self.pieza_y[indices] + 1
+        choca = self.colisiona(indices, self.pieza[indices], self.rotacion[indices],
+                               self.pieza_x[indices], nueva_y)
+        self.pieza_y[indices[~choca]] = nueva_y[~choca]
+
+        fijar = indices[choca]
+        if fijar.size:
+            self.fijar_piezas(fijar)
+            recompensas[fijar] += self.puntos_por_linea * self.limpiar_lineas(fijar)
+            perdidas = self.generar_piezas(fijar)
+            terminados[fijar[perdidas]] = True
+
+    def fijar_piezas(self, indices):
+        xs, ys, dentro = self.celdas_pieza(self.pieza[indices], self.rotacion[indices],
+                                           self.pieza_x[indices], self.pieza_y[indices])
+        partidas = np.broadcast_to(indices[:, None], xs.shape)
+        self.tableros[partidas[dentro], ys[dentro], xs[dentro]] = CELDA_FIJA
+
+    def limpiar_lineas(self, indices):
+        """Elimina las filas completas de los tableros indicados; devuelve las líneas por tablero"""
+        tableros = self.tableros[indices]
+        llenas = tableros.all(axis=2)
+        lineas = llenas.sum(axis=1)
+        con_lineas = lineas > 0
+        if con_lineas.any():
+            tableros = tableros[con_lineas]
+            # Orden estable: primero las filas llenas, después las demás en su orden original
+            orden = np.argsort(~llenas[con_lineas], axis=1, kind='stable')
+            tableros = np.take_along_axis(tableros, orden[:, :, None], axis=1)
+            # Las filas llenas, ahora arriba, pasan a ser filas vacías
+            tableros[np.arange(self.alto)[None, :] < lineas[con_lineas][:, None]] = 0
+            self.tableros[indices[con_lineas]] = tableros
+        return lineas
+
+    def generar_piezas(self, indices):
+        """Genera piezas nuevas; devuelve la máscara de partidas que pierden al aparecer"""
+        pieza = self.rng.integers(len(self.num_rotaciones), size=indices.size)
+        self.pieza[indices] = pieza
+        self.rotacion[indices] = 0
+        self.pieza_x[indices] = self.columna_inicio[pieza]
+        self.pieza_y[indices] = 0
+        return self.colisiona(indices, pieza, self.rotacion[indices],
+                              self.pieza_x[indices], self.pieza_y[indices])
+
+    # ===== SNAKE =====
+    def colocar_serpientes(self, indices):
+        centro_x, centro_y = self.ancho // 2, self.alto // 2
+        celdas = centro_y * self.ancho + centro_x - np.arange(self.longitud_inicial)
+        self.cuerpo[indices, :self.longitud_inicial] = celdas
+        self.cabeza[indices] = 0
+        self.longitud[indices] = self.longitud_inicial
+        self.direccion[indices] = DERECHA
+        self.tableros.reshape(self.n, -1)[indices[:, None], celdas] = 1
+        self.generar_comida(indices)
+
+    def step_snake(self, acciones, recompensas, terminados):
+        capacidad = self.cuerpo.shape[1]
+        ocupadas = self.tableros.reshape(self.n, -1)
+
+        # Cambios de dirección (no se permite invertir sobre el propio cuerpo)
+        indices = self.todos[acciones > 0]
+        nueva = acciones[indices] - 1
+        cambia = nueva != DIRECCION_OPUESTA[self.direccion[indices]]
+        self.direccion[indices[cambia]] = nueva[cambia]
+
+        cabeza = self.cuerpo[self.todos, self.cabeza]
+        x = cabeza % self.ancho + DIRECCION_X[self.direccion]
+        y = cabeza // self.ancho + DIRECCION_Y[self.direccion]
+        fuera = (x < 0) | (x >= self.ancho) | (y < 0) | (y >= self.alto)
+        nueva_cabeza = np.where(fuera, 0, y * self.ancho + x)
+        choca = fuera | (ocupadas[self.todos, nueva_cabeza] != 0)
+        terminados |= choca
+
+        vivos = self.todos[~choca]
+        nueva_cabeza = nueva_cabeza[vivos]
+        come = nueva_cabeza == self.comida[vivos]
+        self.cabeza[vivos] = (self.cabeza[vivos] - 1) % capacidad
+        self.cuerpo[vivos, self.cabeza[vivos]] = nueva_cabeza
+        ocupadas[vivos, nueva_cabeza] = 1
+
+        # Las que no comen liberan la cola
+        avanzan = vivos[~come]
+        cola = (self.cabeza[avanzan] + self.longitud[avanzan]) % capacidad
+        ocupadas[avanzan, self.cuerpo[avanzan, cola]] = 0
+
+        comen = vivos[come]
+        self.longitud[comen] += 1
+        recompensas[comen] += self.puntos_por_comida
+        # Tablero lleno: la partida termina (victoria)
+        terminados[comen[self.generar_comida(comen)]] = True
+
+    def generar_comida(self, indices):
+        """Coloca comida en una celda libre uniforme; devuelve la máscara de tableros llenos"""
+        if not indices.size:
+            return np.zeros(0, dtype=bool)
+        libres = self.tableros.reshape(self.n, -1)[indices] == 0
+        claves = self.rng.random(libres.shape)
+        claves[~libres] = -1.0
+        self.comida[indices] = claves.argmax(axis=1)
+        return ~libres.any(axis=1)